@@ -1,15 +1,48 @@
 from __future__ import annotations
 
-from typing import Optional, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Union, Any
+import asyncio
 
-from discord import ButtonStyle, CategoryChannel, Embed, ForumChannel, HTTPException, Interaction, StageChannel, Colour, SelectOption
+from discord import ButtonStyle, Embed, HTTPException, Interaction, Colour, Message, SelectOption
+from discord.abc import Messageable
 from discord.ext.commands import Bot
 from discord.ui import Item, Select, select, Button, button, View
 from dispie.embed_creator.methods import CreatorMethods
-from dispie import ChannelSelectPrompt
+from dispie.embed_creator.sections import CALLBACK_SECTIONS, restore_section, snapshot_section
+from dispie.embed_creator.validator import *
+from dispie.embed_creator.store import *
+from dispie.embed_creator.broadcast import *
+from dispie.embed_creator.library import *
+from dispie.embed_creator.history import *
+from dispie import ChannelSelectPrompt, EmbedTemplate, PromptManager, URLChecker
+from dispie.utils import view_state as components_state
 
 
-__all__ = ("EmbedCreator",)
+__all__ = (
+    "EmbedCreator",
+    "EmbedValidator",
+    "EmbedValidationError",
+    "Draft",
+    "DraftStore",
+    "SQLiteDraftStore",
+    "DraftRehydrator",
+    "Broadcaster",
+    "BroadcastResult",
+    "EmbedLibrary",
+    "dump_embed",
+    "load_embed",
+    "pack_embed",
+    "unpack_embed",
+    "embed_hash",
+    "EmbedHistory",
+)
+
+# The custom ids used by builders with a draft store, so a builder can be rebuilt after a restart.
+EDIT_CUSTOM_ID = "dispie:embed_creator:edit"
+SEND_CUSTOM_ID = "dispie:embed_creator:send"
+CANCEL_CUSTOM_ID = "dispie:embed_creator:cancel"
+UNDO_CUSTOM_ID = "dispie:embed_creator:undo"
+REDO_CUSTOM_ID = "dispie:embed_creator:redo"
 
 
 class EmbedCreator(View):
@@ -21,6 +54,14 @@ class EmbedCreator(View):
         bot (discord.Client or discord.ext.commands.Bot): An instance of the Discord bot that will be used to access client information such as avatar, name, and ID.
         embed (discord.Embed): An instance of the Discord Embed class that will be used as the main embed.
         timeout (float, optional): An optional argument that is passed to the parent View class. It is used to specify a timeout for the view in seconds.
+        store (DraftStore, optional): A store the draft is saved to after every edit, so a `DraftRehydrator` can rebuild the builder after a restart. With a store, the builder times out after `timeout` seconds of inactivity (15 minutes by default). The draft is removed when the builder times out, is sent or cancelled, and expires after the `max_age` of the store.
+        send_max_values (int, optional): The number of channels that can be picked when sending the embed, up to 25. Default is 1.
+        broadcaster (Broadcaster, optional): The broadcaster used to send the embed to several channels. A bot wide one can be shared to keep all builders under the same rate limits.
+        history_depth (int, optional): The number of edits that can be undone. Default is 25. The history is kept in memory only, it is not saved to the draft store.
+        edit_interval (float, optional): The minimum time between two edits of the message. Edits made while the message is being updated are coalesced into a single edit. Default is 0.5 seconds.
+        url_checker (URLChecker, optional): Checks the author, thumbnail, image and footer urls before an edit is accepted. Share one checker between builders so they share its cache.
+        prompts (PromptManager, optional): Sends the modals and select prompts of the builder and waits for their answers, with a timeout.
+        author_id (int, optional): The id of the user the draft belongs to, only they can rebuild the builder from the store. Defaults to the first user who edits the builder.
     """
 
     def __init__(
@@ -29,17 +70,44 @@ class EmbedCreator(View):
         bot: Bot,
         embed: Optional[Embed] = None,
         timeout: Optional[float] = None,
+        store: Optional[DraftStore] = None,
+        send_max_values: int = 1,
+        broadcaster: Optional[Broadcaster] = None,
+        history_depth: int = 25,
+        edit_interval: float = 0.5,
+        url_checker: Optional[URLChecker] = None,
+        prompts: Optional[PromptManager] = None,
+        author_id: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
+        if store is not None and timeout is None:
+            timeout = 900.0
         super().__init__(timeout=timeout)
+        self.store = store
+        self.author_id = author_id
+        # The message the draft is saved for, so it can be removed when the builder times out.
+        self._draft_message_id: Optional[int] = None
+        self.send_max_values = min(max(send_max_values, 1), 25)
+        self.broadcaster = broadcaster
         if not embed:
             embed = self.get_default_embed
         self.bot, self.embed, self.timeout, self._creator_methods = (
             bot,
             embed,
             timeout,
-            CreatorMethods(embed),
+            CreatorMethods(embed, url_checker, prompts),
         )
+        self._validator = EmbedValidator(embed)
+        self.history = EmbedHistory(history_depth)
+        self.message: Optional[Message] = None
+        self.edit_interval: float = edit_interval
+        self._updating: bool = False
+        # What the message shows, as last sent by this builder. None means unknown, so it is sent on the next edit.
+        self._sent_embed: Optional[str] = None
+        self._sent_view: Optional[Tuple[Any, ...]] = None
+        # The channels that already received the embed, so sending again after a partial failure only retries the others.
+        self._delivered: Dict[int, Message] = {}
+        self._delivered_embed: Optional[str] = None
         self.options_data = [
             {
                 "label": kwargs.get("author_label", "Edit Author"),
@@ -116,16 +184,146 @@ class EmbedCreator(View):
             "send_label", 'Send'), kwargs.get("send_emoji", None), kwargs.get("send_style", ButtonStyle.blurple)
         self.children[2].label, self.children[2].emoji, self.children[2].style = kwargs.get(  # type: ignore
             "cancel_label", 'Cancel'), kwargs.get("cancel_emoji", None), kwargs.get("cancel_style", ButtonStyle.red)  # type: ignore
+        self.children[3].label, self.children[3].emoji, self.children[3].style = kwargs.get(  # type: ignore
+            "undo_label", 'Undo'), kwargs.get("undo_emoji", None), kwargs.get("undo_style", ButtonStyle.grey)
+        self.children[4].label, self.children[4].emoji, self.children[4].style = kwargs.get(  # type: ignore
+            "redo_label", 'Redo'), kwargs.get("redo_emoji", None), kwargs.get("redo_style", ButtonStyle.grey)
+        self.update_history_buttons()
+        if store is not None:
+            self.edit_select_callback.custom_id = EDIT_CUSTOM_ID
+            self.send_callback.custom_id = SEND_CUSTOM_ID
+            self.cancel_callback.custom_id = CANCEL_CUSTOM_ID
+            self.undo_callback.custom_id = UNDO_CUSTOM_ID
+            self.redo_callback.custom_id = REDO_CUSTOM_ID
 
     async def on_error(self, interaction: Interaction, error: Exception, item: Item[Any]) -> None:
         if isinstance(error, HTTPException) and error.code == 50035:
-            # This will save you from the '50035' error, if any user try to remove all the attr of the embed then HTTP exception will raise with the error code `50035`
+            # Edits are validated locally before they are sent, this is only a fallback for a limit the validator doesn't know about.
             self.embed.description = f"_ _"
             await self.update_embed(interaction)
 
-    async def update_embed(self, interaction: Interaction):
-        """This function will update the whole embed and edit the message and view."""
-        return await interaction.message.edit(embed=self.embed, view=self)  # type: ignore
+    def save_draft(self, interaction: Interaction) -> None:
+        """Stages the current embed in the draft store, if there is one."""
+        if self.store is not None and interaction.message is not None:
+            if self.author_id is None:
+                self.author_id = interaction.user.id
+            self._draft_message_id = interaction.message.id
+            self.store.put(interaction.message.id, interaction.guild_id, self.author_id, self.embed)
+
+    async def on_timeout(self) -> None:
+        if self.store is not None and self._draft_message_id is not None:
+            self.store.discard(self._draft_message_id)
+
+    def discard_draft(self, interaction: Interaction) -> None:
+        """Removes the draft of the builder message from the draft store, if there is one."""
+        if self.store is not None and interaction.message is not None:
+            self.store.discard(interaction.message.id)
+
+    def export(self, *, binary: bool = False) -> Union[str, bytes]:
+        """Returns the current embed as canonical JSON, or compressed with zlib if `binary` is True."""
+        return pack_embed(self.embed) if binary else dump_embed(self.embed)
+
+    @classmethod
+    def from_export(cls, data: Union[str, bytes], *, bot: Bot, binary: bool = False, **kwargs: Any) -> EmbedCreator:
+        """Returns a builder for an embed exported with `export`. The keyword arguments are passed to the builder."""
+        return cls(bot=bot, embed=unpack_embed(data) if binary else load_embed(data), **kwargs)  # type: ignore
+
+    def to_template(self, *, strict: bool = False) -> EmbedTemplate:
+        """Compiles the current embed into an `EmbedTemplate`, so its `{placeholders}` can be rendered many times."""
+        return EmbedTemplate(self.embed, strict=strict)
+
+    async def broadcast(self, channels: Iterable[Messageable]) -> List[BroadcastResult]:
+        """
+        Sends the embed to every channel, the channels can belong to different guilds. Returns a result per channel.
+        Channels that already received this version of the embed from the builder are not sent to again, their result has the earlier message.
+        """
+        if self.broadcaster is None:
+            self.broadcaster = Broadcaster()
+        embed = dump_embed(self.embed)
+        if embed != self._delivered_embed:
+            self._delivered, self._delivered_embed = {}, embed
+        channels = list(channels)
+        pending = [channel for channel in channels if getattr(channel, "id", None) not in self._delivered]
+        sent = iter(await self.broadcaster.send(pending, embed=self.embed))
+        results = []
+        for channel in channels:
+            message = self._delivered.get(getattr(channel, "id", None))  # type: ignore
+            result = BroadcastResult(channel, message=message) if message is not None else next(sent)
+            if result.message is not None and hasattr(channel, "id"):
+                self._delivered[channel.id] = result.message  # type: ignore
+            results.append(result)
+        return results
+
+    @staticmethod
+    def format_broadcast_results(results: List[BroadcastResult]) -> str:
+        """Returns the summary of a broadcast that is shown to the user."""
+        sent = sum(result.ok for result in results)
+        lines = [f"Sent to {sent}/{len(results)} channels."]
+        for result in results:
+            if result.skipped is not None:
+                lines.append(f"Skipped {getattr(result.channel, 'mention', result.channel)}: {result.skipped}")
+            elif result.error is not None:
+                lines.append(f"Failed {getattr(result.channel, 'mention', result.channel)}: {result.error}")
+        return "\n".join(lines)[:2000]
+
+    def update_history_buttons(self) -> None:
+        """Disables the undo and redo buttons when there is nothing to undo or redo."""
+        self.undo_callback.disabled = not self.history.can_undo
+        self.redo_callback.disabled = not self.history.can_redo
+
+    def _view_state(self) -> Tuple[Any, ...]:
+        return components_state(self)
+
+    def _changes(self) -> Tuple[Dict[str, Any], str, Tuple[Any, ...]]:
+        embed_state, view_state = dump_embed(self.embed), self._view_state()
+        kwargs: Dict[str, Any] = {}
+        if embed_state != self._sent_embed:
+            kwargs["embed"] = self.embed
+        if view_state != self._sent_view:
+            kwargs["view"] = self
+        return kwargs, embed_state, view_state
+
+    async def _edit(self, interaction: Optional[Interaction]) -> Optional[Message]:
+        kwargs, embed_state, view_state = self._changes()
+        if not kwargs:
+            if interaction is not None and not interaction.response.is_done():
+                await interaction.response.defer()
+            return None
+
+        self._sent_embed, self._sent_view = embed_state, view_state
+        try:
+            if interaction is not None and not interaction.response.is_done():
+                await interaction.response.edit_message(**kwargs)
+                return None
+            return await self.message.edit(**kwargs)  # type: ignore
+        except Exception:
+            self._sent_embed = self._sent_view = None
+            raise
+
+    async def update_embed(self, interaction: Interaction) -> Optional[Message]:
+        """
+        This function will edit the message with the parts of the embed and view that changed since the last edit.
+        Nothing is sent when neither changed. Edits made while the message is being updated are coalesced into a single edit of the final state.
+        """
+        if self.message is None:
+            self.message = interaction.message
+
+        if self._updating:
+            # Another edit is in flight, it sends the new state once it is done.
+            if not interaction.response.is_done():
+                await interaction.response.defer()
+            return None
+
+        self._updating = True
+        try:
+            message = await self._edit(interaction)
+            while self._changes()[0] and self.message is not None:
+                if self.edit_interval:
+                    await asyncio.sleep(self.edit_interval)
+                message = await self._edit(None) or message
+        finally:
+            self._updating = False
+        return message
 
     @property
     def get_default_embed(self) -> Embed:
@@ -157,34 +355,61 @@ class EmbedCreator(View):
         This method is a callback function for the `select` interaction.
         It is triggered when a user selects an option from the select menu. 
         The method uses the `callbacks` attribute of the `CreatorMethods` class to call the appropriate callback function based on the user's selection.
+        The edited section is then checked with the `EmbedValidator`, an edit that breaks a Discord limit is undone and never sent.
 
         Parameters:
             interaction (discord.Interaction): The interaction object representing the current interaction.
             select (discord.Select): The select object representing the select menu.
 
         """
+        section = CALLBACK_SECTIONS[select.values[0]]
+        previous = snapshot_section(self.embed, section)
         await self._creator_methods.callbacks[select.values[0]](interaction)
+        if errors := self._validator.check(section):
+            restore_section(self.embed, section, previous)
+            self._validator.update(section)
+            return await interaction.followup.send("\n".join(errors), ephemeral=True)
+        self.history.record(section, previous, snapshot_section(self.embed, section))
+        self.update_history_buttons()
+        self.save_draft(interaction)
         await self.update_embed(interaction)
 
     @button()
     async def send_callback(self, interaction: Interaction, button: Button) -> None:
         """
         This method is a callback function for the `button` interaction. It is triggered when a user clicks on the "send" button. 
-        The method creates a `ChannelSelectPrompt` object and sends it as an ephemeral message to the user. It then waits for the user to select a channel.
-        If a channel is selected, the method sends the embed to the selected channel and deletes the original interaction message.
+        The method creates a `ChannelSelectPrompt` object and sends it as an ephemeral message to the user. It then waits for the user to select up to `send_max_values` channels.
+        The embed is sent to the selected channels through `broadcast` and a summary is sent to the user. The original interaction message is deleted once every channel received the embed.
 
         Parameters:
             interaction (discord.Interaction): The interaction object representing the current interaction.
             button (discord.Button): The button object representing the "send" button.
         """
-        prompt = ChannelSelectPrompt(
-            "Select a channel to send this embed...", True, 1)
-        await interaction.response.send_message(view=prompt, ephemeral=True)
-        await prompt.wait()
-        if prompt.values:
-            if not isinstance(prompt.values[0], (StageChannel, ForumChannel, CategoryChannel)):
-                await prompt.values[0].send(embed=self.embed)  # type: ignore
-                await interaction.message.delete()  # type: ignore
+        if self.send_max_values > 1:
+            placeholder = f"Select up to {self.send_max_values} channels to send this embed..."
+        else:
+            placeholder = "Select a channel to send this embed..."
+        prompt = ChannelSelectPrompt(placeholder, True, self.send_max_values)
+        if self._creator_methods.prompts is not None:
+            await self._creator_methods.prompts.prompt(interaction, prompt)
+        else:
+            await interaction.response.send_message(view=prompt, ephemeral=True)
+            await prompt.wait()
+        if not prompt.values:
+            return
+
+        sent = iter(await self.broadcast(channel for channel in prompt.values if channel is not None))
+        # Channels missing from the cache can't be sent to, they are reported as failed.
+        results = [
+            next(sent) if channel is not None else BroadcastResult(selected, error=LookupError("Channel not found."))
+            for selected, channel in zip(prompt.selected or (), prompt.values)
+        ]
+        if results and all(result.ok for result in results):
+            await interaction.message.delete()  # type: ignore
+            self.discard_draft(interaction)
+            self.stop()
+        if len(results) > 1 or not all(result.ok for result in results):
+            await interaction.followup.send(self.format_broadcast_results(results), ephemeral=True)
 
     @button()
     async def cancel_callback(self, interaction: Interaction, button: Button) -> None:
@@ -197,4 +422,96 @@ class EmbedCreator(View):
             button (Button): The button object representing the "cancel" button.
         """
         await interaction.message.delete()  # type: ignore
+        self.discard_draft(interaction)
         self.stop()
+
+    async def _apply_history(self, interaction: Interaction, section: Optional[str]) -> None:
+        if section is None:
+            return await interaction.response.send_message("There is nothing to undo or redo.", ephemeral=True)
+        self._validator.update(section)
+        self.update_history_buttons()
+        self.save_draft(interaction)
+        await self.update_embed(interaction)
+
+    @button()
+    async def undo_callback(self, interaction: Interaction, button: Button) -> None:
+        """
+        This method is a callback function for the `button` interaction. It is triggered when a user clicks on the "undo" button.
+        The method reverts the last edit and updates the message.
+
+        Parameters:
+            interaction (Interaction): The interaction object representing the current interaction.
+            button (Button): The button object representing the "undo" button.
+        """
+        await self._apply_history(interaction, self.history.undo(self.embed))
+
+    @button()
+    async def redo_callback(self, interaction: Interaction, button: Button) -> None:
+        """
+        This method is a callback function for the `button` interaction. It is triggered when a user clicks on the "redo" button.
+        The method applies the last undone edit again and updates the message.
+
+        Parameters:
+            interaction (Interaction): The interaction object representing the current interaction.
+            button (Button): The button object representing the "redo" button.
+        """
+        await self._apply_history(interaction, self.history.redo(self.embed))
+
+
+
+class DraftRehydrator(View):
+    """
+    A persistent view that rebuilds `EmbedCreator` builders which were lost in a restart.
+
+    Register it once with `bot.add_view(DraftRehydrator(bot=bot, store=store))`. discord.py hands it the interactions of
+    builder messages that have no live view anymore, it then loads the draft of the message from the store, creates a
+    new builder for the author of the draft and runs the requested action on it. Builders without a draft have expired. The new builder takes over the message on its first edit.
+
+    Parameters:
+        bot (discord.ext.commands.Bot): The bot passed to the rebuilt builders.
+        store (DraftStore): The draft store the builders use.
+        timeout (float, optional): The idle timeout of the rebuilt builders. Default is 900 seconds.
+        **kwargs: The `EmbedCreator` options (labels, emojis, styles) used by the rebuilt builders.
+    """
+
+    def __init__(self, *, bot: Bot, store: DraftStore, timeout: Optional[float] = 900.0, **kwargs: Any) -> None:
+        super().__init__(timeout=None)
+        self.bot, self.store, self.creator_timeout, self.options = bot, store, timeout, kwargs
+
+    async def rehydrate(self, interaction: Interaction) -> Optional[EmbedCreator]:
+        draft = await self.store.get(interaction.message.id)  # type: ignore
+        if draft is None:
+            await interaction.response.send_message("This embed builder has expired.", ephemeral=True)
+            return None
+        if draft.user_id != interaction.user.id:
+            await interaction.response.send_message("Only the author of this embed can edit it.", ephemeral=True)
+            return None
+        creator = EmbedCreator(bot=self.bot, embed=draft.to_embed(), timeout=self.creator_timeout, store=self.store,
+                               author_id=draft.user_id, **self.options)
+        creator._draft_message_id = draft.message_id
+        return creator
+
+    @select(custom_id=EDIT_CUSTOM_ID)
+    async def edit_select_callback(self, interaction: Interaction, select: Select) -> None:
+        if creator := await self.rehydrate(interaction):
+            await EmbedCreator.edit_select_callback(creator, interaction, select)  # type: ignore
+
+    @button(custom_id=SEND_CUSTOM_ID)
+    async def send_callback(self, interaction: Interaction, button: Button) -> None:
+        if creator := await self.rehydrate(interaction):
+            await EmbedCreator.send_callback(creator, interaction, button)  # type: ignore
+
+    @button(custom_id=CANCEL_CUSTOM_ID)
+    async def cancel_callback(self, interaction: Interaction, button: Button) -> None:
+        if creator := await self.rehydrate(interaction):
+            await EmbedCreator.cancel_callback(creator, interaction, button)  # type: ignore
+
+    @button(custom_id=UNDO_CUSTOM_ID)
+    async def undo_callback(self, interaction: Interaction, button: Button) -> None:
+        if creator := await self.rehydrate(interaction):
+            await EmbedCreator.undo_callback(creator, interaction, button)  # type: ignore
+
+    @button(custom_id=REDO_CUSTOM_ID)
+    async def redo_callback(self, interaction: Interaction, button: Button) -> None:
+        if creator := await self.rehydrate(interaction):
+            await EmbedCreator.redo_callback(creator, interaction, button)  # type: ignore
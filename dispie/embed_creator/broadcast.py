@@ -0,0 +1,129 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from collections import deque
+import asyncio
+import time
+
+from discord import CategoryChannel, ForumChannel, Message, StageChannel, Thread
+from discord.abc import GuildChannel, Messageable
+from dispie.utils import LRUCache
+
+__all__ = (
+    "Broadcaster",
+    "BroadcastResult",
+)
+
+
+class BroadcastResult(NamedTuple):
+    """
+    The outcome of sending to one channel.
+
+    Attributes:
+        channel (Messageable): The channel.
+        message (Optional[Message]): The sent message, None if it wasn't sent.
+        error (Optional[Exception]): The exception raised while sending, if any.
+        skipped (Optional[str]): Why the channel was skipped without a request, if it was.
+    """
+    channel: Messageable
+    message: Optional[Message] = None
+    error: Optional[Exception] = None
+    skipped: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.message is not None
+
+
+class _RateLimiter:
+    """A sliding window limiter that allows `rate` acquisitions every `per` seconds."""
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.rate, self.per = rate, per
+        self._calls: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.per:
+                    self._calls.popleft()
+                if len(self._calls) < self.rate:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.per - (now - self._calls[0]))
+
+
+class Broadcaster:
+    """
+    Sends the same message to many channels concurrently, while staying under Discord's rate limits.
+
+    At most `concurrency` requests are in flight, every channel is limited by `channel_rate` and all sends
+    together to `global_rate` messages per second, so requests are spaced out before Discord has to answer
+    with a 429. Channels where the bot can't send (or embed links) are skipped without a request.
+    The limiter of a channel is dropped once its window is over, and at most `max_channels` limiters are kept.
+
+    Parameters:
+        concurrency (int, optional): The maximum number of requests in flight. Default is 5.
+        channel_rate (Tuple[int, float], optional): The messages allowed per channel and the window in seconds. Default is (5, 5.0).
+        global_rate (int, optional): The messages allowed per second across all channels. Default is 40.
+        max_channels (int, optional): The maximum number of channel limiters kept. Default is 1024.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 5,
+        channel_rate: Tuple[int, float] = (5, 5.0),
+        global_rate: int = 40,
+        max_channels: int = 1024,
+    ) -> None:
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.channel_rate = channel_rate
+        self._global = _RateLimiter(global_rate, 1.0)
+        # A limiter that wasn't used for a whole window has no calls left to remember, so it can expire.
+        self._channels: LRUCache[int, _RateLimiter] = LRUCache(max(max_channels, 1), ttl=channel_rate[1])
+
+    def check_permissions(self, channel: Messageable) -> Optional[str]:
+        """Returns why the bot can't send an embed to the channel, or None if it can."""
+        if isinstance(channel, (StageChannel, ForumChannel, CategoryChannel)):
+            return "This channel doesn't support messages."
+        if isinstance(channel, (GuildChannel, Thread)):
+            permissions = channel.permissions_for(channel.guild.me)
+            can_send = permissions.send_messages_in_threads if isinstance(channel, Thread) else permissions.send_messages
+            if not permissions.view_channel or not can_send:
+                return "Missing permission to send messages."
+            if not permissions.embed_links:
+                return "Missing permission to embed links."
+        return None
+
+    async def _acquire(self, channel: Messageable) -> None:
+        key = getattr(channel, "id", id(channel))
+        limiter = self._channels.get(key)
+        if limiter is None:
+            limiter = _RateLimiter(*self.channel_rate)
+        self._channels.put(key, limiter)
+        await limiter.acquire()
+        # The window starts at the last call, not when the limiter was looked up.
+        self._channels.put(key, limiter)
+
+    async def _send(self, channel: Messageable, kwargs: Dict[str, Any]) -> BroadcastResult:
+        reason = self.check_permissions(channel)
+        if reason is not None:
+            return BroadcastResult(channel, skipped=reason)
+
+        await self._acquire(channel)
+        async with self._semaphore:
+            await self._global.acquire()
+            try:
+                message = await channel.send(**kwargs)
+            except Exception as error:
+                return BroadcastResult(channel, error=error)
+        return BroadcastResult(channel, message=message)
+
+    async def send(self, channels: Iterable[Messageable], **kwargs: Any) -> List[BroadcastResult]:
+        """
+        Sends a message to every channel and returns a result per channel, in the same order.
+        The keyword arguments are passed to `channel.send`.
+        """
+        return await asyncio.gather(*(self._send(channel, kwargs) for channel in channels))
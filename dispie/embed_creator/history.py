@@ -0,0 +1,92 @@
+from __future__ import annotations
+from typing import Any, Deque, List, NamedTuple, Optional
+from collections import deque
+
+from discord import Embed
+
+from dispie.embed_creator.sections import restore_section
+
+__all__ = (
+    "EmbedHistory",
+)
+
+
+class _Change(NamedTuple):
+    section: str
+    before: Any
+    after: Any
+
+
+def _share(before: Any, after: Any) -> Any:
+    """Reuses the fields of `before` that are unchanged in `after`, so both versions point to the same tuples."""
+    if not isinstance(after, tuple) or not isinstance(before, tuple):
+        return after
+    known = {field: field for field in before if isinstance(field, tuple)}
+    if not known:
+        return after
+    return tuple(known.get(field, field) if isinstance(field, tuple) else field for field in after)
+
+
+class EmbedHistory:
+    """
+    The undo and redo history of an embed.
+
+    Only the section that an edit touched is recorded, as the immutable snapshots made by `snapshot_section`
+    before and after the edit. Unchanged fields are shared between the two snapshots, so undoing a field
+    edit on a 25 field embed doesn't keep 25 copies of every field around.
+
+    Parameters:
+        depth (int, optional): The maximum number of edits that can be undone. The oldest edit is dropped when it is reached. Default is 25.
+
+    Methods:
+    record(section: str, before, after): Records an edit. It clears the redo history.
+    undo(embed: Embed): Reverts the last edit on the embed. Returns the section that changed, or None.
+    redo(embed: Embed): Applies the last undone edit again. Returns the section that changed, or None.
+    clear(): Forgets every edit.
+    """
+
+    def __init__(self, depth: int = 25) -> None:
+        if depth < 1:
+            raise ValueError("The history depth must be at least 1.")
+        self.depth: int = depth
+        self._undo: Deque[_Change] = deque(maxlen=depth)
+        self._redo: List[_Change] = []
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def record(self, section: str, before: Any, after: Any) -> bool:
+        """Records an edit of a section. Returns False if the section didn't change."""
+        if before == after:
+            return False
+        self._undo.append(_Change(section, before, _share(before, after)))
+        self._redo.clear()
+        return True
+
+    def undo(self, embed: Embed) -> Optional[str]:
+        if not self._undo:
+            return None
+        change = self._undo.pop()
+        restore_section(embed, change.section, change.before)
+        self._redo.append(change)
+        return change.section
+
+    def redo(self, embed: Embed) -> Optional[str]:
+        if not self._redo:
+            return None
+        change = self._redo.pop()
+        restore_section(embed, change.section, change.after)
+        self._undo.append(change)
+        return change.section
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
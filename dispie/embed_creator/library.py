@@ -0,0 +1,251 @@
+from __future__ import annotations
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import hashlib
+import json
+import struct
+import zlib
+
+from discord import Embed
+
+__all__ = (
+    "dump_embed",
+    "load_embed",
+    "pack_embed",
+    "unpack_embed",
+    "embed_hash",
+    "EmbedLibrary",
+)
+
+# The binary format is a magic header followed by a zlib stream of records. A record is a kind byte, a 4 byte big endian
+# length and the body. Embed records hold the 32 byte sha256 digest and the canonical JSON, name records hold the digest
+# and the utf-8 name. An embed record always comes before the first name record that uses it.
+MAGIC = b"DSPE\x01"
+EMBED_RECORD = 0
+NAME_RECORD = 1
+_HEADER = struct.Struct(">BI")
+_CHUNK_SIZE = 64 * 1024
+
+
+def _canonical(embed: Union[Embed, Dict[str, Any]]) -> bytes:
+    payload = embed.to_dict() if isinstance(embed, Embed) else dict(embed)
+    if not payload.get("flags"):
+        payload.pop("flags", None)
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dump_embed(embed: Embed) -> str:
+    """Returns the canonical JSON of an embed: sorted keys, no whitespace. Equal embeds always give the same string."""
+    return _canonical(embed).decode()
+
+
+def load_embed(data: Union[str, bytes]) -> Embed:
+    """Returns the embed of a JSON string made with `dump_embed`."""
+    return Embed.from_dict(json.loads(data))
+
+
+def pack_embed(embed: Embed) -> bytes:
+    """Returns the canonical JSON of an embed compressed with zlib."""
+    return zlib.compress(_canonical(embed), 9)
+
+
+def unpack_embed(data: bytes) -> Embed:
+    """Returns the embed of bytes made with `pack_embed`."""
+    return load_embed(zlib.decompress(data))
+
+
+def embed_hash(embed: Embed) -> str:
+    """Returns the sha256 hex digest of the canonical JSON of an embed. Equal embeds have the same hash."""
+    return hashlib.sha256(_canonical(embed)).hexdigest()
+
+
+class _Inflater:
+    """Reads exact amounts of bytes out of a zlib stream without loading the whole file."""
+
+    def __init__(self, fp: IO[bytes]) -> None:
+        self.fp = fp
+        self._decompressor = zlib.decompressobj()
+        self._buffer = bytearray()
+
+    def read(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            chunk = self.fp.read(_CHUNK_SIZE)
+            if not chunk:
+                self._buffer += self._decompressor.flush()
+                if not self._decompressor.eof:
+                    raise ValueError("The embed library file is truncated.")
+                if len(self._buffer) < size:
+                    if self._buffer:
+                        raise ValueError("The embed library file is truncated.")
+                    return b""
+                break
+            self._buffer += self._decompressor.decompress(chunk)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class EmbedLibrary:
+    """
+    A collection of named embeds where every distinct embed is stored once.
+
+    Embeds are kept as their canonical JSON and keyed by its sha256 hash, names only point to a hash. Saving a
+    thousand guild templates that share the same few embeds stores those embeds once, and an embed is only
+    parsed when it is asked for.
+
+    Libraries are saved to and loaded from a single file in one streaming pass, either as JSON lines or in a
+    compact binary format (zlib compressed, length prefixed records).
+
+    Methods:
+    add(name: str, embed: Embed): Adds or replaces a named embed. Returns its hash.
+    get(name: str): Returns a new copy of the named embed, or None.
+    get_by_hash(digest: str): Returns a new copy of the embed with the given hash, or None.
+    remove(name: str): Removes a named embed. The embed itself is dropped once no name uses it.
+    save(fp, binary: bool = False): Writes the library to a file object.
+    load(fp, binary: bool = False): Classmethod, reads a library from a file object.
+    """
+
+    def __init__(self, embeds: Optional[Iterable[Tuple[str, Embed]]] = None) -> None:
+        self._names: Dict[str, str] = {}
+        self._blobs: Dict[str, bytes] = {}
+        self._refs: Dict[str, int] = {}
+        for name, embed in embeds or ():
+            self.add(name, embed)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __repr__(self) -> str:
+        return f"<EmbedLibrary names={len(self._names)} embeds={len(self._blobs)}>"
+
+    @property
+    def unique(self) -> int:
+        """The number of distinct embeds stored."""
+        return len(self._blobs)
+
+    def _link(self, name: str, digest: str, blob: Optional[bytes] = None) -> None:
+        self.remove(name)
+        if digest not in self._blobs:
+            if blob is None:
+                raise ValueError(f"Unknown embed hash {digest!r} for {name!r}.")
+            self._blobs[digest] = blob
+            self._refs[digest] = 0
+        self._refs[digest] += 1
+        self._names[name] = digest
+
+    def add(self, name: str, embed: Embed) -> str:
+        blob = _canonical(embed)
+        digest = hashlib.sha256(blob).hexdigest()
+        self._link(name, digest, blob)
+        return digest
+
+    def hash_of(self, name: str) -> Optional[str]:
+        return self._names.get(name)
+
+    def get_by_hash(self, digest: str) -> Optional[Embed]:
+        blob = self._blobs.get(digest)
+        return None if blob is None else load_embed(blob)
+
+    def get(self, name: str) -> Optional[Embed]:
+        digest = self._names.get(name)
+        return None if digest is None else self.get_by_hash(digest)
+
+    def remove(self, name: str) -> None:
+        digest = self._names.pop(name, None)
+        if digest is None:
+            return
+        self._refs[digest] -= 1
+        if not self._refs[digest]:
+            del self._refs[digest], self._blobs[digest]
+
+    def _records(self) -> Iterator[Tuple[int, str, bytes]]:
+        written = set()
+        for name, digest in self._names.items():
+            if digest not in written:
+                written.add(digest)
+                yield EMBED_RECORD, digest, self._blobs[digest]
+            yield NAME_RECORD, digest, name.encode()
+
+    def save(self, fp: Union[IO[str], IO[bytes]], *, binary: bool = False) -> None:
+        """
+        Writes the library to a file object, opened in binary mode for the binary format and in text mode otherwise.
+        Every distinct embed is written once.
+        """
+        if not binary:
+            for kind, digest, body in self._records():
+                if kind == EMBED_RECORD:
+                    fp.write(f'{{"h":"{digest}","e":{body.decode()}}}\n')  # type: ignore
+                else:
+                    fp.write(json.dumps({"h": digest, "n": body.decode()}, ensure_ascii=False) + "\n")  # type: ignore
+            return
+
+        compressor = zlib.compressobj(9)
+        fp.write(MAGIC)  # type: ignore
+        chunks: List[bytes] = []
+        size = 0
+        for kind, digest, body in self._records():
+            record = _HEADER.pack(kind, len(body) + 32) + bytes.fromhex(digest) + body
+            chunks.append(record)
+            size += len(record)
+            if size >= _CHUNK_SIZE:
+                fp.write(compressor.compress(b"".join(chunks)))  # type: ignore
+                chunks, size = [], 0
+        fp.write(compressor.compress(b"".join(chunks)) + compressor.flush())  # type: ignore
+
+    @classmethod
+    def load(cls, fp: Union[IO[str], IO[bytes]], *, binary: bool = False, verify: bool = False) -> EmbedLibrary:
+        """
+        Reads a library written by `save` in a single pass. With `verify`, the hash of every embed is checked.
+        Raises `ValueError` if the file is not a valid library.
+        """
+        library = cls()
+        if not binary:
+            for line in fp:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "e" in record:
+                    blob = _canonical(record["e"])
+                    library._check(record["h"], blob, verify)
+                    library._blobs.setdefault(record["h"], blob)
+                    library._refs.setdefault(record["h"], 0)
+                else:
+                    library._link(record["n"], record["h"])
+            return library._drop_unused()
+
+        if fp.read(len(MAGIC)) != MAGIC:  # type: ignore
+            raise ValueError("Not an embed library file.")
+        reader = _Inflater(fp)  # type: ignore
+        while header := reader.read(_HEADER.size):
+            if len(header) != _HEADER.size:
+                raise ValueError("The embed library file is truncated.")
+            kind, length = _HEADER.unpack(header)
+            body = reader.read(length)
+            if len(body) != length:
+                raise ValueError("The embed library file is truncated.")
+            digest, body = body[:32].hex(), body[32:]
+            if kind == EMBED_RECORD:
+                library._check(digest, body, verify)
+                library._blobs.setdefault(digest, body)
+                library._refs.setdefault(digest, 0)
+            elif kind == NAME_RECORD:
+                library._link(body.decode(), digest)
+            else:
+                raise ValueError(f"Unknown record kind {kind}.")
+        return library._drop_unused()
+
+    def _drop_unused(self) -> EmbedLibrary:
+        # A file can hold embeds that no name points to, they are dropped so `unique` only counts the used ones.
+        for digest in [digest for digest, refs in self._refs.items() if not refs]:
+            del self._refs[digest], self._blobs[digest]
+        return self
+
+    @staticmethod
+    def _check(digest: str, blob: bytes, verify: bool) -> None:
+        if verify and hashlib.sha256(blob).hexdigest() != digest:
+            raise ValueError(f"The embed {digest!r} doesn't match its hash.")
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Callable, Dict
-from dispie import ModalInput, SelectPrompt
-from discord import Colour, Embed, HTTPException, Interaction, SelectOption, TextStyle
+from typing import Callable, Dict, Optional
+import asyncio
+
+from dispie import ModalInput, PromptManager, SelectPrompt, URLChecker
+from discord import Colour, Embed, Interaction, SelectOption, TextStyle
 from discord.ui import TextInput
 
 
@@ -12,11 +14,17 @@ class CreatorMethods:
 
     Attributes:
         embed (discord.Embed): The embed object being edited.
+        url_checker (URLChecker, optional): Checks the urls of the author, thumbnail, image and footer before they are set.
+        prompts (PromptManager, optional): Sends the modals and select prompts and waits for their answers. Without it every prompt is a View waiting on its own.
 
     """
 
-    def __init__(self, embed: Embed) -> None:
+    def __init__(
+        self, embed: Embed, url_checker: Optional[URLChecker] = None, prompts: Optional[PromptManager] = None
+    ) -> None:
         self.embed = embed
+        self.url_checker = url_checker
+        self.prompts = prompts
         self.callbacks: Dict[str, Callable] = {
             "author": self.edit_author,
             "message": self.edit_message,
@@ -29,6 +37,23 @@ class CreatorMethods:
         }
 
 
+    async def ask(self, interaction: Interaction, modal: ModalInput) -> bool:
+        """Sends the modal and waits for it to be submitted. Returns False if it wasn't."""
+        if self.prompts is not None:
+            return await self.prompts.modal(interaction, modal) is not None
+        await interaction.response.send_modal(modal)
+        return not await modal.wait()
+
+    async def check_urls(self, interaction: Interaction, *urls: str, images: bool = True) -> bool:
+        """Checks the given urls with the `url_checker`. Empty urls are skipped. Sends the problems to the user and returns False if a url can't be used."""
+        if self.url_checker is None:
+            return True
+        errors = await asyncio.gather(*(self.url_checker.check(url, image=images) for url in urls if url))
+        if errors := [error for error in errors if error]:
+            await interaction.followup.send("\n".join(errors), ephemeral=True)
+            return False
+        return True
+
     async def edit_author(self, interaction: Interaction) -> None:
         """This method edits the embed's author"""
         modal = ModalInput(title="Edit Embed Author")
@@ -57,18 +82,16 @@ class CreatorMethods:
                 required=False,
             )
         )
-        await interaction.response.send_modal(modal)
-        await modal.wait()
-        try:
-            self.embed.set_author(
-                name=str(modal.children[0]),
-                icon_url=str(modal.children[1]),
-                url=str(modal.children[2]),
-            )
-        except HTTPException:
-            self.embed.set_author(
-                name=str(modal.children[0])
-            )
+        if not await self.ask(interaction, modal):
+            return
+        icon_url, url = str(modal.children[1]) or None, str(modal.children[2]) or None
+        if not await self.check_urls(interaction, icon_url) or not await self.check_urls(interaction, url, images=False):
+            return
+        self.embed.set_author(
+            name=str(modal.children[0]),
+            icon_url=icon_url,
+            url=url,
+        )
 
     async def edit_message(self, interaction: Interaction) -> None:
         """This method edits the embed's message (discord.Embed.title and discord.Embed.description)"""
@@ -92,8 +115,8 @@ class CreatorMethods:
                 max_length=2000,
             )
         )
-        await interaction.response.send_modal(modal)
-        await modal.wait()
+        if not await self.ask(interaction, modal):
+            return
         self.embed.title, self.embed.description = str(modal.children[0]), str(
             modal.children[1]
         )
@@ -109,9 +132,11 @@ class CreatorMethods:
                 required=False,
             )
         )
-        await interaction.response.send_modal(modal)
-        await modal.wait()
-        self.embed.set_thumbnail(url=str(modal.children[0]))
+        if not await self.ask(interaction, modal):
+            return
+        url = str(modal.children[0]) or None
+        if await self.check_urls(interaction, url):
+            self.embed.set_thumbnail(url=url)
 
     async def edit_image(self, interaction: Interaction) -> None:
         """This method edits the embed's image"""
@@ -124,9 +149,11 @@ class CreatorMethods:
                 required=False,
             )
         )
-        await interaction.response.send_modal(modal)
-        await modal.wait()
-        self.embed.set_image(url=str(modal.children[0]))
+        if not await self.ask(interaction, modal):
+            return
+        url = str(modal.children[0]) or None
+        if await self.check_urls(interaction, url):
+            self.embed.set_image(url=url)
 
     async def edit_footer(self, interaction: Interaction) -> None:
         """This method edits the embed's footer (text, icon_url)"""
@@ -148,11 +175,13 @@ class CreatorMethods:
                 placeholder="Icon you want to display on embed footer",
             )
         )
-        await interaction.response.send_modal(modal)
-        await modal.wait()
-        self.embed.set_footer(
-            text=str(modal.children[0]), icon_url=str(modal.children[1])
-        )
+        if not await self.ask(interaction, modal):
+            return
+        icon_url = str(modal.children[1]) or None
+        if await self.check_urls(interaction, icon_url):
+            self.embed.set_footer(
+                text=str(modal.children[0]), icon_url=icon_url
+            )
 
     async def edit_colour(self, interaction: Interaction) -> None:
         """This method is edits the embed's colour"""
@@ -164,8 +193,8 @@ class CreatorMethods:
                 max_length=20
             )
         )
-        await interaction.response.send_modal(modal)
-        await modal.wait()
+        if not await self.ask(interaction, modal):
+            return
         try:
             colour = Colour.from_str(str(modal.children[0]))
         except:
@@ -199,8 +228,8 @@ class CreatorMethods:
                 placeholder="The inline for the field either True or False",
             )
         )
-        await interaction.response.send_modal(modal)
-        await modal.wait()
+        if not await self.ask(interaction, modal):
+            return
         try:
             inline = False
             if str(modal.children[2]).lower() == "true":
@@ -237,9 +266,12 @@ class CreatorMethods:
             max_values=len(field_options),
             ephemeral=True
         )
-        await interaction.response.send_message(view=select, ephemeral=True)
-        await select.wait()
-        
+        if self.prompts is not None:
+            await self.prompts.prompt(interaction, select)
+        else:
+            await interaction.response.send_message(view=select, ephemeral=True)
+            await select.wait()
+
         if vals := select.values:
             for value in vals:
                 self.embed.remove_field(int(value))
\ No newline at end of file
@@ -0,0 +1,76 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+
+from discord import Embed
+
+__all__ = (
+    "SECTIONS",
+    "CALLBACK_SECTIONS",
+    "snapshot_section",
+    "restore_section",
+)
+
+SECTIONS: Tuple[str, ...] = ("author", "message", "thumbnail", "image", "footer", "color", "fields")
+
+# The embed section each `CreatorMethods` callback edits.
+CALLBACK_SECTIONS: Dict[str, str] = {
+    "author": "author",
+    "message": "message",
+    "thumbnail": "thumbnail",
+    "image": "image",
+    "footer": "footer",
+    "color": "color",
+    "addfield": "fields",
+    "removefield": "fields",
+}
+
+Field = Tuple[Optional[str], Optional[str], bool]
+
+
+def snapshot_section(embed: Embed, section: str) -> Any:
+    """Returns an immutable copy of one section of an embed, which `restore_section` can put back."""
+    if section == "author":
+        return (embed.author.name, embed.author.url, embed.author.icon_url)
+    if section == "message":
+        return (embed.title, embed.description)
+    if section == "thumbnail":
+        return embed.thumbnail.url
+    if section == "image":
+        return embed.image.url
+    if section == "footer":
+        return (embed.footer.text, embed.footer.icon_url)
+    if section == "color":
+        return embed.colour.value if embed.colour is not None else None
+    if section == "fields":
+        return tuple((field.name, field.value, bool(field.inline)) for field in embed.fields)
+    raise ValueError(f"Unknown embed section {section!r}.")
+
+
+def restore_section(embed: Embed, section: str, state: Any) -> None:
+    """Puts a section copied with `snapshot_section` back into an embed."""
+    if section == "author":
+        name, url, icon_url = state
+        if name is None:
+            embed.remove_author()
+        else:
+            embed.set_author(name=name, url=url, icon_url=icon_url)
+    elif section == "message":
+        embed.title, embed.description = state
+    elif section == "thumbnail":
+        embed.set_thumbnail(url=state)
+    elif section == "image":
+        embed.set_image(url=state)
+    elif section == "footer":
+        text, icon_url = state
+        if text is None and icon_url is None:
+            embed.remove_footer()
+        else:
+            embed.set_footer(text=text, icon_url=icon_url)
+    elif section == "color":
+        embed.colour = state
+    elif section == "fields":
+        embed.clear_fields()
+        for name, value, inline in state:
+            embed.add_field(name=name, value=value, inline=inline)
+    else:
+        raise ValueError(f"Unknown embed section {section!r}.")
@@ -0,0 +1,203 @@
+from __future__ import annotations
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+import asyncio
+import json
+import sqlite3
+import time
+
+from discord import Embed
+
+__all__ = (
+    "Draft",
+    "DraftStore",
+    "SQLiteDraftStore",
+)
+
+log = getLogger("Dispie Draft Store")
+
+
+class Draft(NamedTuple):
+    message_id: int
+    guild_id: int
+    user_id: int
+    embed: Dict[str, Any]
+
+    def to_embed(self) -> Embed:
+        return Embed.from_dict(self.embed)
+
+
+class DraftStore:
+    """
+    The base class for embed draft stores, keyed by the id of the builder message, so every builder has its own draft.
+    The guild id (0 in DMs) and the id of the author are kept with the draft.
+
+    Edits are not written right away: `put` only stages the latest version of a draft, and staged drafts are
+    written in one batch every `flush_interval` seconds (or as soon as `max_batch` drafts are staged).
+    A draft that is edited many times between two flushes is written once.
+
+    Drafts expire `max_age` seconds after their last edit: `load` doesn't return them and stores remove them.
+
+    Subclasses implement `write_many` and `load`.
+
+    Parameters:
+        flush_interval (float, optional): The number of seconds between two batched writes. Default is 5.
+        max_batch (int, optional): The number of staged drafts that triggers a write right away. Default is 100.
+        max_age (float, optional): The number of seconds a draft is kept after its last edit. Default is one day, None keeps drafts forever.
+    """
+
+    def __init__(self, *, flush_interval: float = 5.0, max_batch: int = 100, max_age: Optional[float] = 86400.0) -> None:
+        self.flush_interval: float = flush_interval
+        self.max_batch: int = max_batch
+        self.max_age: Optional[float] = max_age
+        self._pending: Dict[int, Optional[Draft]] = {}
+        self._flush_task: Optional[asyncio.Task[None]] = None
+        self._flushed: Set[asyncio.Task[None]] = set()
+
+    async def write_many(self, drafts: List[Draft], deleted: List[int]) -> None:
+        raise NotImplementedError
+
+    async def load(self, message_id: int) -> Optional[Draft]:
+        raise NotImplementedError
+
+    def put(self, message_id: int, guild_id: Optional[int], user_id: int, embed: Embed) -> None:
+        """Stages the latest version of the draft of a builder message."""
+        self._pending[message_id] = Draft(message_id, guild_id or 0, user_id, embed.to_dict())
+        self._schedule_flush()
+
+    def discard(self, message_id: int) -> None:
+        """Stages the deletion of the draft of a builder message."""
+        self._pending[message_id] = None
+        self._schedule_flush()
+
+    async def get(self, message_id: int) -> Optional[Draft]:
+        if message_id in self._pending:
+            return self._pending[message_id]
+        return await self.load(message_id)
+
+    def _schedule_flush(self) -> None:
+        if len(self._pending) >= self.max_batch:
+            task = asyncio.create_task(self.flush())
+            self._flushed.add(task)
+            task.add_done_callback(self._flush_done)
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+            self._flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task[None]) -> None:
+        self._flushed.discard(task)
+        if not task.cancelled() and (error := task.exception()) is not None:
+            # The drafts are kept staged by `flush`, they are written again by the next one.
+            log.error("Writing the embed drafts failed.", exc_info=error)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Writes every staged draft now."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        drafts = [draft for draft in pending.values() if draft is not None]
+        deleted = [key for key, draft in pending.items() if draft is None]
+        try:
+            await self.write_many(drafts, deleted)
+        except Exception:
+            # Keep the drafts for the next flush, unless they were edited again in the meantime.
+            for key, draft in pending.items():
+                self._pending.setdefault(key, draft)
+            raise
+
+    async def close(self) -> None:
+        """Writes every staged draft and stops the background flush."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        await self.flush()
+
+
+class SQLiteDraftStore(DraftStore):
+    """
+    A draft store backed by a local SQLite database. Queries run in a single background thread.
+
+    Parameters:
+        path (str, optional): The path of the database file. Default is "drafts.db".
+        flush_interval (float, optional): The number of seconds between two batched writes. Default is 5.
+        max_batch (int, optional): The number of staged drafts that triggers a write right away. Default is 100.
+        max_age (float, optional): The number of seconds a draft is kept after its last edit. Expired drafts are removed when the database is opened and on every write. Default is one day.
+    """
+
+    def __init__(self, path: str = "drafts.db", **options: Any) -> None:
+        super().__init__(**options)
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dispie-drafts")
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS message_drafts (
+                    message_id INTEGER PRIMARY KEY,
+                    guild_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    embed TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS message_drafts_updated_at ON message_drafts (updated_at);
+                """
+            )
+            with self._connection:
+                self._prune(self._connection)
+        return self._connection
+
+    def _expired_before(self) -> float:
+        return time.time() - self.max_age if self.max_age is not None else float("-inf")
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        if self.max_age is not None:
+            connection.execute("DELETE FROM message_drafts WHERE updated_at < ?", (self._expired_before(),))
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _write_many(self, drafts: List[Draft], deleted: List[int]) -> None:
+        connection = self._connect()
+        now = time.time()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO message_drafts VALUES (?, ?, ?, ?, ?)",
+                [
+                    (draft.message_id, draft.guild_id, draft.user_id,
+                     json.dumps(draft.embed, separators=(",", ":")), now)
+                    for draft in drafts
+                ],
+            )
+            connection.executemany(
+                "DELETE FROM message_drafts WHERE message_id = ?", [(message_id,) for message_id in deleted]
+            )
+            self._prune(connection)
+
+    def _load(self, message_id: int) -> Optional[Draft]:
+        row = self._connect().execute(
+            "SELECT message_id, guild_id, user_id, embed FROM message_drafts WHERE message_id = ? AND updated_at >= ?",
+            (message_id, self._expired_before()),
+        ).fetchone()
+        if row is None:
+            return None
+        return Draft(row[0], row[1], row[2], json.loads(row[3]))
+
+    async def write_many(self, drafts: List[Draft], deleted: List[int]) -> None:
+        await self._run(self._write_many, drafts, deleted)
+
+    async def load(self, message_id: int) -> Optional[Draft]:
+        return await self._run(self._load, message_id)
+
+    async def close(self) -> None:
+        await super().close()
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+from discord import Embed
+
+from .sections import SECTIONS
+
+__all__ = (
+    "EmbedValidator",
+    "EmbedValidationError",
+)
+
+# https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_COUNT_LIMIT = 25
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+FOOTER_TEXT_LIMIT = 2048
+AUTHOR_NAME_LIMIT = 256
+TOTAL_LIMIT = 6000
+
+LINK_SCHEMES = ("http://", "https://")
+IMAGE_SCHEMES = ("http://", "https://", "attachment://")
+
+
+class EmbedValidationError(ValueError):
+    """
+    Raised when an embed breaks one of Discord's embed limits.
+
+    Attributes:
+        errors (List[str]): A message for every broken limit.
+    """
+
+    def __init__(self, errors: List[str]) -> None:
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def _check_length(errors: List[str], name: str, value: Optional[str], limit: int) -> int:
+    length = len(value) if value else 0
+    if length > limit:
+        errors.append(f"The {name} can't be longer than {limit} characters (it is {length}).")
+    return length
+
+
+def _check_url(errors: List[str], name: str, url: Optional[str], schemes: Tuple[str, ...]) -> bool:
+    if not url:
+        return False
+    if not url.startswith(schemes) or len(url) <= len(url.split("://", 1)[0]) + 3:
+        errors.append(f"The {name} must be a valid url starting with {' or '.join(schemes)}")
+    return True
+
+
+class EmbedValidator:
+    """
+    Checks an embed against Discord's embed limits locally, so an invalid embed is never sent.
+
+    The length and errors of every section are kept, `check` only recomputes the section that was
+    edited and adds up the cached lengths for the 6000 characters total.
+
+    Parameters:
+        embed (discord.Embed): The embed to validate.
+
+    Methods:
+    update(section: str): Recomputes the length and errors of one section.
+    check(section: str): Updates a section and returns every error of the embed.
+    validate(): Raises `EmbedValidationError` if the embed is invalid.
+    """
+
+    def __init__(self, embed: Embed) -> None:
+        self.embed = embed
+        self._lengths: Dict[str, int] = {}
+        self._errors: Dict[str, List[str]] = {}
+        self._has_content: Dict[str, bool] = {}
+        for section in SECTIONS:
+            self.update(section)
+
+    @property
+    def total_length(self) -> int:
+        return sum(self._lengths.values())
+
+    def update(self, section: str) -> None:
+        embed = self.embed
+        errors: List[str] = []
+        length = 0
+        has_content = False
+
+        if section == "author":
+            length = _check_length(errors, "author name", embed.author.name, AUTHOR_NAME_LIMIT)
+            _check_url(errors, "author url", embed.author.url, LINK_SCHEMES)
+            _check_url(errors, "author icon url", embed.author.icon_url, IMAGE_SCHEMES)
+            if (embed.author.url or embed.author.icon_url) and not length:
+                errors.append("The author needs a name to show its url or icon.")
+            has_content = length > 0
+        elif section == "message":
+            length = _check_length(errors, "title", embed.title, TITLE_LIMIT)
+            length += _check_length(errors, "description", embed.description, DESCRIPTION_LIMIT)
+            _check_url(errors, "url", embed.url, LINK_SCHEMES)
+            has_content = length > 0
+        elif section == "thumbnail":
+            has_content = _check_url(errors, "thumbnail url", embed.thumbnail.url, IMAGE_SCHEMES)
+        elif section == "image":
+            has_content = _check_url(errors, "image url", embed.image.url, IMAGE_SCHEMES)
+        elif section == "footer":
+            length = _check_length(errors, "footer text", embed.footer.text, FOOTER_TEXT_LIMIT)
+            _check_url(errors, "footer icon url", embed.footer.icon_url, IMAGE_SCHEMES)
+            if embed.footer.icon_url and not length:
+                errors.append("The footer needs a text to show its icon.")
+            has_content = length > 0
+        elif section == "fields":
+            fields = embed.fields
+            if len(fields) > FIELD_COUNT_LIMIT:
+                errors.append(f"An embed can't have more than {FIELD_COUNT_LIMIT} fields.")
+            for index, field in enumerate(fields, start=1):
+                name_length = _check_length(errors, f"name of field {index}", field.name, FIELD_NAME_LIMIT)
+                value_length = _check_length(errors, f"value of field {index}", field.value, FIELD_VALUE_LIMIT)
+                if not name_length or not value_length:
+                    errors.append(f"Field {index} needs both a name and a value.")
+                length += name_length + value_length
+            has_content = bool(fields)
+
+        self._lengths[section] = length
+        self._errors[section] = errors
+        self._has_content[section] = has_content
+
+    def errors(self) -> List[str]:
+        errors = [error for section in SECTIONS for error in self._errors.get(section, ())]
+        total = self.total_length
+        if total > TOTAL_LIMIT:
+            errors.append(f"An embed can't have more than {TOTAL_LIMIT} characters in total (it has {total}).")
+        if not any(self._has_content.values()):
+            errors.append("An embed can't be empty.")
+        return errors
+
+    def check(self, section: str) -> List[str]:
+        self.update(section)
+        return self.errors()
+
+    def validate(self) -> None:
+        if errors := self.errors():
+            raise EmbedValidationError(errors)
@@ -1 +1,5 @@
-from .minimal import *
\ No newline at end of file
+from .minimal import *
+from .index import *
+from .fuzzy import *
+from .pages import *
+from .slash import *
\ No newline at end of file
@@ -0,0 +1,135 @@
+from __future__ import annotations
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from collections import defaultdict
+from difflib import SequenceMatcher
+from heapq import nlargest
+
+from discord.ext.commands import Command
+
+__all__ = (
+    "FuzzyCommandIndex",
+)
+
+# Matches on a description word count for less than matches on a name or an alias.
+DESCRIPTION_WEIGHT = 0.6
+
+
+def trigrams(term: str) -> FrozenSet[str]:
+    term = f"  {term.lower()} "
+    return frozenset(term[i: i + 3] for i in range(len(term) - 2))
+
+
+class FuzzyCommandIndex:
+    """
+    A trigram index over command names, aliases and description words, used for "did you mean" suggestions.
+
+    Every indexed term is split into trigrams and each trigram points to the terms containing it,
+    so a lookup only looks at the terms that share trigrams with the query instead of every command.
+    The few terms sharing the most trigrams are then ranked by their similarity ratio with the query.
+    The index is kept up to date incrementally, `sync` only adds and removes the commands that changed.
+    The indexed commands are kept, so a qualified name always resolves to the command it was indexed from.
+
+    Methods:
+    add(command: Command): Indexes a command.
+    remove(qualified_name: str): Removes a command from the index.
+    get_command(qualified_name: str): Returns the indexed command.
+    sync(commands: Iterable[Command]): Updates the index to match the given commands.
+    search(query: str, limit: int, threshold: float, prefix: Optional[str]): Returns the best matching qualified names.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[Tuple[str, int]]] = defaultdict(set)
+        self._terms: Dict[str, List[Tuple[str, FrozenSet[str], float]]] = {}
+        self._commands: Dict[str, Command] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, qualified_name: str) -> bool:
+        return qualified_name in self._terms
+
+    def get_command(self, qualified_name: str) -> Optional[Command]:
+        """Returns the indexed command with the qualified name."""
+        return self._commands.get(qualified_name)
+
+    def add(self, command: Command) -> None:
+        name = command.qualified_name
+        if name in self._terms:
+            self.remove(name)
+
+        terms = [(command.name.lower(), 1.0)]
+        terms.extend((alias.lower(), 1.0) for alias in command.aliases)
+        words = {word for word in (command.description or command.short_doc or "").lower().split() if len(word) > 3}
+        terms.extend((word, DESCRIPTION_WEIGHT) for word in words)
+        indexed = [(term, trigrams(term), weight) for term, weight in terms]
+
+        for term_index, (_, grams, _) in enumerate(indexed):
+            for gram in grams:
+                self._postings[gram].add((name, term_index))
+        self._terms[name] = indexed
+        self._commands[name] = command
+
+    def remove(self, qualified_name: str) -> None:
+        terms = self._terms.pop(qualified_name, None)
+        self._commands.pop(qualified_name, None)
+        if terms is None:
+            return
+        for term_index, (_, grams, _) in enumerate(terms):
+            for gram in grams:
+                postings = self._postings[gram]
+                postings.discard((qualified_name, term_index))
+                if not postings:
+                    del self._postings[gram]
+
+    def sync(self, commands: Iterable[Command]) -> None:
+        current = {command.qualified_name: command for command in commands}
+        for name in [name for name in self._commands if name not in current]:
+            self.remove(name)
+        for name, command in current.items():
+            if self._commands.get(name) is not command:
+                self.add(command)
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 3,
+        threshold: float = 0.6,
+        prefix: Optional[str] = None,
+        predicate: Optional[Callable[[str], bool]] = None,
+    ) -> List[str]:
+        """
+        Returns up to `limit` qualified names ranked by their similarity with the query.
+
+        Parameters:
+            query (str): The text to look up.
+            limit (int, optional): The maximum number of results. Default is 3.
+            threshold (float, optional): The minimum similarity (0-1) of a result. Default is 0.6.
+            prefix (str, optional): Only return commands whose qualified name starts with this, e.g. "music " for subcommands.
+            predicate (Callable[[str], bool], optional): Only return commands for which this returns True.
+        """
+        query = query.strip().lower()
+        shared: Dict[Tuple[str, int], int] = defaultdict(int)
+        for gram in trigrams(query):
+            for posting in self._postings.get(gram, ()):
+                shared[posting] += 1
+
+        if prefix is not None:
+            shared = {posting: count for posting, count in shared.items() if posting[0].startswith(prefix)}
+
+        scores: Dict[str, float] = {}
+        matcher = SequenceMatcher(b=query, autojunk=False)
+        for name, term_index in nlargest(limit * 5, shared, key=shared.__getitem__):
+            term, _, weight = self._terms[name][term_index]
+            matcher.set_seq1(term)
+            # The quick ratios are upper bounds of ratio(), most candidates are discarded without computing it.
+            if weight * matcher.real_quick_ratio() < threshold or weight * matcher.quick_ratio() < threshold:
+                continue
+            score = weight * matcher.ratio()
+            if score >= threshold and score > scores.get(name, 0.0):
+                scores[name] = score
+
+        ranked = sorted(scores, key=lambda name: (-scores[name], name))
+        if predicate is not None:
+            ranked = [name for name in ranked if predicate(name)]
+        return ranked[:limit]
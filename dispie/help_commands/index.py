@@ -0,0 +1,123 @@
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from discord.ext.commands import Bot, Command
+
+from dispie.utils import LRUCache
+from .fuzzy import FuzzyCommandIndex
+
+__all__ = (
+    "HelpIndex",
+)
+
+
+def commands_fingerprint(version: int, *groups: Iterable[Any]) -> int:
+    """
+    Returns a fingerprint of the given commands (or cogs), from their qualified names and the `HelpIndex.version`
+    of the bot. It changes whenever one of them is added, removed or replaced, e.g. when an extension is reloaded.
+    """
+    return hash((version,) + tuple(frozenset(item.qualified_name for item in group) for group in groups))
+
+
+def _with_subcommands(command: Command) -> Iterable[Command]:
+    yield command
+    walk = getattr(command, "walk_commands", None)
+    if walk is not None:
+        yield from walk()
+
+
+class HelpIndex:
+    """
+    A cache of prebuilt help pages, keyed by (prefix, scope) where scope is "bot", "cog:<name>" or "group:<qualified name>".
+
+    Every entry is stored with the fingerprint of the commands it was built from, an entry whose commands
+    have changed since (a cog or command was added or removed) is treated as missing and rebuilt.
+    Once attached to a bot, `version` is bumped by every `add_command` and `remove_command` of the bot, which
+    cogs use as well. At most `maxsize` entries are kept, the least recently used ones are evicted.
+
+    Parameters:
+        maxsize (int, optional): The maximum number of cached pages. Default is 256.
+
+    Attributes:
+    fuzzy (FuzzyCommandIndex): The trigram index used for command suggestions.
+    version (int): The number of commands added or removed since the index was attached.
+
+    Methods:
+    attach(bot: Bot): Indexes the commands of the bot and follows the ones added to and removed from it.
+    detach(): Stops following the commands of the bot.
+    get(key: Tuple[str, str], fingerprint: int): Returns the cached value, or None if it is missing or outdated.
+    put(key: Tuple[str, str], fingerprint: int, value: Any): Caches a value.
+    invalidate(scope: Optional[str]): Removes the entries of a scope, or every entry.
+    sync_commands(commands: Iterable[Command]): Brings the fuzzy index up to date with the given commands and returns it.
+        An attached index is kept up to date as commands are added and removed, so this is only needed for subcommands added to a group later.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._entries: LRUCache[Tuple[str, str], Tuple[int, Any]] = LRUCache(maxsize)
+        self.fuzzy: FuzzyCommandIndex = FuzzyCommandIndex()
+        self._fuzzy_fingerprint: Optional[int] = None
+        self.version: int = 0
+        self._bot: Optional[Bot] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def attach(self, bot: Bot) -> None:
+        if self._bot is not None:
+            self.detach()
+        add_command: Callable[[Command], None] = bot.add_command
+        remove_command: Callable[[str], Optional[Command]] = bot.remove_command
+
+        def tracked_add_command(command: Command, /) -> None:
+            add_command(command)
+            self.version += 1
+            for indexed in _with_subcommands(command):
+                self.fuzzy.add(indexed)
+
+        def tracked_remove_command(name: str, /) -> Optional[Command]:
+            command = remove_command(name)
+            if command is not None:
+                self.version += 1
+                for indexed in _with_subcommands(command):
+                    if self.fuzzy.get_command(indexed.qualified_name) is indexed:
+                        self.fuzzy.remove(indexed.qualified_name)
+            return command
+
+        # Set on the instance, so the class and other bots are not affected.
+        bot.add_command = tracked_add_command  # type: ignore
+        bot.remove_command = tracked_remove_command  # type: ignore
+        self._bot = bot
+        self.sync_commands(bot.walk_commands())
+
+    def detach(self) -> None:
+        if self._bot is not None:
+            self._bot.__dict__.pop("add_command", None)
+            self._bot.__dict__.pop("remove_command", None)
+            self._bot = None
+
+    def get(self, key: Tuple[str, str], fingerprint: int) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != fingerprint:
+            self._entries.pop(key)
+            return None
+        return entry[1]
+
+    def put(self, key: Tuple[str, str], fingerprint: int, value: Any) -> None:
+        self._entries.put(key, (fingerprint, value))
+
+    def invalidate(self, scope: Optional[str] = None) -> None:
+        if scope is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[1] == scope]:
+            self._entries.pop(key)
+
+    def sync_commands(self, commands: Iterable[Command]) -> FuzzyCommandIndex:
+        commands = list(commands)
+        fingerprint = commands_fingerprint(self.version, commands)
+        if fingerprint != self._fuzzy_fingerprint:
+            self.fuzzy.sync(commands)
+            self._fuzzy_fingerprint = fingerprint
+        return self.fuzzy
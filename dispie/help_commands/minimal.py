@@ -1,24 +1,81 @@
-from typing import Any, List, Optional, Mapping
+from typing import Any, ClassVar, Iterable, List, Optional, Mapping
+from weakref import WeakKeyDictionary
 from discord.ext import commands
-from discord.ext.commands import Cog, Command, Group
-from discord import Embed, Color, utils
+from discord.ext.commands import Bot, Cog, Command, Group
+from discord import Embed, Color
 from dispie import Paginator
+from .index import HelpIndex, commands_fingerprint
+from .pages import HelpPageSource
 
 __all__ = (
     "MinimalHelpCommand",
 )
 class MinimalHelpCommand(commands.HelpCommand):
+    # discord.py copies the help command for every invocation, so the index is kept per bot instead.
+    _indexes: ClassVar["WeakKeyDictionary[Bot, HelpIndex]"] = WeakKeyDictionary()
+
     def __init__(self, **options: Any) -> None:
         super().__init__(**options)
         self.options = options
         self.inline = options.get("inline") == True
 
-    async def send_bot_help(self, mapping: Mapping[Optional[Cog], List[Command]]) -> None:
+    @property
+    def help_index(self) -> HelpIndex:
+        """The cache of prebuilt help pages of the bot, it is rebuilt automatically when cogs or commands change."""
+        bot = self.context.bot
+        index = self._indexes.get(bot)
+        if index is None:
+            index = self._indexes[bot] = HelpIndex(self.options.get("cache_size", 256))
+            index.attach(bot)
+        return index
+
+    async def get_suggestions(self, query: str, *, prefix: Optional[str] = None) -> List[str]:
+        """
+        Returns the qualified names of the commands that look the most like the query.
+        Only commands the help command would show are suggested: they go through `filter_commands`, so hidden
+        commands and, with `verify_checks`, commands the author can't run are left out.
+        """
+        index = self.help_index.fuzzy
+        limit = self.options.get("suggestions", 3)
+        # A few more candidates are ranked so filtered out commands still leave enough suggestions.
+        names = index.search(query, limit=limit * 3, prefix=prefix)
+        candidates = [command for command in map(index.get_command, names) if command is not None]
+        allowed = set(await self.filter_commands(candidates))
+        return [command.qualified_name for command in candidates if command in allowed][:limit]
+
+    def _with_suggestions(self, message: str, suggestions: List[str]) -> str:
+        if not suggestions:
+            return message
+        return f"{message}\nDid you mean: {', '.join(f'`{self.context.clean_prefix}{name}`' for name in suggestions)}?"
+
+    async def command_not_found(self, string: str) -> str:
+        return self._with_suggestions(super().command_not_found(string), await self.get_suggestions(string))
+
+    async def subcommand_not_found(self, command: Command, string: str) -> str:
+        message = super().subcommand_not_found(command, string)
+        if not isinstance(command, Group):
+            return message
+        return self._with_suggestions(
+            message,
+            await self.get_suggestions(string, prefix=f"{command.qualified_name} ")
+        )
+
+    def _build_command_pages(self, title: str, description: Optional[str], commands: Iterable[Command]) -> HelpPageSource:
+        return HelpPageSource(
+            [command for command in commands if isinstance(command, Command)],
+            title=title,
+            description=description,
+            prefix=self.context.clean_prefix,
+            colour=self.options.get('color') or Color.blurple(),
+            thumbnail_url=self.context.bot.user.display_avatar.url,
+            inline=self.inline,
+        )
+
+    def _build_bot_help(self, mapping: Mapping[Optional[Cog], List[Command]]) -> Embed:
         embed = Embed(title=f"{self.context.bot.user.name}'s help",
                       color=self.options.get('color') or Color.blurple())
         embed.description = self.options.get(
             "description") or f"Total Commands: {len(self.context.bot.commands)}\nPrefix for this server is: `{self.context.clean_prefix}`\nType `{self.context.clean_prefix}help <command | module>` for more info."
-        embed.set_thumbnail(url=self.context.author.display_avatar.url)
         for cog, _commands in mapping.items():
             if not cog:
                 continue
@@ -29,72 +86,47 @@ class MinimalHelpCommand(commands.HelpCommand):
                         f"`{i.qualified_name}`" for i in _commands),
                     inline=self.inline
                 )
+        return embed
+
+    async def send_bot_help(self, mapping: Mapping[Optional[Cog], List[Command]]) -> None:
+        bot = self.context.bot
+        key = (self.context.clean_prefix, "bot")
+        fingerprint = commands_fingerprint(self.help_index.version, bot.commands, bot.cogs.values())
+        cached = self.help_index.get(key, fingerprint)
+        if cached is None:
+            cached = self._build_bot_help(mapping)
+            self.help_index.put(key, fingerprint, cached)
+
+        embed = cached.copy()
+        embed.set_thumbnail(url=self.context.author.display_avatar.url)
         embed.set_footer(
             text=f"Requested by {self.context.author}", icon_url=self.context.author.display_avatar.url)
         await self.context.send(embed=embed)
 
     async def send_cog_help(self, cog: Cog) -> None:
-        embeds = list()
-        fields = list()
-        temp_fields = list()
-        for command in cog.get_commands():
-            if isinstance(command, Command):
-                fields.append([f"{self.context.clean_prefix}{command.qualified_name}",
-                              command.description or 'No description'])
-            if isinstance(command, Group):
-                fields.append([f"{self.context.clean_prefix}{command.qualified_name} (*)",
-                              command.description or 'No description'])
-
-        for index, field in enumerate(fields):
-            temp_fields.append(field)
-            if (index + 1) % 5 == 0 or index == len(fields) - 1:
-                embed = Embed(title=f"{cog.qualified_name.capitalize()} commands",
-                              description=cog.__doc__ or None, color=self.options.get('color') or Color.blurple())
-                embed.set_footer(text=f"(*) has subcommands")
-                embed.set_thumbnail(
-                    url=self.context.bot.user.display_avatar.url)
-                for tf in temp_fields:
-                    embed.add_field(
-                        name=tf[0],
-                        value=f">>> {tf[1]}",
-                        inline=self.inline
-                    )
-                embeds.append(embed)
-                temp_fields.clear()
-
-        pages = Paginator(embeds)
+        _commands = cog.get_commands()
+        key = (self.context.clean_prefix, f"cog:{cog.qualified_name}")
+        fingerprint = commands_fingerprint(self.help_index.version, _commands)
+        source = self.help_index.get(key, fingerprint)
+        if source is None:
+            source = self._build_command_pages(
+                f"{cog.qualified_name.capitalize()} commands", cog.__doc__ or None, _commands)
+            self.help_index.put(key, fingerprint, source)
+
+        pages = Paginator(source)
         await pages.start(self.context)
 
     async def send_group_help(self, group: Group) -> None:
-        embeds = list()
-        fields = list()
-        temp_fields = list()
-        for command in group.commands:
-            if isinstance(command, Command):
-                fields.append([f"{self.context.clean_prefix}{command.qualified_name}",
-                              command.description or 'No description'])
-            if isinstance(command, Group):
-                fields.append([f"{self.context.clean_prefix}{command.qualified_name} (*)",
-                              command.description or 'No description'])
-
-        for index, field in enumerate(fields):
-            temp_fields.append(field)
-            if (index + 1) % 5 == 0 or index == len(fields) - 1:
-                embed = Embed(title=f"{group.qualified_name.capitalize()} commands",
-                              description=group.description or None, color=self.options.get('color') or Color.blurple())
-                embed.set_footer(text=f"(*) has subcommands")
-                embed.set_thumbnail(
-                    url=self.context.bot.user.display_avatar.url)
-                for tf in temp_fields:
-                    embed.add_field(
-                        name=tf[0],
-                        value=f">>> {tf[1]}",
-                        inline=self.inline
-                    )
-                embeds.append(embed)
-                temp_fields.clear()
-
-        pages = Paginator(embeds)
+        _commands = group.commands
+        key = (self.context.clean_prefix, f"group:{group.qualified_name}")
+        fingerprint = commands_fingerprint(self.help_index.version, _commands)
+        source = self.help_index.get(key, fingerprint)
+        if source is None:
+            source = self._build_command_pages(
+                f"{group.qualified_name.capitalize()} commands", group.description or None, _commands)
+            self.help_index.put(key, fingerprint, source)
+
+        pages = Paginator(source)
         await pages.start(self.context)
         return await super().send_group_help(group)
 
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import Dict, Optional, Sequence, Union
+
+from discord import app_commands, Colour, Embed
+from discord.ext.commands import Command, Group
+from dispie.paginator import PageSource
+
+__all__ = (
+    "HelpPageSource",
+)
+
+
+class HelpPageSource(PageSource):
+    """
+    A page source that renders the help embed of a page of commands only when that page is viewed.
+    Rendered pages are kept, so a page is built at most once for as long as the source is cached.
+
+    The source only keeps plain values (no context), so it can stay in the help index between invocations.
+
+    Parameters:
+        commands (Sequence[Union[Command, app_commands.Command, app_commands.Group]]): The commands to list. App commands are shown with a "/" prefix.
+        title (str): The title of every page.
+        description (str, optional): The description of every page.
+        prefix (str): The prefix shown in front of the command names.
+        colour (discord.Colour or int): The colour of the embeds.
+        thumbnail_url (str, optional): The thumbnail of the embeds.
+        inline (bool, optional): Whether the fields are inline. Default is False.
+        per_page (int, optional): The number of commands per page. Default is 5.
+    """
+
+    def __init__(
+        self,
+        commands: Sequence[Union[Command, app_commands.Command, app_commands.Group]],
+        *,
+        title: str,
+        description: Optional[str],
+        prefix: str,
+        colour: Union[Colour, int],
+        thumbnail_url: Optional[str] = None,
+        inline: bool = False,
+        per_page: int = 5,
+    ) -> None:
+        self.commands = commands
+        self.title = title
+        self.description = description
+        self.prefix = prefix
+        self.colour = colour
+        self.thumbnail_url = thumbnail_url
+        self.inline = inline
+        self.per_page = per_page
+        self._pages: Dict[int, Embed] = {}
+
+    def get_max_pages(self) -> int:
+        return max(-(-len(self.commands) // self.per_page), 1)
+
+    def get_page(self, page_number: int) -> Embed:
+        if page_number < 0 or page_number >= self.get_max_pages():
+            raise IndexError(page_number)
+
+        embed = self._pages.get(page_number)
+        if embed is None:
+            embed = self._pages[page_number] = self.format_page(page_number)
+        return embed
+
+    def format_page(self, page_number: int) -> Embed:
+        base = page_number * self.per_page
+        embed = Embed(title=self.title, description=self.description, color=self.colour)
+        embed.set_footer(text=f"(*) has subcommands")
+        if self.thumbnail_url:
+            embed.set_thumbnail(url=self.thumbnail_url)
+        for command in self.commands[base: base + self.per_page]:
+            if isinstance(command, Command):
+                name = f"{self.prefix}{command.qualified_name}"
+            else:
+                name = f"/{command.qualified_name}"
+            if isinstance(command, (Group, app_commands.Group)):
+                name += " (*)"
+            embed.add_field(
+                name=name,
+                value=f">>> {command.description or 'No description'}",
+                inline=self.inline
+            )
+        return embed
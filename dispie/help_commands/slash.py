@@ -0,0 +1,206 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from discord import app_commands, Color, Embed, Interaction, Object
+from discord.ext import commands
+from discord.ext.commands import Bot, Cog
+from dispie import Paginator
+from dispie.utils import LRUCache, PrefixIndex
+from .pages import HelpPageSource
+
+__all__ = (
+    "SlashHelpCommand",
+)
+
+AnyCommand = Union[commands.Command, app_commands.Command, app_commands.Group]
+
+
+class SlashHelpCommand(Cog):
+    """
+    A cog with a `/help` app command that covers both the prefix commands and the app command tree.
+
+    The autocomplete of its `query` option is answered from a `PrefixIndex` built from every command and cog,
+    so a keystroke costs a walk over the typed characters instead of a walk over the commands.
+    The index is built on first use, once this cog and its own app commands are in the tree. The app commands of
+    a guild are indexed separately, the first time help is asked for in that guild. Call `sync` instead of
+    `bot.tree.sync` (or `refresh` after adding commands) to keep it up to date.
+
+    Parameters:
+        bot (discord.ext.commands.Bot): The bot to show the help of.
+        color (discord.Colour, optional): The colour of the help embeds.
+        ephemeral (bool, optional): Whether the help is only shown to the user. Default is True.
+        inline (bool, optional): Whether the embed fields are inline. Default is False.
+    """
+
+    def __init__(self, bot: Bot, **options: Any) -> None:
+        self.bot = bot
+        self.options = options
+        self.inline = options.get("inline") == True
+        self.ephemeral = options.get("ephemeral", True)
+        self._index: Optional[PrefixIndex[app_commands.Choice[str]]] = None
+        self._lookup: Dict[str, str] = {}
+        self._guild_indexes: LRUCache[int, Tuple[PrefixIndex[app_commands.Choice[str]], Dict[str, str]]] = LRUCache(256)
+
+    async def cog_load(self) -> None:
+        # discord.py adds the app commands of a cog to the tree after cog_load, the index is built on first use.
+        self._index = None
+        self._guild_indexes.clear()
+
+    @property
+    def prefix(self) -> str:
+        return self.bot.command_prefix if isinstance(self.bot.command_prefix, str) else ""
+
+    def refresh(self) -> None:
+        """Rebuilds the autocomplete index from the current prefix commands, global app commands and cogs."""
+        entries: List[Tuple[str, app_commands.Choice[str]]] = []
+        lookup: Dict[str, str] = {}
+        add = self._entry_adder(entries, lookup)
+
+        for cog_name, cog in self.bot.cogs.items():
+            if cog.get_commands() or cog.get_app_commands():
+                add(f"Module: {cog_name}", f"cog:{cog_name}", cog_name)
+        for command in self.bot.walk_commands():
+            if command.hidden:
+                continue
+            add(f"{self.prefix}{command.qualified_name}", f"prefix:{command.qualified_name}",
+                command.qualified_name, *(f"{command.full_parent_name} {alias}".strip() for alias in command.aliases))
+        for command in self.bot.tree.walk_commands():
+            add(f"/{command.qualified_name}", f"app:{command.qualified_name}", command.qualified_name)
+
+        self._index = PrefixIndex.build(entries)
+        self._lookup = lookup
+        self._guild_indexes.clear()
+
+    @staticmethod
+    def _entry_adder(entries: List[Tuple[str, app_commands.Choice[str]]], lookup: Dict[str, str]) -> Any:
+        def add(display: str, value: str, *keys: str) -> None:
+            choice = app_commands.Choice(name=display[:100], value=value)
+            for key in keys:
+                words = key.lower().split()
+                # Every word of the name is a key too, so "play" also finds "music play".
+                entries.extend((" ".join(words[i:]), choice) for i in range(len(words)))
+                lookup.setdefault(key.lower(), value)
+        return add
+
+    def _indexes(self, guild_id: Optional[int]) -> List[Tuple[PrefixIndex[app_commands.Choice[str]], Dict[str, str]]]:
+        """Returns the index of the guild's app commands, if it has any, and the global index."""
+        if self._index is None:
+            self.refresh()
+        indexes = [(self._index, self._lookup)]
+        if guild_id is None:
+            return indexes  # type: ignore
+
+        guild_index = self._guild_indexes.get(guild_id)
+        if guild_index is None:
+            entries: List[Tuple[str, app_commands.Choice[str]]] = []
+            lookup: Dict[str, str] = {}
+            add = self._entry_adder(entries, lookup)
+            for command in self.bot.tree.walk_commands(guild=Object(id=guild_id)):
+                add(f"/{command.qualified_name}", f"app:{command.qualified_name}", command.qualified_name)
+            guild_index = (PrefixIndex.build(entries), lookup)
+            self._guild_indexes.put(guild_id, guild_index)
+        if guild_index[1]:
+            indexes.insert(0, guild_index)
+        return indexes  # type: ignore
+
+    async def sync(self, *, guild: Optional[Object] = None) -> List[app_commands.AppCommand]:
+        """Syncs the app command tree and refreshes the autocomplete index."""
+        synced = await self.bot.tree.sync(guild=guild)
+        self.refresh()
+        return synced
+
+    @app_commands.command(name="help", description="Shows help about a command or a module.")
+    @app_commands.describe(query="The command or module you want help with.")
+    async def help(self, interaction: Interaction, query: Optional[str] = None) -> None:
+        if query is None:
+            return await interaction.response.send_message(embed=self.get_bot_help(), ephemeral=self.ephemeral)
+
+        value = query
+        if ":" not in query:
+            key = query.strip().lstrip("/").lower()
+            value = next((lookup[key] for _, lookup in self._indexes(interaction.guild_id) if key in lookup), "")
+        kind, _, name = value.partition(":")
+        if kind == "cog" and (cog := self.bot.get_cog(name)) is not None:
+            pages = Paginator(self.get_cog_help(cog))
+            await pages.start(interaction)
+        elif kind == "prefix" and (command := self.bot.get_command(name)) is not None:
+            await interaction.response.send_message(embed=self.get_command_help(command), ephemeral=self.ephemeral)
+        elif kind == "app" and (app_command := self._get_app_command(name.split()[0], interaction.guild_id)) is not None:
+            for part in name.split()[1:]:
+                app_command = app_command.get_command(part) if isinstance(app_command, app_commands.Group) else None  # type: ignore
+            if app_command is None:
+                return await self._send_not_found(interaction, query)
+            await interaction.response.send_message(embed=self.get_command_help(app_command), ephemeral=self.ephemeral)
+        else:
+            await self._send_not_found(interaction, query)
+
+    def _get_app_command(self, name: str, guild_id: Optional[int]) -> Optional[Union[app_commands.Command, app_commands.Group]]:
+        command = None
+        if guild_id is not None:
+            command = self.bot.tree.get_command(name, guild=Object(id=guild_id))
+        return command or self.bot.tree.get_command(name)  # type: ignore
+
+    @help.autocomplete("query")
+    async def query_autocomplete(self, interaction: Interaction, current: str) -> List[app_commands.Choice[str]]:
+        choices: List[app_commands.Choice[str]] = []
+        for index, _ in self._indexes(interaction.guild_id):
+            choices.extend(choice for choice in index.search(current.lstrip("/"), 25) if choice not in choices)
+        return choices[:25]
+
+    async def _send_not_found(self, interaction: Interaction, query: str) -> None:
+        await interaction.response.send_message(f'No command or module called "{query}" found.', ephemeral=True)
+
+    def get_bot_help(self) -> Embed:
+        embed = Embed(title=f"{self.bot.user.name}'s help", color=self.options.get('color') or Color.blurple())  # type: ignore
+        embed.description = self.options.get(
+            "description") or "Use `/help <command | module>` for more info."
+        for cog_name, cog in self.bot.cogs.items():
+            names = [f"`{self.prefix}{command.qualified_name}`" for command in cog.get_commands() if not command.hidden]
+            names.extend(f"`/{command.qualified_name}`" for command in cog.get_app_commands())
+            if names:
+                embed.add_field(
+                    name=f"{cog.EMOJI if hasattr(cog, 'EMOJI') else ''} {cog_name}",
+                    value=", ".join(names)[:1024],
+                    inline=self.inline
+                )
+        return embed
+
+    def get_cog_help(self, cog: Cog) -> HelpPageSource:
+        _commands: Sequence[Any] = [command for command in cog.get_commands() if not command.hidden]
+        return HelpPageSource(
+            [*_commands, *cog.get_app_commands()],
+            title=f"{cog.qualified_name.capitalize()} commands",
+            description=cog.description or None,
+            prefix=self.prefix,
+            colour=self.options.get('color') or Color.blurple(),
+            thumbnail_url=self.bot.user.display_avatar.url,  # type: ignore
+            inline=self.inline,
+        )
+
+    def get_command_help(self, command: AnyCommand) -> Embed:
+        embed = Embed(
+            title=f"{command.qualified_name.capitalize()} help", color=self.options.get('color') or Color.blurple())
+        embed.description = f'> {command.description or "No description"}'
+        if isinstance(command, commands.Command):
+            usage = f"{self.prefix}{command.qualified_name} {command.signature}"
+            aliases = command.aliases
+        else:
+            parameters = getattr(command, "parameters", [])
+            usage = f"/{command.qualified_name} " + " ".join(
+                f"<{parameter.name}>" if parameter.required else f"[{parameter.name}]" for parameter in parameters
+            )
+            aliases = []
+            for parameter in parameters:
+                embed.add_field(
+                    name=parameter.display_name,
+                    value=f">>> {parameter.description or 'No description'}",
+                    inline=self.inline
+                )
+        embed.insert_field_at(0, name="Usage", value=usage.strip(), inline=False)
+        if aliases:
+            embed.add_field(
+                name='Aliases',
+                value=' | '.join(f"`{i}`" for i in aliases),
+                inline=False
+            )
+        return embed
@@ -1,3 +1,6 @@
 from .client import *
+from .nodes import *
 from .player import *
+from .queue import *
+from .snapshots import *
 from .types import *
\ No newline at end of file
@@ -1,15 +1,28 @@
 from __future__ import annotations
 
-from typing import Literal, Optional
+import asyncio
+import copy
+import random
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+
+import aiohttp
 
 from discord import Embed, Message, TextChannel
 from discord.ext.commands import Bot
-from .types import Node
-from pomice import NodePool, Track
+from dispie.utils import EmbedTemplate, InFlight, LRUCache
+from .nodes import NodeHealth, _HealthNode
+from .player import MusicPlayer
+from .snapshots import PlayerState, SnapshotStore
+from .types import MusicVariables, Node
+from pomice import Filter, LoopMode, NoNodesAvailable, NodeConnectionFailure, NodePool, Playlist, SearchType, Track
+from pomice import Node as PomiceNode
 from logging import getLogger
 
 log = getLogger("Dispie Music Client")
 
+SearchResult = Union[Playlist, List[Track]]
+_MISSING: Any = object()
+
 # https://github.com/freyacodes/Lavalink/releases/download/3.7.5/Lavalink.jar
 
 class MusicClient:
@@ -19,15 +32,50 @@ class MusicClient:
     Parameters:
     - bot: The Discord bot client object.
     - nodes: A list of node objects or a single node object to connect to.
+    - connect_timeout: The number of seconds a node gets to connect, and to answer a health check. Default is 10.
+    - retries: The number of times a node that failed to connect is retried. Default is 3.
+    - backoff: The number of seconds before the first retry, doubled for every next one. Default is 1.
+    - health_interval: The number of seconds between the health checks of the nodes. Default is 30.
+    - max_failures: The number of failed health checks in a row after which a node is unhealthy. Default is 3.
+    - search_cache_size: The number of search results to keep. Default is 1024, 0 disables the cache.
+    - search_ttl: The number of seconds a search result is kept. Default is 900.
+    - empty_search_ttl: The number of seconds a search without results is kept. Default is 60.
     """
 
-    def __init__(self, bot: Bot, nodes: list[Node] | Node) -> None:
+    def __init__(
+        self,
+        bot: Bot,
+        nodes: list[Node] | Node,
+        *,
+        connect_timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        health_interval: float = 30.0,
+        max_failures: int = 3,
+        search_cache_size: int = 1024,
+        search_ttl: float = 900.0,
+        empty_search_ttl: float = 60.0,
+    ) -> None:
         self.bot = bot
         self.nodes = [nodes] if isinstance(nodes, dict) else nodes
+        self.connect_timeout: float = connect_timeout
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.health_interval: float = health_interval
+        self.max_failures: int = max_failures
+        self._health: Dict[str, NodeHealth] = {}
+        self._health_task: Optional[asyncio.Task[None]] = None
+        self.search_cache: LRUCache[Tuple[str, str], Optional[SearchResult]] = LRUCache(search_cache_size, ttl=search_ttl)
+        self.empty_search_ttl: float = empty_search_ttl
+        self.search_requests: int = 0
+        self._searches: InFlight[Tuple[str, str], Optional[SearchResult]] = InFlight()
+        self._snapshot_store: Optional[SnapshotStore] = None
+        self._snapshot_task: Optional[asyncio.Task[None]] = None
         self._node_pool = NodePool()
         self._no_playing_embed = Embed(title="No track playing")
         self._playing_embed = Embed(title="Now playing")
         self._paused_embed = Embed(title="Track paused")
+        self._templates: Dict[str, EmbedTemplate] = {}
 
     @property
     def no_playing_embed(self) -> Embed:
@@ -45,6 +93,7 @@ class MusicClient:
             - value: The new no playing embed.
         """
         self._no_playing_embed = value
+        self._templates.pop("no_playing", None)
 
     @property
     def playing_embed(self) -> Embed:
@@ -62,6 +111,7 @@ class MusicClient:
         - value: The new playing embed.
         """
         self._playing_embed = value
+        self._templates.pop("playing", None)
 
     @property
     def paused_embed(self) -> Embed:
@@ -79,6 +129,7 @@ class MusicClient:
         - value: The new paused embed.
         """
         self._paused_embed = value
+        self._templates.pop("paused", None)
 
     @property
     def node_pool(self) -> NodePool:
@@ -112,6 +163,29 @@ class MusicClient:
         }[player_type]
 
 
+    def render_player_embed(
+        self,
+        player_type: Literal["no_playing", "playing", "paused"],
+        track: Optional[Track] = None,
+        **variables: Any,
+    ) -> Embed:
+        """
+        Renders the embed for the player, with the `MusicVariables` placeholders filled in.
+        The embed is compiled into an `EmbedTemplate` the first time it is rendered, assign the embed again after editing it in place to recompile it.
+
+        Parameters:
+        - player_type: Type of the player.
+        - track: The track the variables are taken from.
+        - variables: Extra variables, they override the ones of the track.
+        """
+        template = self._templates.get(player_type)
+        if template is None:
+            template = self._templates[player_type] = EmbedTemplate(self.get_player_embed(player_type))
+        if track is not None:
+            variables = {**MusicVariables.from_track(track), **variables}
+        return template.render(variables)
+
+
     def get_message(self, message_id: int, channel_id: int) -> Optional[Message]:
         if (mable := self.bot.get_partial_messageable(channel_id)):
             if (message := mable.get_partial_message(message_id)):
@@ -163,13 +237,320 @@ class MusicClient:
         """
         # TODO: Implement track end handling logic
 
-    async def start_nodes(self):
-        for nodes in self.nodes:
-            node = await self._node_pool.create_node(
-                bot=self.bot,
-                host=nodes.get("host"),
-                port=nodes.get("port"),
-                password=nodes.get("password"),
-                identifier=nodes.get("identifier")
+    async def _connect_node(self, config: Node) -> PomiceNode:
+        # `NodePool.create_node` can't create a `_HealthNode` or clean up a failed node, so this does what it does.
+        # It relies on pomice internals, which is why requirements.txt pins the pomice version.
+        node = _HealthNode(
+            pool=NodePool,
+            bot=self.bot,
+            host=config.get("host"),
+            port=config.get("port"),
+            password=config.get("password"),
+            identifier=config.get("identifier"),
+        )
+        try:
+            await node.connect()
+        except BaseException:
+            # A node that didn't connect still has its listener and session, they are removed so retries don't pile up.
+            self.bot.remove_listener(node._update_handler, "on_socket_response")
+            if node._session is not None:
+                await node._session.close()
+            raise
+        NodePool._nodes[node._identifier] = node
+        return node
+
+    async def _start_node(self, config: Node) -> PomiceNode:
+        identifier = config.get("identifier")
+        attempt = 0
+        while True:
+            try:
+                node = await asyncio.wait_for(self._connect_node(config), self.connect_timeout)
+                break
+            except (NodeConnectionFailure, asyncio.TimeoutError, aiohttp.ClientError, OSError) as error:
+                if attempt >= self.retries:
+                    raise
+                # The jitter keeps nodes that failed together from being retried together.
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                attempt += 1
+                log.warning(f"{identifier} failed to connect ({str(error) or 'timed out'}), retrying in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+
+        self._health.setdefault(identifier, NodeHealth(identifier))
+        log.info(f"{identifier} has been created.")
+        return node
+
+    async def start_nodes(self) -> List[PomiceNode]:
+        """
+        Connects to every node at the same time and starts the health checks.
+        Every node gets `connect_timeout` seconds per attempt and is retried `retries` times with an exponential backoff.
+        Nodes that are already connected are skipped, so this can be called again, e.g. from `on_ready`.
+        Returns the nodes that connected.
+        """
+        configs = [config for config in self.nodes if config.get("identifier") not in NodePool._nodes]
+        results = await asyncio.gather(*(self._start_node(config) for config in configs), return_exceptions=True)
+        nodes = []
+        for config, result in zip(configs, results):
+            if isinstance(result, BaseException):
+                log.error(f"{config.get('identifier')} could not be created: {result!r}")
+            else:
+                nodes.append(result)
+
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+        return nodes
+
+    async def stop_nodes(self) -> None:
+        """Stops the health checks and disconnects every node of the client."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for identifier in list(self._health):
+            node = NodePool._nodes.get(identifier)
+            if node is not None:
+                await node.disconnect()
+        self._health.clear()
+
+    async def _check_node(self, node: PomiceNode, health: NodeHealth) -> None:
+        if not node.is_connected or not node._available:
+            health.failures += 1
+            return
+        try:
+            stats = await asyncio.wait_for(node.send(method="GET", path="stats"), self.connect_timeout)
+        except Exception as error:
+            health.failures += 1
+            log.warning(f"Health check of {health.identifier} failed: {error!r}")
+            return
+        if isinstance(node, _HealthNode) and node.last_stats is not None:
+            # The frame stats are only sent over the websocket.
+            stats = {**stats, "frameStats": node.last_stats.get("frameStats")}
+        health.update(stats)
+
+    async def check_nodes(self) -> None:
+        """Updates the health of every node at the same time."""
+        checks = []
+        for identifier, health in self._health.items():
+            node = NodePool._nodes.get(identifier)
+            if node is None:
+                health.failures += 1
+            else:
+                checks.append(self._check_node(node, health))
+        await asyncio.gather(*checks)
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                await self.check_nodes()
+            except Exception:
+                log.exception("Checking the health of the nodes failed.")
+            await asyncio.sleep(self.health_interval)
+
+    @property
+    def node_health(self) -> Dict[str, NodeHealth]:
+        """Returns the health of every node of the client, by identifier."""
+        return dict(self._health)
+
+    def get_best_node(self) -> PomiceNode:
+        """
+        Returns the least loaded node for a new player.
+        Healthy nodes come first, then the ones with the fewest failed health checks, then the lowest `NodeHealth.penalty`.
+        The players of this bot are counted as they are created, so new players are spread before the next stats arrive.
+        """
+        best: Optional[PomiceNode] = None
+        best_key: Optional[Tuple[bool, int, float]] = None
+        for identifier, health in self._health.items():
+            node = NodePool._nodes.get(identifier)
+            if node is None or not node._available:
+                continue
+            key = (
+                health.failures >= self.max_failures,
+                health.failures,
+                health.penalty + max(len(node.players) - health.players, 0),
             )
-            log.info(f"{node._identifier} has been created.")
+            if best_key is None or key < best_key:
+                best, best_key = node, key
+        if best is None:
+            raise NoNodesAvailable("There are no nodes available.")
+        return best
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Returns the query the search cache is keyed by: surrounding whitespace is removed, and search terms are
+        case folded with their whitespace collapsed. Urls are only stripped, their paths are case sensitive.
+        """
+        query = query.strip()
+        if "://" in query:
+            return query
+        return " ".join(query.casefold().split())
+
+    async def _search_and_cache(
+        self, node: PomiceNode, key: Tuple[str, str], query: str, search_type: Optional[SearchType]
+    ) -> Optional[SearchResult]:
+        self.search_requests += 1
+        # Lavalink gets the query as it was typed, only the cache key is normalized.
+        result = await node.get_tracks(query.strip(), search_type=search_type)
+        self.search_cache.put(key, result or None, ttl=None if result else self.empty_search_ttl)
+        return result or None
+
+    async def _search(self, node: PomiceNode, query: str, search_type: Optional[SearchType]) -> Optional[SearchResult]:
+        key = (search_type.value if search_type is not None else "", self.normalize_query(query))
+        # Empty results are cached as None, so a miss is told apart with a sentinel.
+        result = self.search_cache.get(key, _MISSING)
+        if result is not _MISSING:
+            return result
+        return await self._searches.run(key, lambda: self._search_and_cache(node, key, query, search_type))
+
+    async def search(
+        self,
+        query: str,
+        *,
+        requester: Optional[Any] = None,
+        search_type: Optional[SearchType] = SearchType.ytsearch,
+        node: Optional[PomiceNode] = None,
+    ) -> Optional[SearchResult]:
+        """
+        Searches tracks through the search cache. Returns the tracks or playlist found, or None if nothing was found.
+
+        Queries that only differ in case and whitespace share one cache entry, and identical searches that run at the
+        same time share one Lavalink request. Every call gets its own copies of the tracks, with the requester set.
+
+        Parameters:
+        - query: The search terms or url.
+        - requester: The member the tracks are requested by.
+        - search_type: The search type of pomice, for search terms. Default is a YouTube search.
+        - node: The node to search on. Defaults to `get_best_node()`.
+        """
+        result = await self._search(node or self.get_best_node(), query, search_type)
+        if result is None:
+            return None
+        return _copy_result(result, requester)
+
+    @property
+    def search_stats(self) -> Dict[str, Any]:
+        """
+        Returns the search cache stats, the number of Lavalink searches made, the number of searches that waited on one
+        already in flight, and the number of searches in flight.
+        """
+        return {
+            **self.search_cache.stats,
+            "requests": self.search_requests,
+            "shared": self._searches.shared,
+            "inflight": len(self._searches),
+        }
+
+    @property
+    def players(self) -> List[MusicPlayer]:
+        """Returns the music players of every node."""
+        return [
+            player for node in NodePool._nodes.values() for player in node.players.values() if isinstance(player, MusicPlayer)
+        ]
+
+    async def _snapshot_loop(self, store: SnapshotStore, interval: float) -> None:
+        while True:
+            try:
+                await store.save(self.players)
+            except Exception:
+                log.exception("Saving the player snapshots failed.")
+            await asyncio.sleep(interval)
+
+    def start_snapshots(self, store: SnapshotStore, *, interval: float = 5.0) -> None:
+        """
+        Saves the state of the players to the store every `interval` seconds.
+        Only the players that changed are written, so this is cheap enough for short intervals.
+        """
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+        self._snapshot_store = store
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop(store, interval))
+
+    async def stop_snapshots(self) -> None:
+        """Stops the snapshots and saves the players one last time, e.g. before a deploy."""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            self._snapshot_task = None
+        if self._snapshot_store is not None:
+            await self._snapshot_store.save(self.players)
+            self._snapshot_store = None
+
+    async def _restore_player(self, state: PlayerState, semaphore: asyncio.Semaphore) -> Optional[MusicPlayer]:
+        guild = self.bot.get_guild(state.guild_id)
+        channel = guild.get_channel(state.channel_id) if guild is not None else None
+        if guild is None or channel is None or guild.voice_client is not None:
+            return None
+
+        node = NodePool._nodes.get(state.node) if state.node is not None else None
+        health = self._health.get(state.node) if state.node is not None else None
+        if node is None or not node._available or health is None or health.failures >= self.max_failures:
+            node = self.get_best_node()
+
+        async with semaphore:
+            player = await channel.connect(cls=MusicPlayer(self.bot, channel, node=node))  # type: ignore
+
+        for track, requester_id in state.queue:
+            track.requester = guild.get_member(requester_id) if requester_id is not None else None
+            player.queue.put(track, requester_id=requester_id)
+        if state.loop_mode is not None:
+            player.queue.set_loop_mode(LoopMode(state.loop_mode))
+        if state.loop_mode == LoopMode.QUEUE.value and state.current is not None and state.current[0] in player.queue:
+            # A looping queue keeps the current track, the loop goes on after it.
+            queue = player.queue
+            queue.jump(queue[(queue.find_position(state.current[0]) + 1) % len(queue)])
+        player.dj = guild.get_member(state.dj_id) if state.dj_id is not None else None
+        if state.controller_id is not None and state.controller_channel_id is not None:
+            player.controller = self.get_message(state.controller_id, state.controller_channel_id)
+
+        if state.volume != player.volume:
+            await player.set_volume(state.volume)
+        for tag, payload in state.filters:
+            restored = Filter(tag=tag)
+            restored.payload = payload
+            await player.add_filter(restored)
+        if state.current is not None:
+            track, requester_id = state.current
+            track.requester = guild.get_member(requester_id) if requester_id is not None else None
+            await player.play(track, start=state.position)
+            if state.paused:
+                await player.set_pause(True)
+        return player
+
+    async def restore_players(self, store: SnapshotStore, *, concurrency: int = 10) -> List[MusicPlayer]:
+        """
+        Restores the players saved in the store, e.g. once in `on_ready` after `start_nodes`.
+        The tracks are rebuilt from the saved track info, so nothing is searched again. Players go back to their node if it
+        is healthy, otherwise to `get_best_node()`. At most `concurrency` voice connections are made at the same time.
+        Returns the players that were restored.
+        """
+        states = await store.load()
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(*(self._restore_player(state, semaphore) for state in states), return_exceptions=True)
+        players = []
+        for state, result in zip(states, results):
+            if isinstance(result, BaseException):
+                log.error(f"The player of guild {state.guild_id} could not be restored: {result!r}")
+            elif result is not None:
+                players.append(result)
+        store.restored(player.guild.id for player in players)
+        log.info(f"Restored {len(players)} of {len(states)} players.")
+        return players
+
+
+def _copy_track(track: Track, requester: Optional[Any]) -> Track:
+    new = copy.copy(track)
+    if track.original is track:
+        new.original = new
+    new.requester = requester
+    new.ctx = None
+    return new
+
+
+def _copy_result(result: SearchResult, requester: Optional[Any]) -> SearchResult:
+    # Cached tracks are shared between guilds, the player changes the tracks it plays.
+    if not isinstance(result, Playlist):
+        return [_copy_track(track, requester) for track in result]
+    playlist = copy.copy(result)
+    playlist.tracks = [_copy_track(track, requester) for track in result.tracks]
+    for track in playlist.tracks:
+        track.playlist = playlist
+    if result.selected_track is not None:
+        playlist.selected_track = playlist.tracks[result.tracks.index(result.selected_track)]
+    return playlist
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+from pomice import Node as PomiceNode
+
+
+__all__ = ("NodeHealth",)
+
+
+class NodeHealth:
+    """
+    The load of a Lavalink node, scored from the stats it sends.
+
+    The penalty follows the one used by the Lavalink clients: every playing player adds 1, the cpu load adds an
+    exponential penalty, and so do the frames that were nulled or missing (the frame deficit).
+    A node that doesn't answer the health checks is marked unhealthy and is only used when no healthy node is left.
+
+    Attributes:
+        identifier (str): The identifier of the node.
+        players (int): The number of players on the node.
+        playing (int): The number of players that are playing.
+        cpu (float): The system cpu load of the node, from 0 to 1.
+        frames_nulled (int): The average number of nulled frames per minute.
+        frames_deficit (int): The average number of missing frames per minute.
+        failures (int): The number of health checks that failed in a row.
+        updated (float, optional): The `time.monotonic()` of the last stats update.
+    """
+
+    __slots__ = ("identifier", "players", "playing", "cpu", "frames_nulled", "frames_deficit", "failures", "updated")
+
+    def __init__(self, identifier: str) -> None:
+        self.identifier: str = identifier
+        self.players: int = 0
+        self.playing: int = 0
+        self.cpu: float = 0.0
+        self.frames_nulled: int = 0
+        self.frames_deficit: int = 0
+        self.failures: int = 0
+        self.updated: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f"<NodeHealth identifier={self.identifier!r} penalty={self.penalty:.2f} failures={self.failures}>"
+
+    def update(self, stats: Dict[str, Any]) -> None:
+        """Updates the health from a Lavalink stats payload."""
+        self.players = stats.get("players") or 0
+        self.playing = stats.get("playingPlayers") or 0
+        self.cpu = (stats.get("cpu") or {}).get("systemLoad") or 0.0
+        # The stats of the REST api don't have frame stats, the last ones from the websocket are kept.
+        frames = stats.get("frameStats")
+        if frames:
+            self.frames_nulled = frames.get("nulled") or 0
+            self.frames_deficit = frames.get("deficit") or 0
+        self.failures = 0
+        self.updated = time.monotonic()
+
+    @property
+    def penalty(self) -> float:
+        """The load score of the node, lower is better."""
+        cpu = 1.05 ** (100 * self.cpu) * 10 - 10
+        deficit = 1.03 ** (500 * self.frames_deficit / 3000) * 600 - 600 if self.frames_deficit > 0 else 0.0
+        nulled = (1.03 ** (500 * self.frames_nulled / 3000) * 300 - 300) * 2 if self.frames_nulled > 0 else 0.0
+        return self.playing + cpu + deficit + nulled
+
+
+class _HealthNode(PomiceNode):
+    # pomice only keeps part of the stats payload, this node keeps the whole last one for `NodeHealth`.
+    # `_handle_ws_msg` is internal to pomice, requirements.txt pins the version it was checked against.
+    __slots__ = ("last_stats",)
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.last_stats: Optional[Dict[str, Any]] = None
+        super().__init__(**kwargs)
+
+    async def _handle_ws_msg(self, data: dict) -> None:
+        if data.get("op") == "stats":
+            self.last_stats = data
+        await super()._handle_ws_msg(data)
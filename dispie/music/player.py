@@ -5,6 +5,8 @@ import math
 
 from discord import Message, Member, Interaction
 
+from .queue import TrackQueue
+
 
 __all__ = ("MusicPlayer",)
 
@@ -14,7 +16,7 @@ class MusicPlayer(pomice.Player):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.queue = pomice.Queue()
+        self.queue = TrackQueue()
         self.controller: Message | None = None
         self.context: Interaction | None = None
         self.dj: Member | None = None
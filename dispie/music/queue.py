@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Union, overload
+
+from pomice import LoopMode, QueueEmpty, QueueException, QueueFull, Track
+
+
+__all__ = ("QueueEntry", "TrackQueue")
+
+
+class QueueEntry:
+    """A track in a `TrackQueue`, with the id of the member who requested it."""
+
+    __slots__ = ("track", "requester_id")
+
+    def __init__(self, track: Track, requester_id: Optional[int]) -> None:
+        self.track = track
+        self.requester_id = requester_id
+
+    def __repr__(self) -> str:
+        return f"<QueueEntry track={self.track!r} requester_id={self.requester_id}>"
+
+
+class TrackQueue:
+    """
+    A track queue for large queues, with the same interface and loop semantics as `pomice.Queue`.
+
+    The tracks are kept in a list that is consumed from the front with a moving head, so getting the next track doesn't
+    shift the whole queue. Next to the list, the queue keeps the number of tracks per identifier and the entries of every
+    requester, so duplicate checks, per requester counts and lookups don't scan the queue. Commands that remove many
+    tracks (`remove_requester`, `remove_duplicates`) rebuild the list in a single pass.
+
+    Like `pomice.Queue`, the queue is kept while it loops with `LoopMode.QUEUE`: `get` moves the current track through
+    it and wraps around, and `disable_loop` drops the tracks up to the current one.
+
+    Parameters:
+        max_size (int, optional): The maximum number of tracks in the queue.
+        overflow (bool, optional): Whether adding a track to a full queue drops the last track, instead of raising `QueueFull`. Default is True, like `pomice.Queue`.
+
+    Methods:
+    put(track), put_at_index(index, track), put_at_front(track), extend(tracks, atomic=True): Add tracks.
+    get(): Returns the next track, following the loop mode. It is removed unless the queue loops.
+    jump(track): Makes the track the next one returned by `get`.
+    pop(): Removes and returns the last track.
+    remove(track), remove_at(index), move(index, to): Remove or move one track.
+    remove_requester(requester_id), remove_duplicates(): Remove many tracks in one pass.
+    has_identifier(identifier), count_requester(requester_id), tracks_of(requester_id): Indexed lookups.
+    shuffle(): Shuffles the queue in place.
+    clear_track_filters(): Removes the filters of every track.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, *, overflow: bool = True) -> None:
+        self.max_size: Optional[int] = max_size
+        self._overflow: bool = overflow
+        self._entries: List[QueueEntry] = []
+        self._head: int = 0
+        self._identifiers: Dict[str, int] = {}
+        self._requesters: Dict[Optional[int], Dict[QueueEntry, None]] = {}
+        self._current_item: Optional[Track] = None
+        # Where the current track was last found while looping the queue, checked before the queue is searched.
+        self._cursor: int = 0
+        self._loop_mode: Optional[LoopMode] = None
+        self._version: int = 0
+
+    def __repr__(self) -> str:
+        return f"<TrackQueue size={len(self)} max_size={self.max_size}>"
+
+    def __str__(self) -> str:
+        return str([f"'{track}'" for track in self])
+
+    def __call__(self, track: Track) -> None:
+        self.put(track)
+
+    def __len__(self) -> int:
+        return len(self._entries) - self._head
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Track]:
+        entries = self._entries
+        for position in range(self._head, len(entries)):
+            yield entries[position].track
+
+    def __reversed__(self) -> Iterator[Track]:
+        entries = self._entries
+        for position in range(len(entries) - 1, self._head - 1, -1):
+            yield entries[position].track
+
+    def __contains__(self, track: Track) -> bool:
+        if track.identifier not in self._identifiers:
+            return False
+        return any(entry.track is track or entry.track == track for entry in self._live())
+
+    @overload
+    def __getitem__(self, index: int) -> Track:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Track]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Track, List[Track]]:
+        if isinstance(index, slice):
+            return [entry.track for entry in self._live()[index]]
+        return self._entries[self._position(index)].track
+
+    def __setitem__(self, index: int, track: Track) -> None:
+        """Inserts the track at the index, like `pomice.Queue`."""
+        if not isinstance(index, int):
+            raise ValueError("'int' type required.'")
+        self.put_at_index(index, track)
+
+    def __delitem__(self, index: int) -> None:
+        self.remove_at(index)
+
+    def __add__(self, other: Iterable[Track]) -> TrackQueue:
+        """Returns a new queue with the tracks of both."""
+        if not isinstance(other, Iterable):
+            raise TypeError(f"Adding with the '{type(other)}' type is not supported.")
+        queue = self.copy()
+        queue.extend(other)
+        return queue
+
+    def __iadd__(self, other: Union[Iterable[Track], Track]) -> TrackQueue:
+        if isinstance(other, Track):
+            self.put(other)
+        elif isinstance(other, Iterable):
+            self.extend(other)
+        else:
+            raise TypeError(f"Adding '{type(other)}' type to the queue is not supported.")
+        return self
+
+    def _live(self) -> List[QueueEntry]:
+        self._compact(force=True)
+        return self._entries
+
+    def _position(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Queue index out of range.")
+        return self._head + index
+
+    def _compact(self, force: bool = False) -> None:
+        if self._head and (force or self._head > 1024 and self._head * 2 > len(self._entries)):
+            del self._entries[:self._head]
+            self._head = 0
+
+    def _entry(self, track: Track, requester_id: Optional[int]) -> QueueEntry:
+        if not isinstance(track, Track):
+            raise TypeError("Only pomice.Track objects are supported.")
+        if requester_id is None and track.requester is not None:
+            requester_id = track.requester.id
+        return QueueEntry(track, requester_id)
+
+    def _check_size(self, added: int = 1) -> None:
+        if self.max_size is not None and len(self) + added > self.max_size:
+            raise QueueFull(f"Queue max_size of {self.max_size} has been reached.")
+
+    def _make_room(self) -> None:
+        if self.is_full:
+            if not self._overflow:
+                raise QueueFull(f"Queue max_size of {self.max_size} has been reached.")
+            self.pop()
+
+    def _current_position(self) -> int:
+        current = self._current_item
+        if current is None:
+            return -1
+        if 0 <= self._cursor < len(self) and self._entries[self._head + self._cursor].track is current:
+            return self._cursor
+        try:
+            self._cursor = self.find_position(current)
+        except ValueError:
+            return -1
+        return self._cursor
+
+    def _index_entry(self, entry: QueueEntry) -> None:
+        self._version += 1
+        identifier = entry.track.identifier
+        self._identifiers[identifier] = self._identifiers.get(identifier, 0) + 1
+        entries = self._requesters.get(entry.requester_id)
+        if entries is None:
+            entries = self._requesters[entry.requester_id] = {}
+        entries[entry] = None
+
+    def _unindex_entry(self, entry: QueueEntry) -> None:
+        self._version += 1
+        identifier = entry.track.identifier
+        count = self._identifiers[identifier] - 1
+        if count:
+            self._identifiers[identifier] = count
+        else:
+            del self._identifiers[identifier]
+        entries = self._requesters[entry.requester_id]
+        del entries[entry]
+        if not entries:
+            del self._requesters[entry.requester_id]
+
+    def _rebuild(self, entries: List[QueueEntry]) -> None:
+        self._entries, self._head = entries, 0
+        self._version += 1
+        self._identifiers.clear()
+        self._requesters.clear()
+        for entry in entries:
+            self._index_entry(entry)
+
+    @property
+    def count(self) -> int:
+        return len(self)
+
+    @property
+    def size(self) -> int:
+        return len(self)
+
+    @property
+    def is_empty(self) -> bool:
+        return not len(self)
+
+    @property
+    def is_full(self) -> bool:
+        return self.max_size is not None and len(self) >= self.max_size
+
+    @property
+    def is_looping(self) -> bool:
+        return self._loop_mode is not None
+
+    @property
+    def loop_mode(self) -> Optional[LoopMode]:
+        return self._loop_mode
+
+    @property
+    def version(self) -> int:
+        """A number that changes whenever the tracks or the loop mode change, so snapshots can skip unchanged queues."""
+        return self._version
+
+    def entries(self) -> List[QueueEntry]:
+        """Returns the entries of the queue, with the requester ids, in order."""
+        return list(self._live())
+
+    def get_queue(self) -> List[Track]:
+        return [entry.track for entry in self._live()]
+
+    def put(self, track: Track, *, requester_id: Optional[int] = None) -> None:
+        entry = self._entry(track, requester_id)
+        self._make_room()
+        self._entries.append(entry)
+        self._index_entry(entry)
+
+    def put_at_index(self, index: int, track: Track, *, requester_id: Optional[int] = None) -> None:
+        entry = self._entry(track, requester_id)
+        self._make_room()
+        if index < 0:
+            index += len(self)
+        self._entries.insert(self._head + max(min(index, len(self)), 0), entry)
+        self._index_entry(entry)
+
+    def put_at_front(self, track: Track, *, requester_id: Optional[int] = None) -> None:
+        if self._head:
+            entry = self._entry(track, requester_id)
+            self._make_room()
+            self._head -= 1
+            self._entries[self._head] = entry
+            self._index_entry(entry)
+        else:
+            self.put_at_index(0, track, requester_id=requester_id)
+
+    def extend(self, tracks: Iterable[Track], *, atomic: bool = True, requester_id: Optional[int] = None) -> None:
+        """
+        Adds the tracks to the end of the queue. With `atomic`, no track is added if one of them isn't a track or if
+        they don't fit in a queue that doesn't overflow. Otherwise as many tracks as possible are added.
+        """
+        if not atomic:
+            for track in tracks:
+                self.put(track, requester_id=requester_id)
+            return
+
+        entries = [self._entry(track, requester_id) for track in tracks]
+        if self._overflow:
+            for entry in entries:
+                self._make_room()
+                self._entries.append(entry)
+                self._index_entry(entry)
+            return
+        self._check_size(len(entries))
+        self._entries.extend(entries)
+        for entry in entries:
+            self._index_entry(entry)
+
+    def get(self) -> Track:
+        """
+        Returns the next track. With `LoopMode.TRACK` the current track is returned again, with `LoopMode.QUEUE` the
+        track after the current one is returned and the queue is kept. Otherwise the track is removed from the queue.
+        """
+        if self._loop_mode == LoopMode.TRACK and self._current_item is not None:
+            return self._current_item
+        if self.is_empty:
+            raise QueueEmpty("No items in the queue.")
+
+        if self._loop_mode == LoopMode.QUEUE:
+            self._cursor = (self._current_position() + 1) % len(self)
+            self._current_item = self._entries[self._head + self._cursor].track
+            return self._current_item
+
+        entry = self._entries[self._head]
+        self._entries[self._head] = None  # type: ignore
+        self._head += 1
+        self._unindex_entry(entry)
+        self._compact()
+        self._current_item = entry.track
+        return entry.track
+
+    def jump(self, track: Track) -> None:
+        """
+        Makes the track the next one returned by `get`. When the queue isn't looping, the tracks before it are removed,
+        when it loops the current track is moved to the track before it.
+        """
+        if self._loop_mode == LoopMode.TRACK:
+            raise QueueException("Jumping the queue whilst looping a track is not allowed.")
+
+        index = self.find_position(track)
+        if self._loop_mode == LoopMode.QUEUE:
+            self._cursor = (index - 1) % len(self)
+            self._current_item = self._entries[self._head + self._cursor].track
+            return
+        for position in range(self._head, self._head + index):
+            self._unindex_entry(self._entries[position])
+        del self._entries[self._head:self._head + index]
+
+    def pop(self) -> Track:
+        """Removes and returns the last track."""
+        if self.is_empty:
+            raise QueueEmpty("No items in the queue.")
+        entry = self._entries.pop()
+        self._unindex_entry(entry)
+        return entry.track
+
+    def remove_at(self, index: int) -> Track:
+        entry = self._entries.pop(self._position(index))
+        self._unindex_entry(entry)
+        return entry.track
+
+    def find_position(self, track: Track) -> int:
+        if track.identifier in self._identifiers:
+            for position, entry in enumerate(self._live()):
+                if entry.track is track:
+                    return position
+            for position, entry in enumerate(self._entries):
+                if entry.track == track:
+                    return position
+        raise ValueError("Track is not in the queue.")
+
+    def remove(self, track: Track) -> None:
+        self.remove_at(self.find_position(track))
+
+    def move(self, index: int, to: int) -> None:
+        """Moves the track at `index` to the position `to`."""
+        entry = self._entries.pop(self._position(index))
+        self._entries.insert(self._head + max(min(to, len(self)), 0), entry)
+        self._version += 1
+
+    def has_identifier(self, identifier: str) -> bool:
+        """Whether a track with the identifier is in the queue."""
+        return identifier in self._identifiers
+
+    def count_identifier(self, identifier: str) -> int:
+        return self._identifiers.get(identifier, 0)
+
+    def count_requester(self, requester_id: Optional[int]) -> int:
+        return len(self._requesters.get(requester_id, ()))
+
+    def tracks_of(self, requester_id: Optional[int]) -> List[Track]:
+        """Returns the tracks requested by a member, in no particular order."""
+        return [entry.track for entry in self._requesters.get(requester_id, ())]
+
+    def remove_requester(self, requester_id: Optional[int]) -> int:
+        """Removes every track requested by a member. Returns the number of removed tracks."""
+        removed = self.count_requester(requester_id)
+        if removed:
+            self._rebuild([entry for entry in self._live() if entry.requester_id != requester_id])
+        return removed
+
+    def remove_duplicates(self) -> int:
+        """Removes every track whose identifier is already earlier in the queue. Returns the number of removed tracks."""
+        if len(self._identifiers) == len(self):
+            return 0
+        seen = set()
+        entries = []
+        for entry in self._live():
+            if entry.track.identifier not in seen:
+                seen.add(entry.track.identifier)
+                entries.append(entry)
+        removed = len(self) - len(entries)
+        self._rebuild(entries)
+        return removed
+
+    def shuffle(self) -> None:
+        """Shuffles the queue in place."""
+        random.shuffle(self._live())
+        self._version += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._head = 0
+        self._identifiers.clear()
+        self._requesters.clear()
+        self._version += 1
+
+    def copy(self) -> TrackQueue:
+        queue = self.__class__(max_size=self.max_size, overflow=self._overflow)
+        queue._rebuild([QueueEntry(entry.track, entry.requester_id) for entry in self._live()])
+        queue._loop_mode = self._loop_mode
+        return queue
+
+    def clear_track_filters(self) -> None:
+        """Removes the filters of every track in the queue."""
+        for entry in self._live():
+            entry.track.filters = None
+
+    def set_loop_mode(self, mode: LoopMode) -> None:
+        """Sets the loop mode. With `LoopMode.QUEUE`, the current track is put back in front of the queue if it isn't in it."""
+        self._loop_mode = mode
+        if mode == LoopMode.QUEUE and self._current_item is not None and self._current_position() < 0:
+            entry = self._entry(self._current_item, None)
+            self._entries.insert(self._head, entry)
+            self._index_entry(entry)
+            self._cursor = 0
+        self._version += 1
+
+    def disable_loop(self) -> None:
+        """Disables the loop. When the queue was looping, the tracks up to the current one are removed."""
+        if not self._loop_mode:
+            raise QueueException("Queue loop is already disabled.")
+        if self._loop_mode == LoopMode.QUEUE:
+            position = self._current_position()
+            if position >= 0:
+                self._rebuild(self._live()[position + 1:])
+        self._loop_mode = None
+        self._version += 1
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from pomice import Player, Track, TrackType
+
+from .queue import TrackQueue
+
+
+__all__ = ("PlayerState", "SnapshotStore")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    guild_id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    node TEXT,
+    current TEXT,
+    current_requester INTEGER,
+    position INTEGER NOT NULL DEFAULT 0,
+    paused INTEGER NOT NULL DEFAULT 0,
+    volume INTEGER NOT NULL DEFAULT 100,
+    loop_mode TEXT,
+    filters TEXT NOT NULL DEFAULT '[]',
+    queue TEXT NOT NULL DEFAULT '[]',
+    dj_id INTEGER,
+    controller_channel_id INTEGER,
+    controller_id INTEGER,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    track_id TEXT PRIMARY KEY,
+    track_type TEXT NOT NULL,
+    info TEXT NOT NULL
+);
+"""
+
+_PRUNE = """
+DELETE FROM tracks WHERE track_id NOT IN (
+    SELECT json_extract(entry.value, '$[0]') FROM players, json_each(players.queue) AS entry
+    UNION SELECT current FROM players WHERE current IS NOT NULL
+)
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+class PlayerState(NamedTuple):
+    """The state of a player, as it was saved by a `SnapshotStore`. The tracks are built from the saved track info."""
+
+    guild_id: int
+    channel_id: int
+    node: Optional[str]
+    current: Optional[Tuple[Track, Optional[int]]]
+    position: int
+    paused: bool
+    volume: int
+    loop_mode: Optional[str]
+    filters: List[Tuple[str, Dict[str, Any]]]
+    queue: List[Tuple[Track, Optional[int]]]
+    dj_id: Optional[int]
+    controller_channel_id: Optional[int]
+    controller_id: Optional[int]
+    updated: float
+
+
+class SnapshotStore:
+    """
+    Saves the state of the music players to a SQLite database, so the players can be restored after a restart.
+
+    Saving is incremental: every player has a fingerprint made of its queue version, current track, pause state, volume,
+    filters, DJ and controller, and only the players whose fingerprint changed are serialized and written. The position
+    of the other playing players is updated with a single `executemany`. The info of every track is written once to a
+    separate table, so a queue is saved as a list of track ids and a restore doesn't need to search or decode any track.
+    The database is written from a thread, the event loop only builds the rows. Every `prune_interval` saves, the info
+    of tracks no longer used by any player is removed.
+
+    Parameters:
+        path (str): The path of the database file.
+        prune_interval (int, optional): The number of saves between two removals of unused track info. Default is 100.
+
+    Methods:
+    save(players): Saves the players that changed and the position of the others. Returns the number of players written.
+    load(): Returns the saved `PlayerState`s, after removing the info of tracks that are no longer used.
+    restored(guild_ids): Marks the guilds whose player was restored, so their state is removed once the player is gone.
+    delete(guild_id): Removes the saved state of a guild.
+    close(): Closes the database.
+    """
+
+    def __init__(self, path: str, *, prune_interval: int = 100) -> None:
+        self.path: str = path
+        self.prune_interval: int = max(prune_interval, 1)
+        self._saves: int = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+        self._fingerprints: Dict[int, Tuple[Any, ...]] = {}
+        # The guilds whose player was saved or restored by this process. Only their state is removed when the player is
+        # gone, a player that is still being restored (or failed to) keeps its saved state.
+        self._active: Set[int] = set()
+        self._written: Set[str] = set()
+        self.writes: int = 0
+        self.position_updates: int = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of tracked players, player rows written, position updates and stored tracks."""
+        return {
+            "players": len(self._fingerprints),
+            "writes": self.writes,
+            "position_updates": self.position_updates,
+            "tracks": len(self._written),
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    @staticmethod
+    def _fingerprint(player: Player) -> Tuple[Any, ...]:
+        queue = getattr(player, "queue", None)
+        controller = getattr(player, "controller", None)
+        dj = getattr(player, "dj", None)
+        return (
+            player.channel.id,
+            player.node._identifier,
+            id(queue),
+            queue.version if isinstance(queue, TrackQueue) else None,
+            id(player.current),
+            player.is_paused,
+            player.volume,
+            tuple(map(id, player.filters.get_filters())),
+            dj.id if dj is not None else None,
+            controller.id if controller is not None else None,
+        )
+
+    def _track(self, track: Track, tracks: Dict[str, Tuple[str, str, str]]) -> str:
+        if track.track_id not in self._written and track.track_id not in tracks:
+            tracks[track.track_id] = (track.track_id, track.track_type.value, _dumps(track.info))
+        return track.track_id
+
+    def _row(self, player: Player, tracks: Dict[str, Tuple[str, str, str]], now: float) -> Tuple[Any, ...]:
+        queue = getattr(player, "queue", None)
+        controller = getattr(player, "controller", None)
+        dj = getattr(player, "dj", None)
+        current = player.current
+
+        if isinstance(queue, TrackQueue):
+            entries = [[self._track(entry.track, tracks), entry.requester_id] for entry in queue.entries()]
+            loop_mode = queue.loop_mode.value if queue.loop_mode is not None else None
+        else:
+            entries = []
+            loop_mode = None
+
+        return (
+            player.guild.id,
+            player.channel.id,
+            player.node._identifier,
+            self._track(current, tracks) if current is not None else None,
+            current.requester.id if current is not None and current.requester is not None else None,
+            int(player.position),
+            int(player.is_paused),
+            player.volume,
+            loop_mode,
+            _dumps([[f.tag, f.payload] for f in player.filters.get_filters()]),
+            _dumps(entries),
+            dj.id if dj is not None else None,
+            controller.channel.id if controller is not None else None,
+            controller.id if controller is not None else None,
+            now,
+        )
+
+    def _write(
+        self,
+        rows: List[Tuple[Any, ...]],
+        positions: List[Tuple[int, float, int]],
+        tracks: List[Tuple[str, str, str]],
+        removed: List[Tuple[int]],
+        prune: bool = False,
+    ) -> Optional[Set[str]]:
+        db = self._connect()
+        with db:
+            db.executemany("INSERT OR IGNORE INTO tracks VALUES (?, ?, ?)", tracks)
+            db.executemany(f"INSERT OR REPLACE INTO players VALUES ({', '.join('?' * 15)})", rows)
+            db.executemany("UPDATE players SET position = ?, updated = ? WHERE guild_id = ?", positions)
+            db.executemany("DELETE FROM players WHERE guild_id = ?", removed)
+            if prune:
+                db.execute(_PRUNE)
+        if not prune:
+            return None
+        # The tracks that are left, so `_written` doesn't keep the removed ones either.
+        return {track_id for track_id, in db.execute("SELECT track_id FROM tracks")}
+
+    async def save(self, players: Iterable[Player]) -> int:
+        """
+        Saves the state of the players. Players that changed since the last save are written in full, the position of the
+        other playing players is updated, and the saved state of players that were saved or restored before and are gone
+        is removed. Returns the number of players written in full.
+        """
+        now = time.time()
+        rows: List[Tuple[Any, ...]] = []
+        positions: List[Tuple[int, float, int]] = []
+        tracks: Dict[str, Tuple[str, str, str]] = {}
+        changed: Dict[int, Tuple[Any, ...]] = {}
+        seen: Set[int] = set()
+
+        for player in players:
+            guild_id = player.guild.id
+            seen.add(guild_id)
+            fingerprint = self._fingerprint(player)
+            if self._fingerprints.get(guild_id) != fingerprint:
+                changed[guild_id] = fingerprint
+                rows.append(self._row(player, tracks, now))
+            elif player.is_playing and not player.is_paused:
+                positions.append((int(player.position), now, guild_id))
+
+        removed = [(guild_id,) for guild_id in self._active - seen]
+        self._saves += 1
+        prune = not self._saves % self.prune_interval
+        if not rows and not positions and not removed and not prune:
+            return 0
+
+        written = await self._run(self._write, rows, positions, list(tracks.values()), removed, prune)
+        # Only updated once the rows are written, so a failed save is retried in full.
+        self._fingerprints.update(changed)
+        for guild_id, in removed:
+            self._fingerprints.pop(guild_id, None)
+        if written is not None:
+            self._written = written
+        else:
+            self._written.update(tracks)
+        self._active = seen
+        self.writes += len(rows)
+        self.position_updates += len(positions)
+        return len(rows)
+
+    def _load(self) -> List[PlayerState]:
+        db = self._connect()
+        with db:
+            db.execute(_PRUNE)
+        tracks: Dict[str, Track] = {}
+        for track_id, track_type, info in db.execute("SELECT track_id, track_type, info FROM tracks"):
+            tracks[track_id] = Track(track_id=track_id, info=json.loads(info), track_type=TrackType(track_type))
+        self._written = set(tracks)
+
+        def build(track_id: str, requester_id: Optional[int]) -> Tuple[Track, Optional[int]]:
+            # Every entry gets its own Track, the player changes the tracks it plays.
+            track = tracks[track_id]
+            return Track(track_id=track_id, info=track.info, track_type=track.track_type), requester_id
+
+        states = []
+        for row in db.execute("SELECT * FROM players"):
+            (guild_id, channel_id, node, current, current_requester, position, paused, volume, loop_mode, filters, queue,
+             dj_id, controller_channel_id, controller_id, updated) = row
+            states.append(PlayerState(
+                guild_id=guild_id,
+                channel_id=channel_id,
+                node=node,
+                current=build(current, current_requester) if current in tracks else None,
+                position=position,
+                paused=bool(paused),
+                volume=volume,
+                loop_mode=loop_mode,
+                filters=[(tag, payload) for tag, payload in json.loads(filters)],
+                queue=[build(track_id, requester_id) for track_id, requester_id in json.loads(queue) if track_id in tracks],
+                dj_id=dj_id,
+                controller_channel_id=controller_channel_id,
+                controller_id=controller_id,
+                updated=updated,
+            ))
+        return states
+
+    async def load(self) -> List[PlayerState]:
+        """Returns the saved state of every player. The info of tracks no longer used by any player is removed first."""
+        return await self._run(self._load)
+
+    def restored(self, guild_ids: Iterable[int]) -> None:
+        """Marks the guilds whose player was restored, so their saved state is removed if the player is gone by the next save."""
+        self._active.update(guild_ids)
+
+    async def delete(self, guild_id: int) -> None:
+        """Removes the saved state of a guild, e.g. when its player is stopped on purpose."""
+        await self._run(self._write, [], [], [], [(guild_id,)])
+        self._fingerprints.pop(guild_id, None)
+        self._active.discard(guild_id)
+
+    async def close(self) -> None:
+        if self._db is not None:
+            db, self._db = self._db, None
+            await self._run(db.close)
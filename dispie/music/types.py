@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import Any, Dict, TypedDict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pomice import Track
 
 
 __all__ = (
@@ -17,8 +20,32 @@ class Node(TypedDict):
 
 
 class MusicVariables:
+    """
+    The placeholders that can be used in the player embeds of the `MusicClient`, e.g. `Embed(title=MusicVariables.title)`.
+    The embeds are compiled into `EmbedTemplate`s and `from_track` returns the values they are rendered with.
+    """
     title: str = "{title}"
+    author: str = "{author}"
+    uri: str = "{uri}"
     thumbnail: str = "{thumbnail}"
+    length: str = "{length}"
+    requester: str = "{requester}"
+
+    @staticmethod
+    def from_track(track: Track) -> Dict[str, Any]:
+        """Returns the variables of a track."""
+        minutes, seconds = divmod(track.length // 1000, 60)
+        hours, minutes = divmod(minutes, 60)
+        return {
+            "title": track.title,
+            "author": track.author,
+            "uri": track.uri,
+            "thumbnail": track.thumbnail,
+            "length": "LIVE" if track.is_stream else (
+                f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+            ),
+            "requester": track.requester.mention if track.requester else "",
+        }
 
 
 
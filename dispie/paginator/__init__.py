@@ -1,39 +1,71 @@
 from __future__ import annotations
-from typing import Dict, Optional, Union, List, Any, TYPE_CHECKING, Sequence, Union
+from typing import Dict, Iterable, Optional, Set, Tuple, Union, List, Any, TYPE_CHECKING, Sequence, Union
+from concurrent.futures import Executor, ThreadPoolExecutor
+import asyncio
 
 from discord import Embed, ButtonStyle, utils, Interaction
-from discord.ui import View, button, Button
+from discord.ui import View, button, Button, TextInput
 from discord.ext.commands import Context
 
+from ..utils import ComponentPayloadCache, LRUCache, ModalInput, SerializedEmbed
+from .sources import *
+from .persistent import *
+from .persistent import make_custom_id
+
 if TYPE_CHECKING:
     from discord import Message, InteractionMessage, WebhookMessage
 
 __all__ = (
     "Paginator",
+    "PageSource",
+    "ListPageSource",
+    "CallablePageSource",
+    "OffsetPageSource",
+    "KeysetPageSource",
+    "PaginatorDispatcher",
 )
 class Paginator(View):
     """
     The Paginator class is used for paginating through a list of items, such as list of embeds.
     It allows for easy navigation between pages using the "previous" and "next" buttons.
+    Pages can also come from a `PageSource`, in which case only the page being shown is ever built.
 
     Attributes:
     message (Optional[Message]): The message object representing the current page.
-    pages (List[Any]): The list of items to be paginated.
+    pages (Union[Sequence[Any], PageSource]): The list of items or the page source to be paginated.
+    source (PageSource): The page source the pages are fetched from. A list is wrapped in a `ListPageSource`.
     timeout (Optional[float]): The amount of time before the paginator times out and stops. Defaults to 180 seconds.
     delete_message_after (bool): Whether or not to delete the message after the paginator has stopped. Defaults to False.
     per_page (int): The number of items to display per page. Defaults to 1.
     current_page (int): The current page number.
     ctx (Optional[Context]): The context object of the paginator.
     interaction (Optional[Interaction]): The interaction object of the paginator.
-    max_pages (int): The maximum number of pages.
+    max_pages (Optional[int]): The maximum number of pages, None if the source doesn't know its total count.
+    page_cache (LRUCache[int, Dict[str, Any]]): The rendered message kwargs of recently shown pages. Its size is set with `cache_size` (defaults to 16, 0 disables it). The embeds of cached pages are serialized once and reused, so changing an embed after its page was shown needs `page_cache.clear()`.
+    prefetch (int): The number of pages on each side of the current page that are rendered in the background. Defaults to 0.
+    edit_interval (float): The minimum time between the edits of clicks that arrive while the message is being updated. They are acknowledged right away and coalesced into a single edit of the final page. Defaults to 0.5 seconds.
+    executor (Optional[Executor]): The executor a synchronous `format_page` runs in, so heavy rendering doesn't block the event loop. Passing an int creates a thread pool with that many workers, which is shut down when the paginator stops, or once the message is sent for a persistent paginator. Defaults to None (render on the event loop).
+    render_timeout (Optional[float]): The maximum time in seconds a single `format_page` call can take before `asyncio.TimeoutError` is raised. Defaults to None.
+    prerender (int): The number of pages, starting at the current page, that are rendered in parallel when the paginator starts. Defaults to 0.
+    jump (bool): Whether to show a button that opens a modal to jump straight to a page. Defaults to False.
+    persistent_key (Optional[str]): The key of a source registered with a `PaginatorDispatcher`. When set, the page state is stored in the button custom_ids and the paginator is not kept in memory after sending, clicks are handled by the dispatcher instead.
 
     Methods:
     stop(): Stops the paginator and sets all attributes to None.
-    get_page(page_number: int): Returns the items for a given page number.
+    is_last_page(): Whether the current page is the last known page.
+    clamp_page(page_number: int): Returns the closest valid page number.
+    get_page(page_number: int): Fetches the items for a given page number from the source.
     format_page(page: Any): Formats a page for display.
+    run_format_page(page: Any): Calls `format_page`, in the executor if one is set.
     get_page_kwargs(page: Any): Returns the keyword arguments for sending a message with the current page.
-    update_page(interaction: Interaction): Updates the current page to be displayed.
+    to_components(): Returns the component payload of the buttons, reused as long as their state doesn't change.
+    render_page(page_number: int): Returns the keyword arguments for a page number, from the cache when possible.
+    render_current_page(): Renders the current page, stepping back if the source has no such page.
+    schedule_prefetch(): Renders the `prefetch` neighbouring pages of the current page in the background.
+    schedule_render(page_numbers: Iterable[int]): Renders the given pages in the background.
+    update_page(interaction: Interaction): Updates the current page to be displayed. Clicks that arrive during an update are coalesced into one edit.
     previous_page(interaction: Interaction, button: Button): Navigates to the previous page.
+    jump_page(interaction: Interaction, button: Button): Asks for a page number with a modal and navigates to it.
     next_page(interaction: Interaction, button: Button): Navigates to the next page.
     start(obj: Union[Context, Interaction]): Starts the paginator and sends the first page. Returns the message object representing the current page.
 
@@ -42,11 +74,19 @@ class Paginator(View):
 
     def __init__(
         self,
-        pages: List[Any],
+        pages: Union[Sequence[Any], PageSource],
         *,
         timeout: Optional[float] = 180.0,
         delete_message_after: bool = False,
         per_page: int = 1,
+        cache_size: int = 16,
+        prefetch: int = 0,
+        jump: bool = False,
+        edit_interval: float = 0.5,
+        executor: Optional[Union[Executor, int]] = None,
+        render_timeout: Optional[float] = None,
+        prerender: int = 0,
+        persistent_key: Optional[str] = None,
     ):
         super().__init__(timeout=timeout)
         self.delete_message_after: bool = delete_message_after
@@ -56,36 +96,80 @@ class Paginator(View):
         self.interaction: Optional[Interaction] = None
         self.per_page: int = per_page
         self.pages: Any = pages
-        total_pages, left_over = divmod(len(self.pages), self.per_page)
-        if left_over:
-            total_pages += 1
+        if isinstance(pages, PageSource):
+            self.source: PageSource = pages
+        else:
+            self.source = ListPageSource(pages, per_page=per_page)
+
+        self.max_pages: Optional[int] = self.source.get_max_pages()
+        self.next_page.disabled = self.is_last_page()
+        if not jump:
+            self.remove_item(self.jump_page)
+
+        self.page_cache: LRUCache[int, Dict[str, Any]] = LRUCache(cache_size)
+        self._component_payloads: ComponentPayloadCache = ComponentPayloadCache()
+        self.prefetch: int = prefetch
+        self._renders: Dict[int, asyncio.Task[Dict[str, Any]]] = {}
+        self._prefetch_tasks: Set[asyncio.Task[Any]] = set()
+        self._shown_page: int = 0
+        self._updating: bool = False
+        self.edit_interval: float = edit_interval
+
+        self._owns_executor: bool = isinstance(executor, int)
+        if isinstance(executor, int):
+            executor = ThreadPoolExecutor(max_workers=executor, thread_name_prefix="dispie-paginator")
+        self.executor: Optional[Executor] = executor
+        self.render_timeout: Optional[float] = render_timeout
+        self.prerender: int = prerender
 
-        self.max_pages: int = total_pages
-        self.next_page.disabled = self.current_page >= self.max_pages - 1
+        if persistent_key is not None and ":" in persistent_key:
+            raise ValueError("Persistent paginator keys can't contain ':'.")
+        self.persistent_key: Optional[str] = persistent_key
 
     def stop(self) -> None:
         self.message = None
         self.ctx = None
         self.interaction = None
+        for task in self._prefetch_tasks:
+            task.cancel()
+        self._prefetch_tasks.clear()
+        self.page_cache.clear()
+        self._release_executor()
 
         super().stop()
 
-    def get_page(self, page_number: int) -> Any:
-        if page_number < 0 or page_number >= self.max_pages:
-            self.current_page = 0
-            return self.pages[self.current_page]
+    def _release_executor(self) -> None:
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
 
-        if self.per_page == 1:
-            return self.pages[page_number]
-        else:
-            base = page_number * self.per_page
-            return self.pages[base: base + self.per_page]
+    def is_last_page(self) -> bool:
+        return self.max_pages is not None and self.current_page >= self.max_pages - 1
+
+    def clamp_page(self, page_number: int) -> int:
+        if self.max_pages is not None and page_number >= self.max_pages:
+            page_number = self.max_pages - 1
+        return max(page_number, 0)
+
+    async def get_page(self, page_number: int) -> Any:
+        return await utils.maybe_coroutine(self.source.get_page, page_number)
 
     def format_page(self, page: Any) -> Any:
         return page
 
+    async def run_format_page(self, page: Any) -> Any:
+        if self.executor is None or asyncio.iscoroutinefunction(self.format_page):
+            coro = utils.maybe_coroutine(self.format_page, page)
+        else:
+            loop = asyncio.get_running_loop()
+            coro = loop.run_in_executor(self.executor, self.format_page, page)
+
+        if self.render_timeout is None:
+            return await coro
+        return await asyncio.wait_for(coro, self.render_timeout)
+
     async def get_page_kwargs(self, page: Any) -> Dict[str, Any]:
-        formatted_page = await utils.maybe_coroutine(self.format_page, page)
+        formatted_page = await self.run_format_page(page)
 
         kwargs = {"content": None, "embeds": [], "view": self}
         if isinstance(formatted_page, str):
@@ -103,23 +187,169 @@ class Paginator(View):
 
         return kwargs
 
+    def to_components(self) -> List[Dict[str, Any]]:
+        return self._component_payloads.get(self)
+
+    async def _render(self, page_number: int) -> Dict[str, Any]:
+        page = await utils.maybe_coroutine(self.get_page, page_number)
+        kwargs = await self.get_page_kwargs(page)
+        if self.page_cache.maxsize and page_number >= 0 and (self.max_pages is None or page_number < self.max_pages):
+            # The cached page is sent as is every time it is shown, so its embeds only have to be serialized once.
+            kwargs = dict(kwargs)
+            if kwargs.get("embeds"):
+                kwargs["embeds"] = [SerializedEmbed.from_embed(embed) for embed in kwargs["embeds"]]
+            if isinstance(kwargs.get("embed"), Embed):
+                kwargs["embed"] = SerializedEmbed.from_embed(kwargs["embed"])
+            self.page_cache.put(page_number, kwargs)
+        return kwargs
+
+    async def render_page(self, page_number: int) -> Dict[str, Any]:
+        kwargs = self.page_cache.get(page_number)
+        if kwargs is not None:
+            return kwargs
+
+        # A page that is already being rendered (e.g. by a prefetch) is awaited instead of rendered twice.
+        task = self._renders.get(page_number)
+        if task is None:
+            task = asyncio.create_task(self._render(page_number))
+            self._renders[page_number] = task
+            task.add_done_callback(lambda _: self._renders.pop(page_number, None))
+        return await asyncio.shield(task)
+
+    async def render_current_page(self) -> Dict[str, Any]:
+        page_number = self.current_page = self.clamp_page(self.current_page)
+        try:
+            kwargs = await self.render_page(page_number)
+        except IndexError:
+            if page_number == self._shown_page:
+                raise
+            if page_number == self._shown_page + 1:
+                # The source ran out of pages, so the page that is shown is the last one.
+                self.max_pages = page_number
+            page_number = self.current_page = self._shown_page
+            kwargs = await self.render_page(page_number)
+
+        max_pages = self.source.get_max_pages()
+        if max_pages is not None:
+            self.max_pages = max_pages
+        self._shown_page = page_number
+        return kwargs
+
+    async def _prefetch_page(self, page_number: int) -> None:
+        try:
+            await self.render_page(page_number)
+        except IndexError:
+            if self.max_pages is None or page_number < self.max_pages:
+                self.max_pages = page_number
+
+    def schedule_render(self, page_numbers: Iterable[int]) -> None:
+        """Renders the given pages in the background, so they are cached before they are shown."""
+        for page_number in page_numbers:
+            if page_number < 0 or (self.max_pages is not None and page_number >= self.max_pages):
+                continue
+            if page_number in self.page_cache or page_number in self._renders:
+                continue
+            task = asyncio.create_task(self._prefetch_page(page_number))
+            self._prefetch_tasks.add(task)
+            task.add_done_callback(self._prefetch_done)
+
+    def schedule_prefetch(self) -> None:
+        """Renders the pages around the current page in the background, so they are cached before they are clicked."""
+        for offset in range(1, self.prefetch + 1):
+            self.schedule_render((self.current_page - offset, self.current_page + offset))
+
+    def _prefetch_done(self, task: asyncio.Task[Any]) -> None:
+        self._prefetch_tasks.discard(task)
+        if not task.cancelled():
+            # A failed prefetch is not an error, the page is rendered again when it is clicked.
+            task.exception()
+
+    def _prepare_persistent(self) -> None:
+        if self.persistent_key is None:
+            return
+
+        page_number = self._shown_page
+        self.previous_page.custom_id = make_custom_id(
+            self.persistent_key, max(page_number - 1, 0), self.per_page, "p")
+        self.jump_page.custom_id = make_custom_id(
+            self.persistent_key, page_number, self.per_page, "j")
+        self.next_page.custom_id = make_custom_id(
+            self.persistent_key, page_number + 1, self.per_page, "n")
+        # A finished view is not stored by discord.py, the dispatcher handles the clicks instead.
+        View.stop(self)
+
+    async def _render_update(self) -> Dict[str, Any]:
+        kwargs = await self.render_current_page()
+        # The button state follows the rendered page, clicks may have moved current_page in the meantime.
+        page_number = self._shown_page
+        self.previous_page.disabled = page_number <= 0
+        self.next_page.disabled = self.max_pages is not None and page_number >= self.max_pages - 1
+        self._prepare_persistent()
+        return kwargs
+
     async def update_page(self, interaction: Interaction) -> None:
         if self.message is None:
             self.message = interaction.message
 
-        kwargs = await self.get_page_kwargs(self.get_page(self.current_page))
-        self.previous_page.disabled = self.current_page <= 0
-        self.next_page.disabled = self.current_page >= self.max_pages - 1
-        await interaction.response.edit_message(**kwargs)
+        if self._updating:
+            # Another click is already updating the message, it picks up the new current_page once it is done.
+            if not interaction.response.is_done():
+                await interaction.response.defer()
+            return
+
+        self._updating = True
+        try:
+            kwargs = await self._render_update()
+            if interaction.response.is_done():
+                await self.message.edit(**kwargs)  # type: ignore
+            else:
+                await interaction.response.edit_message(**kwargs)
+
+            # Every click that came in during the edit is applied with a single edit of the final page.
+            while self.current_page != self._shown_page and self.message is not None:
+                if self.edit_interval:
+                    await asyncio.sleep(self.edit_interval)
+                kwargs = await self._render_update()
+                await self.message.edit(**kwargs)
+        finally:
+            self._updating = False
+        if self.persistent_key is not None:
+            # A persistent paginator is dropped once the message is edited, prefetched pages would never be shown.
+            self._release_executor()
+            return
+        self.schedule_prefetch()
 
     @button(label="<", style=ButtonStyle.gray)
     async def previous_page(self, interaction: Interaction, button: Button) -> None:
-        self.current_page -= 1
+        self.current_page = self.clamp_page(self.current_page - 1)
+        await self.update_page(interaction)
+
+    @button(label="…", style=ButtonStyle.gray)
+    async def jump_page(self, interaction: Interaction, button: Button) -> None:
+        modal = ModalInput(title="Jump to page", timeout=120.0)
+        modal.add_item(
+            TextInput(
+                label="Page Number",
+                placeholder=f"1-{self.max_pages}" if self.max_pages is not None else "The page you want to go to",
+                max_length=10,
+            )
+        )
+        await interaction.response.send_modal(modal)
+        if await modal.wait():
+            return
+
+        try:
+            page_number = int(str(modal.children[0]))
+        except ValueError:
+            return await interaction.followup.send(
+                "Please provide a valid page number.", ephemeral=True
+            )
+        self.current_page = page_number - 1
         await self.update_page(interaction)
 
     @button(label=">", style=ButtonStyle.gray)
     async def next_page(self, interaction: Interaction, button: Button) -> None:
-        self.current_page += 1
+        self.current_page = self.clamp_page(self.current_page + 1)
         await self.update_page(interaction)
 
     async def start(
@@ -135,8 +365,7 @@ class Paginator(View):
         if self.message is not None and self.interaction is not None:
             await self.update_page(self.interaction)
         else:
-            self.previous_page.disabled = self.current_page <= 0
-            kwargs = await self.get_page_kwargs(self.get_page(self.current_page))
+            kwargs = await self._render_update()
             if self.ctx is not None:
                 self.message = await self.ctx.send(**kwargs)
             elif self.interaction is not None:
@@ -148,5 +377,10 @@ class Paginator(View):
             else:
                 raise RuntimeError(
                     "Cannot start a paginator without a context or interaction.")
+            if self.persistent_key is not None:
+                self._release_executor()
+                return self.message
+            self.schedule_prefetch()
+            self.schedule_render(range(self.current_page + 1, self.current_page + self.prerender))
 
         return self.message
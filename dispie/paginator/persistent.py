@@ -0,0 +1,155 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple, Type, Union, TYPE_CHECKING
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from discord import Interaction, InteractionType, utils
+from discord.ext.commands import Bot
+
+from .sources import PageSource
+
+if TYPE_CHECKING:
+    from . import Paginator
+
+__all__ = (
+    "PaginatorDispatcher",
+)
+
+CUSTOM_ID_PREFIX = "dispie:paginator"
+
+
+def make_custom_id(key: str, page_number: int, per_page: int, tag: str) -> str:
+    return f"{CUSTOM_ID_PREFIX}:{key}:{page_number}:{per_page}:{tag}"
+
+
+def parse_custom_id(custom_id: str) -> Optional[Tuple[str, int, int, str]]:
+    """Returns the source key, page number, per_page and button tag stored in a persistent paginator custom_id."""
+    if not custom_id.startswith(CUSTOM_ID_PREFIX + ":"):
+        return None
+    try:
+        key, page_number, per_page, tag = custom_id[len(CUSTOM_ID_PREFIX) + 1:].split(":")
+        return key, int(page_number), int(per_page), tag
+    except ValueError:
+        return None
+
+
+class _Registration(NamedTuple):
+    source: Union[Sequence[Any], PageSource, Callable[[int], Any]]
+    paginator_cls: Optional[Type[Paginator]]
+    options: Dict[str, Any]
+    executor: Optional[Executor]
+
+
+def shown_page(page_number: int, tag: str) -> int:
+    """Returns the page that was shown when a button with the given target page and tag was rendered."""
+    if tag == "n":
+        return page_number - 1
+    if tag == "p":
+        return page_number + 1
+    return page_number
+
+
+class PaginatorDispatcher:
+    """
+    Routes the button clicks of persistent paginators.
+
+    A paginator started with a `persistent_key` keeps its whole state (source key, page and per_page) in the
+    custom_id of its buttons and is not kept in memory after the message is sent. The dispatcher receives every
+    click through a single `on_interaction` listener and rebuilds the requested page from the registered source,
+    so buttons keep working after a restart and memory doesn't grow with the number of open paginators.
+
+    Parameters:
+        bot (discord.ext.commands.Bot): The bot the listener is added to.
+        paginator_cls (Type[Paginator], optional): The paginator class used to render pages. Defaults to `Paginator`.
+
+    Methods:
+    register(key: str, source, paginator_cls=None, **options): Registers a page source under a key.
+    unregister(key: str): Removes a registered page source.
+    setup(): Adds the `on_interaction` listener to the bot.
+    teardown(): Removes the `on_interaction` listener from the bot.
+    dispatch(interaction: Interaction): Handles a persistent paginator click. Returns whether the interaction was handled.
+    """
+
+    def __init__(self, bot: Bot, *, paginator_cls: Optional[Type[Paginator]] = None) -> None:
+        if paginator_cls is None:
+            from . import Paginator
+            paginator_cls = Paginator
+
+        self.bot = bot
+        self.paginator_cls: Type[Paginator] = paginator_cls
+        self._sources: Dict[str, _Registration] = {}
+
+    def register(
+        self,
+        key: str,
+        source: Union[Sequence[Any], PageSource, Callable[[int], Any]],
+        *,
+        paginator_cls: Optional[Type[Paginator]] = None,
+        **options: Any,
+    ) -> None:
+        """
+        Registers a page source under a key. The same key has to be passed as `persistent_key` to the paginator.
+
+        Parameters:
+            key (str): The key stored in the button custom_ids. It can't contain ":".
+            source: A list of items, a `PageSource`, or a function or coroutine function that receives `per_page` and returns one of those.
+            paginator_cls (Type[Paginator], optional): The paginator class used for this key, for example a subclass that overrides `format_page`.
+            **options: Extra keyword arguments passed to the paginator. They should match the ones the paginator was started with, e.g. `jump=True`.
+                An int `executor` creates one thread pool for the key, shared by every click and shut down by `unregister` and `teardown`.
+        """
+        if ":" in key:
+            raise ValueError("Persistent paginator keys can't contain ':'.")
+        self.unregister(key)
+        executor = None
+        if isinstance(options.get("executor"), int):
+            executor = options["executor"] = ThreadPoolExecutor(
+                max_workers=options["executor"], thread_name_prefix=f"dispie-paginator-{key}"
+            )
+        self._sources[key] = _Registration(source, paginator_cls, options, executor)
+
+    def unregister(self, key: str) -> None:
+        registration = self._sources.pop(key, None)
+        if registration is not None and registration.executor is not None:
+            registration.executor.shutdown(wait=False, cancel_futures=True)
+
+    def setup(self) -> None:
+        self.bot.add_listener(self.on_interaction, "on_interaction")
+
+    def teardown(self) -> None:
+        self.bot.remove_listener(self.on_interaction, "on_interaction")
+        for key in list(self._sources):
+            self.unregister(key)
+
+    async def on_interaction(self, interaction: Interaction) -> None:
+        await self.dispatch(interaction)
+
+    async def dispatch(self, interaction: Interaction) -> bool:
+        if interaction.type is not InteractionType.component or interaction.data is None:
+            return False
+
+        parsed = parse_custom_id(interaction.data.get("custom_id", ""))  # type: ignore
+        if parsed is None:
+            return False
+        key, page_number, per_page, tag = parsed
+        registration = self._sources.get(key)
+        if registration is None:
+            return False
+
+        source = registration.source
+        if callable(source):
+            source = await utils.maybe_coroutine(source, per_page)
+
+        paginator_cls = registration.paginator_cls or self.paginator_cls
+        paginator = paginator_cls(
+            source, per_page=per_page, persistent_key=key, **registration.options  # type: ignore
+        )
+        if not await paginator.interaction_check(interaction):
+            return True
+
+        paginator.current_page = page_number
+        # A paginator that runs past the end of an unknown size source falls back to the page that is shown.
+        paginator._shown_page = max(shown_page(page_number, tag), 0)
+        if tag == "j":
+            await paginator.jump_page.callback(interaction)
+        else:
+            await paginator.update_page(interaction)
+        return True
@@ -0,0 +1,206 @@
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple, Union
+
+
+__all__ = (
+    "PageSource",
+    "ListPageSource",
+    "CallablePageSource",
+    "OffsetPageSource",
+    "KeysetPageSource",
+)
+
+
+class PageSource:
+    """
+    The base class for every page source used by the `Paginator`.
+    A page source only produces the page that was asked for, so nothing has to be built up front.
+
+    Subclasses must implement `get_page`, which can be a regular method or a coroutine.
+    `get_page` should raise `IndexError` when the page does not exist, this is how the paginator
+    finds the last page of a source that doesn't know its total count.
+
+    Methods:
+    get_page(page_number: int): Returns (or awaits) the page for the given page number.
+    get_max_pages(): Returns the total number of pages, or None if it is not known.
+    is_paginating(): Whether the source has more than one page.
+    """
+
+    def get_page(self, page_number: int) -> Union[Any, Awaitable[Any]]:
+        raise NotImplementedError
+
+    def get_max_pages(self) -> Optional[int]:
+        return None
+
+    def is_paginating(self) -> bool:
+        max_pages = self.get_max_pages()
+        return max_pages is None or max_pages > 1
+
+
+class ListPageSource(PageSource):
+    """
+    A page source for a sequence of items that is already in memory.
+    Pages are sliced out of the sequence when they are requested.
+
+    Parameters:
+        entries (Sequence[Any]): The items to be paginated.
+        per_page (int, optional): The number of items to display per page. Defaults to 1.
+    """
+
+    def __init__(self, entries: Sequence[Any], *, per_page: int = 1) -> None:
+        self.entries: Sequence[Any] = entries
+        self.per_page: int = per_page
+
+        total_pages, left_over = divmod(len(entries), per_page)
+        if left_over:
+            total_pages += 1
+        self._max_pages: int = total_pages
+
+    def get_page(self, page_number: int) -> Any:
+        if page_number < 0 or page_number >= self._max_pages:
+            raise IndexError(page_number)
+
+        if self.per_page == 1:
+            return self.entries[page_number]
+        else:
+            base = page_number * self.per_page
+            return self.entries[base: base + self.per_page]
+
+    def get_max_pages(self) -> int:
+        return self._max_pages
+
+
+class CallablePageSource(PageSource):
+    """
+    A page source that builds every page on demand with a callable.
+
+    Parameters:
+        func (Callable[[int], Any]): A function or coroutine function that receives a page number and returns the page.
+        max_pages (int, optional): The total number of pages, if it is known.
+    """
+
+    def __init__(self, func: Callable[[int], Any], *, max_pages: Optional[int] = None) -> None:
+        self.func = func
+        self.max_pages: Optional[int] = max_pages
+
+    def get_page(self, page_number: int) -> Union[Any, Awaitable[Any]]:
+        if page_number < 0 or (self.max_pages is not None and page_number >= self.max_pages):
+            raise IndexError(page_number)
+        return self.func(page_number)
+
+    def get_max_pages(self) -> Optional[int]:
+        return self.max_pages
+
+
+class OffsetPageSource(PageSource):
+    """
+    A page source for database results that are fetched with an offset and a limit.
+    Only the rows of the requested page are fetched, so jumping to any page costs a single query.
+
+    Parameters:
+        fetch (Callable[[int, int], Awaitable[Sequence[Any]]]): A coroutine function that receives an offset and a limit and returns the rows.
+        per_page (int, optional): The number of rows to display per page. Defaults to 10.
+        total (int, optional): The total number of rows, if it is known. Otherwise the last page is found when a page comes back short.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int, int], Awaitable[Sequence[Any]]],
+        *,
+        per_page: int = 10,
+        total: Optional[int] = None,
+    ) -> None:
+        self.fetch = fetch
+        self.per_page: int = per_page
+        self._max_pages: Optional[int] = None
+        if total is not None:
+            self._max_pages = max(-(-total // per_page), 1)
+
+    async def get_page(self, page_number: int) -> Any:
+        if page_number < 0 or (self._max_pages is not None and page_number >= self._max_pages):
+            raise IndexError(page_number)
+
+        rows = await self.fetch(page_number * self.per_page, self.per_page)
+        if not rows and page_number > 0:
+            self._max_pages = page_number
+            raise IndexError(page_number)
+        if len(rows) < self.per_page:
+            self._max_pages = page_number + 1
+
+        if self.per_page == 1:
+            return rows[0] if rows else None
+        return rows
+
+    def get_max_pages(self) -> Optional[int]:
+        return self._max_pages
+
+
+class KeysetPageSource(PageSource):
+    """
+    A page source for database results that are fetched with keyset (cursor) pagination.
+
+    The cursor that starts every visited page is cached, so going back never walks the results again.
+    To jump to a page whose cursor isn't cached yet, a `seek` coroutine can resolve the cursor for a row offset
+    directly. Without it the source walks forward from the nearest cached page.
+
+    Parameters:
+        fetch (Callable[[Any, int], Awaitable[Tuple[Sequence[Any], Any]]]): A coroutine function that receives a cursor (None for the first page) and a limit, and returns the rows and the cursor of the next page (None on the last page).
+        per_page (int, optional): The number of rows to display per page. Defaults to 10.
+        seek (Callable[[int], Awaitable[Any]], optional): A coroutine function that receives a row offset and returns the cursor that starts at that row.
+        total (int, optional): The total number of rows, if it is known.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Any, int], Awaitable[Tuple[Sequence[Any], Any]]],
+        *,
+        per_page: int = 10,
+        seek: Optional[Callable[[int], Awaitable[Any]]] = None,
+        total: Optional[int] = None,
+    ) -> None:
+        self.fetch = fetch
+        self.seek = seek
+        self.per_page: int = per_page
+        self._cursors: Dict[int, Any] = {0: None}
+        self._max_pages: Optional[int] = None
+        if total is not None:
+            self._max_pages = max(-(-total // per_page), 1)
+
+    async def _fetch_page(self, page_number: int, cursor: Any) -> Sequence[Any]:
+        rows, next_cursor = await self.fetch(cursor, self.per_page)
+        if not rows and page_number > 0:
+            self._max_pages = page_number
+            raise IndexError(page_number)
+        if next_cursor is None:
+            self._max_pages = page_number + 1
+        else:
+            self._cursors[page_number + 1] = next_cursor
+        return rows
+
+    async def _get_cursor(self, page_number: int) -> Any:
+        if page_number in self._cursors:
+            return self._cursors[page_number]
+
+        if self.seek is not None:
+            cursor = await self.seek(page_number * self.per_page)
+            self._cursors[page_number] = cursor
+            return cursor
+
+        start = max(page for page in self._cursors if page < page_number)
+        for page in range(start, page_number):
+            await self._fetch_page(page, self._cursors[page])
+            if page + 1 not in self._cursors:
+                raise IndexError(page_number)
+        return self._cursors[page_number]
+
+    async def get_page(self, page_number: int) -> Any:
+        if page_number < 0 or (self._max_pages is not None and page_number >= self._max_pages):
+            raise IndexError(page_number)
+
+        rows = await self._fetch_page(page_number, await self._get_cursor(page_number))
+        if self.per_page == 1:
+            return rows[0] if rows else None
+        return rows
+
+    def get_max_pages(self) -> Optional[int]:
+        return self._max_pages
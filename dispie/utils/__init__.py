@@ -1 +1,9 @@
-from .input import *
\ No newline at end of file
+from .input import *
+from .cache import *
+from .inflight import *
+from .payloads import *
+from .trie import *
+from .template import *
+from .urls import *
+from .prompts import *
+from .options import *
\ No newline at end of file
@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Generic, Hashable, Iterator, Optional, TypeVar
+from collections import OrderedDict
+import time
+
+__all__ = ("LRUCache",)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A small least recently used cache. When the cache is full the least recently used item is evicted.
+    Items can also expire after a time to live, expired items are dropped when they are looked up.
+
+    Parameters:
+        maxsize (int, optional): The maximum number of items to keep. A maxsize of 0 disables the cache. Default is 128.
+        on_evict (Callable[[K, V], Any], optional): A function that is called with the key and value of every evicted item.
+        ttl (float, optional): The number of seconds an item is kept. Items never expire by default.
+
+    Attributes:
+        hits (int): The number of lookups that found an item.
+        misses (int): The number of lookups that didn't find an item.
+        evictions (int): The number of items evicted because the cache was full.
+        expirations (int): The number of items dropped because they expired.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        *,
+        on_evict: Optional[Callable[[K, V], Any]] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be 0 or greater.")
+        self.maxsize: int = maxsize
+        self.on_evict = on_evict
+        self.ttl: Optional[float] = ttl
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._expires: Dict[K, float] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Returns the item for the given key and marks it as recently used."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key], self._expires[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V, *, ttl: Optional[float] = None) -> None:
+        """
+        Adds an item to the cache, evicting the least recently used items if the cache is full.
+        `ttl` overrides the time to live of the cache for this item.
+        """
+        if not self.maxsize:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None:
+            self._expires[key] = time.monotonic() + ttl
+        else:
+            self._expires.pop(key, None)
+        while len(self._data) > self.maxsize:
+            old_key, old_value = self._data.popitem(last=False)
+            self._expires.pop(old_key, None)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Removes an item from the cache and returns it."""
+        self._expires.pop(key, None)
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Removes every item from the cache."""
+        self._data.clear()
+        self._expires.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Returns the size, hits, misses, hit rate, evictions and expirations of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,53 @@
+from __future__ import annotations
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+import asyncio
+
+__all__ = ("InFlight",)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class InFlight(Generic[K, V]):
+    """
+    Shares one call between the concurrent callers that ask for the same key.
+
+    The first caller starts the call in its own task, the callers that come while it runs wait on the same task.
+    Every caller waits through `asyncio.shield`, so a caller that is cancelled only stops waiting: the call keeps
+    running for the others, and one that nobody waits on anymore still finishes (e.g. to fill a cache).
+    An exception raised by the call is raised to every caller.
+
+    Attributes:
+        shared (int): The number of callers that waited on a call started by another caller.
+
+    Methods:
+    run(key, call): Returns the result of `call()`, or of the call already running for `key`.
+    """
+
+    __slots__ = ("shared", "_tasks")
+
+    def __init__(self) -> None:
+        self.shared: int = 0
+        self._tasks: Dict[K, asyncio.Task[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._tasks
+
+    def _done(self, key: K, task: asyncio.Task[V]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here so a call nobody waits on anymore doesn't log it.
+
+    async def run(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        """Returns the result of `call()`, or waits on the call already running for the key."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda task: self._done(key, task))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
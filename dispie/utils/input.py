@@ -2,11 +2,13 @@ from __future__ import annotations
 from typing import List, Optional
 
 
-from discord.ui import ChannelSelect, Modal, Select, View, select
-from discord import Interaction, SelectOption, ChannelType
+from discord.ui import Button, ChannelSelect, Modal, Select, TextInput, View, button, select
+from discord import ButtonStyle, Interaction, SelectOption, ChannelType
 from contextlib import suppress
 
-__all__ = ("ModalInput", "SelectPrompt", "ChannelSelectPrompt")
+from .options import OptionSource
+
+__all__ = ("ModalInput", "SelectPrompt", "ChannelSelectPrompt", "PagedSelectPrompt")
 
 
 class ModalInput(Modal):
@@ -16,7 +18,7 @@ class ModalInput(Modal):
     Parameters:
         title (str): The title of the modal.
         timeout (float, optional): An optional argument that is passed to the parent Modal class. It is used to specify a timeout for the modal in seconds.
-        custom_id (str, optional): An optional argument that is passed to the parent Modal class. It is used to specify a custom ID for the modal.
+        custom_id (str, optional): An optional argument that is passed to the parent Modal class. It is used to specify a custom ID for the modal. A unique one is generated by default.
         ephemeral (bool, optional): A boolean indicating whether the modal will be sent as an ephemeral message or not.
     """
     def __init__(
@@ -24,10 +26,13 @@ class ModalInput(Modal):
         *,
         title: str,
         timeout: Optional[float] = None,
-        custom_id: str = "modal_input",
+        custom_id: Optional[str] = None,
         ephemeral: bool = False,
     ) -> None:
-        super().__init__(title=title, timeout=timeout, custom_id=custom_id)
+        if custom_id is None:
+            super().__init__(title=title, timeout=timeout)
+        else:
+            super().__init__(title=title, timeout=timeout, custom_id=custom_id)
         self.ephemeral = ephemeral
 
     async def on_submit(self, interaction: Interaction) -> None:
@@ -78,6 +83,8 @@ class ChannelSelectPrompt(View):
     ) -> None:
         super().__init__()
         self.values = None
+        # The channels as they were selected, `values` has None for the ones the bot doesn't have in its cache.
+        self.selected = None
         self.ephemeral = ephemeral
         self.children[0].placeholder, self.children[0].max_values = placeholder, max_values# type: ignore
 
@@ -89,6 +96,106 @@ class ChannelSelectPrompt(View):
         else:
             with suppress(Exception):
                 await interaction.message.delete()  # type: ignore
-        self.values = [interaction.guild.get_channel(i.id) for i in select.values] # type: ignore
+        self.selected = select.values
+        self.values = [interaction.guild.get_channel_or_thread(i.id) for i in select.values] # type: ignore
         self.stop()
-        
\ No newline at end of file
+
+
+class _SearchModal(ModalInput):
+    def __init__(self, prompt: PagedSelectPrompt) -> None:
+        super().__init__(title="Search", timeout=120.0)
+        self.prompt = prompt
+        self.add_item(TextInput(label="Search", default=prompt.query, required=False, max_length=100))
+
+    async def on_submit(self, interaction: Interaction) -> None:
+        self.prompt.query = str(self.children[0]).strip() or None
+        self.prompt.page = 0
+        self.prompt.update_options()
+        await interaction.response.edit_message(view=self.prompt)
+
+
+class PagedSelectPrompt(View):
+    """
+    A select prompt for any number of options. The options come from an `OptionSource` and are shown 25 at a time,
+    only the options of the page being shown are built. The search button narrows the options down with a `ModalInput`.
+
+    Wait for the answer with `await prompt.wait()`, like with `SelectPrompt`, or send it with `PromptManager.prompt`:
+    the prompt is only answered by the select, paging and searching don't end it.
+
+    Parameters:
+        placeholder (str): The placeholder text that will be displayed in the select prompt.
+        source (OptionSource): The source of the options, e.g. a `ListOptionSource`.
+        max_values (int, optional): The maximum number of options that can be selected by the user. Default is 1.
+        ephemeral (bool, optional): A boolean indicating whether the select prompt will be sent as an ephemeral message or not. Default is False.
+        timeout (float, optional): The number of seconds the prompt waits for an answer. Default is 180.
+
+    Attributes:
+        values (List[str], optional): The values of the selected options, None until the user picked something.
+        query (str, optional): The current search query.
+        page (int): The current page.
+    """
+
+    PER_PAGE = 25
+
+    def __init__(
+        self,
+        placeholder: str,
+        source: OptionSource,
+        max_values: int = 1,
+        ephemeral: bool = False,
+        timeout: Optional[float] = 180.0,
+    ) -> None:
+        super().__init__(timeout=timeout)
+        self.placeholder, self.source, self.max_values, self.ephemeral = placeholder, source, max_values, ephemeral
+        self.values: Optional[List[str]] = None
+        self.query: Optional[str] = None
+        self.page: int = 0
+        self.update_options()
+
+    @property
+    def max_pages(self) -> int:
+        return max(-(-self.source.count(self.query) // self.PER_PAGE), 1)
+
+    def update_options(self) -> None:
+        """Builds the options of the current page and updates the buttons."""
+        max_pages = self.max_pages
+        self.page = min(max(self.page, 0), max_pages - 1)
+        options = self.source.get_options(self.query, self.page * self.PER_PAGE, self.PER_PAGE)
+
+        menu: Select = self.select_callback  # type: ignore
+        placeholder = self.placeholder if self.query is None else f"{self.placeholder} ({self.query})"
+        menu.placeholder = f"{placeholder} - {self.page + 1}/{max_pages}" if max_pages > 1 else placeholder
+        if options:
+            menu.options, menu.disabled = options, False
+            menu.max_values = min(self.max_values, len(options))
+        else:
+            menu.options, menu.disabled, menu.max_values = [SelectOption(label="No results", value="\u200b")], True, 1
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= max_pages - 1
+
+    @select()
+    async def select_callback(self, interaction: Interaction, select: Select):
+        await interaction.response.defer(ephemeral=self.ephemeral)
+        if self.ephemeral:
+            await interaction.delete_original_response()
+        else:
+            with suppress(Exception):
+                await interaction.message.delete()  # type: ignore
+        self.values = select.values
+        self.stop()
+
+    @button(label="<", style=ButtonStyle.gray)
+    async def previous_page(self, interaction: Interaction, button: Button):
+        self.page -= 1
+        self.update_options()
+        await interaction.response.edit_message(view=self)
+
+    @button(label=">", style=ButtonStyle.gray)
+    async def next_page(self, interaction: Interaction, button: Button):
+        self.page += 1
+        self.update_options()
+        await interaction.response.edit_message(view=self)
+
+    @button(label="Search", style=ButtonStyle.blurple)
+    async def search(self, interaction: Interaction, button: Button):
+        await interaction.response.send_modal(_SearchModal(self))
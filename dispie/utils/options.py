@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Any, Callable, List, Optional, Sequence
+
+from discord import SelectOption
+
+from .trie import PrefixIndex
+
+__all__ = ("OptionSource", "ListOptionSource")
+
+
+class OptionSource:
+    """
+    The base class for the options of a `PagedSelectPrompt`.
+    Only the options of the page being shown are asked for, so they can be built (or fetched) on demand.
+
+    Subclasses implement `count` and `get_options`.
+
+    Methods:
+    count(query: Optional[str]): Returns the number of options that match the query, or all options if it is None.
+    get_options(query: Optional[str], offset: int, limit: int): Returns the matching options in the given range.
+    """
+
+    def count(self, query: Optional[str] = None) -> int:
+        raise NotImplementedError
+
+    def get_options(self, query: Optional[str], offset: int, limit: int) -> List[SelectOption]:
+        raise NotImplementedError
+
+
+class ListOptionSource(OptionSource):
+    """
+    An option source for a sequence of items, e.g. the roles or members of a guild.
+
+    A `SelectOption` is only created for the items of the page being shown. Searching matches the start of any word of
+    an item's key, through a `PrefixIndex` that is built on the first search.
+
+    Parameters:
+        items (Sequence[Any]): The items to pick from. They can be `SelectOption`s if `to_option` is not given.
+        to_option (Callable[[Any], SelectOption], optional): Builds the option of an item. The option values must be unique.
+        key (Callable[[Any], str], optional): Returns the text an item is searched by. Defaults to the label of `SelectOption` items, or `str(item)`.
+        search_limit (int, optional): The maximum number of search results. Default is 100.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[Any],
+        *,
+        to_option: Optional[Callable[[Any], SelectOption]] = None,
+        key: Optional[Callable[[Any], str]] = None,
+        search_limit: int = 100,
+    ) -> None:
+        self.items: Sequence[Any] = items
+        self.to_option: Callable[[Any], SelectOption] = to_option or (lambda item: item)
+        if key is None:
+            key = (lambda item: item.label) if to_option is None else str
+        self.key: Callable[[Any], str] = key
+        self.search_limit: int = search_limit
+        self._index: Optional[PrefixIndex[int]] = None
+        self._last_query: Optional[str] = None
+        self._last_results: List[int] = []
+
+    def _build_index(self) -> PrefixIndex[int]:
+        entries = []
+        for position, item in enumerate(self.items):
+            words = self.key(item).lower().split()
+            entries.extend((" ".join(words[start:]), position) for start in range(len(words)))
+        # Sorting by position keeps the results in the order of the items.
+        index: PrefixIndex[int] = PrefixIndex(limit=self.search_limit)
+        for word, position in sorted(entries, key=lambda entry: entry[1]):
+            index.insert(word, position)
+        return index
+
+    def search(self, query: str) -> List[int]:
+        """Returns the positions of the items where a word starts with the query."""
+        query = " ".join(query.lower().split())
+        if query == self._last_query:
+            return self._last_results
+        if self._index is None:
+            self._index = self._build_index()
+        self._last_query, self._last_results = query, self._index.search(query)
+        return self._last_results
+
+    def count(self, query: Optional[str] = None) -> int:
+        return len(self.search(query)) if query else len(self.items)
+
+    def get_options(self, query: Optional[str], offset: int, limit: int) -> List[SelectOption]:
+        if query:
+            return [self.to_option(self.items[position]) for position in self.search(query)[offset:offset + limit]]
+        return [self.to_option(item) for item in self.items[offset:offset + limit]]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Any, Dict, Hashable, List, Tuple
+
+from discord import Embed
+from discord.ui import Item, View
+
+__all__ = ("SerializedEmbed", "ComponentPayloadCache", "view_state", "COMPONENT_CACHE_SIZE")
+
+# The number of component payloads a view keeps, a view only switches between a few button states.
+COMPONENT_CACHE_SIZE = 8
+
+
+class SerializedEmbed(Embed):
+    """
+    This class is a subclass of the `Embed` class whose payload is serialized once and reused every time it is sent.
+    It is meant for embeds that don't change anymore, changes made after it was created are not sent.
+
+    Methods:
+        from_embed(embed: Embed): Creates a serialized copy of an embed.
+    """
+
+    __slots__ = ("_payload",)
+
+    @classmethod
+    def from_embed(cls, embed: Embed) -> SerializedEmbed:
+        if isinstance(embed, SerializedEmbed):
+            return embed
+        payload = embed.to_dict()
+        self = cls.from_dict(payload)
+        self._payload = payload
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:  # type: ignore
+        return self._payload
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    slots = getattr(type(value), "__slots__", None)
+    if slots and not isinstance(value, (str, int, float, bool)) and getattr(type(value), "__hash__", None) is object.__hash__:
+        # Mutable slotted objects such as SelectOption are compared by their attributes.
+        return (type(value),) + tuple(_freeze(getattr(value, name, None)) for name in slots)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def _item_state(item: Item[Any]) -> Tuple[Any, ...]:
+    underlying = getattr(item, "_underlying", None)
+    if underlying is None:
+        return (type(item), id(item), item.row, item._rendered_row)
+    return (type(item), item.row, item._rendered_row, _freeze(underlying))
+
+
+def view_state(view: View) -> Tuple[Any, ...]:
+    """
+    Returns a hashable state of everything a view renders: the type, row and component attributes of every item
+    (style, label, emoji, url, disabled, custom_id, select options, ...). Two views with the same state render the same components.
+    """
+    return tuple(_item_state(item) for item in view.children)
+
+
+class ComponentPayloadCache:
+    """
+    Keeps the component payloads of a view by `view_state`, so a view that switches between a few states doesn't
+    build the same payload again on every edit. At most `maxsize` payloads are kept.
+
+    Parameters:
+        maxsize (int, optional): The maximum number of payloads. Default is `COMPONENT_CACHE_SIZE`.
+
+    Methods:
+    get(view: View): Returns the component payload of the view, built with `View.to_components` when it isn't cached.
+    """
+
+    __slots__ = ("maxsize", "_payloads")
+
+    def __init__(self, maxsize: int = COMPONENT_CACHE_SIZE) -> None:
+        self.maxsize: int = maxsize
+        self._payloads: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+
+    def get(self, view: View) -> List[Dict[str, Any]]:
+        key = view_state(view)
+        components = self._payloads.get(key)
+        if components is None:
+            if len(self._payloads) >= self.maxsize:
+                self._payloads.clear()
+            components = self._payloads[key] = View.to_components(view)
+        return components
@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional, Tuple, TypeVar
+from collections import OrderedDict
+from contextlib import suppress
+from itertools import count
+import asyncio
+import os
+
+from discord import Interaction, InteractionType
+from discord.ext.commands import Bot
+from discord.ui import Item, Modal, View
+
+__all__ = ("PromptManager",)
+
+ID_PREFIX = "dispie:prompt"
+
+ViewT = TypeVar("ViewT", bound=View)
+ModalT = TypeVar("ModalT", bound=Modal)
+
+
+class _Pending:
+    __slots__ = ("future", "handle", "custom_ids")
+
+    def __init__(self, future: asyncio.Future[Optional[Interaction]], custom_ids: Tuple[str, ...]) -> None:
+        self.future = future
+        self.custom_ids = custom_ids
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class PromptManager:
+    """
+    Waits for the answers of prompts (modals and select prompts) from a single routing table.
+
+    A prompt sent through the manager gets unique custom_ids and is not kept by discord.py after it is sent. Its answer
+    is received by one `on_interaction` listener, which looks the custom_id up and resolves the waiting future. Every
+    prompt has a timeout, and at most `max_pending` prompts wait at the same time: the oldest one is given up when the
+    limit is reached. An open prompt costs a future and a timer, not a View.
+
+    Parameters:
+        bot (discord.ext.commands.Bot): The bot the listener is added to.
+        timeout (float, optional): The default number of seconds to wait for an answer. Default is 300.
+        max_pending (int, optional): The maximum number of prompts waiting for an answer. Default is 5000.
+
+    Methods:
+    setup(): Adds the `on_interaction` listener to the bot.
+    teardown(): Removes the listener and gives up every waiting prompt.
+    make_id(): Returns a new unique custom_id.
+    wait_for(custom_ids, timeout=None): Waits for an interaction on one of the custom_ids. Returns None on timeout.
+    modal(interaction, modal, timeout=None): Sends a modal and waits for it to be submitted.
+    prompt(interaction, view, timeout=None, ephemeral=True): Sends a view and waits until one of its callbacks stops it.
+    """
+
+    def __init__(self, bot: Bot, *, timeout: float = 300.0, max_pending: int = 5000) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1.")
+        self.bot = bot
+        self.timeout: float = timeout
+        self.max_pending: int = max_pending
+        self._pending: OrderedDict[int, _Pending] = OrderedDict()
+        self._routes: Dict[str, int] = {}
+        self._ids = count()
+        self._token: str = os.urandom(4).hex()
+        self._listening: bool = False
+        self.expired: int = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def setup(self) -> None:
+        self.bot.add_listener(self.on_interaction, "on_interaction")
+        self._listening = True
+
+    def teardown(self) -> None:
+        self.bot.remove_listener(self.on_interaction, "on_interaction")
+        self._listening = False
+        for key in list(self._pending):
+            self._resolve(key, None)
+
+    def make_id(self) -> str:
+        """Returns a custom_id that no other prompt uses, even across restarts."""
+        return f"{ID_PREFIX}:{self._token}:{next(self._ids)}"
+
+    def _resolve(self, key: int, interaction: Optional[Interaction]) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        for custom_id in pending.custom_ids:
+            self._routes.pop(custom_id, None)
+        if pending.handle is not None:
+            pending.handle.cancel()
+        if interaction is None:
+            self.expired += 1
+        if not pending.future.done():
+            pending.future.set_result(interaction)
+
+    async def wait_for(self, custom_ids: Iterable[str], *, timeout: Optional[float] = None) -> Optional[Interaction]:
+        """
+        Waits for a component or modal interaction with one of the custom_ids. Returns the interaction, or None if the
+        prompt timed out or was given up. Cancelling the wait removes the prompt from the routing table.
+        """
+        if not self._listening:
+            raise RuntimeError("PromptManager.setup() has to be called before prompts are sent.")
+
+        while len(self._pending) >= self.max_pending:
+            self._resolve(next(iter(self._pending)), None)
+
+        loop = asyncio.get_running_loop()
+        key = next(self._ids)
+        pending = _Pending(loop.create_future(), tuple(custom_ids))
+        pending.handle = loop.call_later(self.timeout if timeout is None else timeout, self._resolve, key, None)
+        self._pending[key] = pending
+        for custom_id in pending.custom_ids:
+            self._routes[custom_id] = key
+
+        try:
+            return await pending.future
+        finally:
+            if key in self._pending:
+                # The waiter was cancelled.
+                self._resolve(key, None)
+
+    async def on_interaction(self, interaction: Interaction) -> None:
+        if interaction.type not in (InteractionType.component, InteractionType.modal_submit) or interaction.data is None:
+            return
+        key = self._routes.get(interaction.data.get("custom_id", ""))  # type: ignore
+        if key is not None:
+            self._resolve(key, interaction)
+
+    async def modal(self, interaction: Interaction, modal: ModalT, *, timeout: Optional[float] = None) -> Optional[ModalT]:
+        """
+        Sends a modal as the response to the interaction and waits for it to be submitted.
+        The modal gets a unique custom_id, its `on_submit` runs as usual. Returns the modal with its inputs filled in, or None on timeout.
+        """
+        modal.custom_id = self.make_id()
+        Modal.stop(modal)  # A stopped modal isn't kept by discord.py, the manager routes the submission.
+        await interaction.response.send_modal(modal)
+        submitted = await self.wait_for((modal.custom_id,), timeout=timeout)
+        if submitted is None:
+            return None
+        data: Dict[str, Any] = submitted.data  # type: ignore
+        # discord.py has no public way to run a modal for an interaction it didn't route, its own dispatch is used.
+        # Its signature changed in 2.6, which is why requirements.txt pins the discord.py versions it was checked with.
+        await modal._scheduled_task(submitted, data.get("components", []), data.get("resolved", {}))  # type: ignore
+        return modal
+
+    async def prompt(
+        self, interaction: Interaction, view: ViewT, *, timeout: Optional[float] = None, ephemeral: bool = True
+    ) -> Optional[ViewT]:
+        """
+        Sends a view, as the response to the interaction or as a followup, and waits until it is answered.
+        The items get unique custom_ids and the callback of every used item runs as usual. The view is answered when a
+        callback calls `view.stop()`, like the select of the prompts does, so items that only page or search (e.g. the
+        buttons of `PagedSelectPrompt`) don't end the prompt. The timeout starts again after every interaction.
+        Returns the view, or None on timeout.
+        """
+        items: Dict[str, Item[Any]] = {}
+        for item in view.children:
+            if item.is_dispatchable():
+                item.custom_id = self.make_id()  # type: ignore
+                items[item.custom_id] = item  # type: ignore
+        View.stop(view)  # A stopped view isn't kept by discord.py, the manager routes the clicks.
+        answered = False
+
+        def stop() -> None:
+            nonlocal answered
+            answered = True
+            View.stop(view)
+
+        view.stop = stop  # type: ignore
+
+        if interaction.response.is_done():
+            message = await interaction.followup.send(view=view, ephemeral=ephemeral, wait=True)
+        else:
+            await interaction.response.send_message(view=view, ephemeral=ephemeral)
+            message = None
+
+        try:
+            while not answered:
+                answer = await self.wait_for(items, timeout=timeout)
+                if answer is None:
+                    with suppress(Exception):
+                        if message is not None:
+                            await message.delete()
+                        else:
+                            await interaction.delete_original_response()
+                    return None
+                # Fills the state of the item (e.g. the select values) and runs interaction_check, the callback and on_error.
+                await view._scheduled_task(items[answer.data["custom_id"]], answer)  # type: ignore
+        finally:
+            del view.stop
+        return view
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of prompts waiting for an answer and the number of prompts that expired."""
+        return {"pending": len(self._pending), "expired": self.expired}
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+from string import Formatter
+import re
+
+from discord import Embed
+
+__all__ = ("EmbedTemplate",)
+
+# The keys whose values are urls. An url that renders empty is dropped, Discord rejects empty urls.
+URL_KEYS = frozenset({"url", "icon_url"})
+# The sections that can't exist without their url.
+URL_SECTIONS = frozenset({"thumbnail", "image"})
+
+_formatter = Formatter()
+_MISSING = object()
+
+# The largest width and precision of a placeholder, the length of the longest embed text (the description).
+MAX_SPEC_SIZE = 4096
+# The standard format spec: [[fill]align][sign][z][#][0][width][grouping][.precision][type]
+_SPEC = re.compile(
+    r"(?P<head>(?:.?[<>=^])?[+\- ]?z?#?0?)(?P<width>\d*)(?P<grouping>[,_]?)(?:\.(?P<precision>\d+))?(?P<type>[bcdeEfFgGnosxX%]?)",
+    re.DOTALL,
+)
+
+# A compiled string is either a plain string or a tuple of parts. A part is a literal string or a
+# (name, attributes, conversion, format_spec) tuple for a placeholder.
+_Placeholder = Tuple[str, Tuple[str, ...], Optional[str], str]
+_Compiled = Union[str, Tuple[Union[str, _Placeholder], ...]]
+
+
+def _compile_spec(spec: str, field: str, text: str) -> str:
+    if "{" in spec or "}" in spec:
+        raise ValueError(f"Template format specs can't contain placeholders, got '{{{field}:{spec}}}' in {text!r}.")
+    match = _SPEC.fullmatch(spec)
+    if match is None:
+        raise ValueError(f"Invalid format spec {spec!r} in {text!r}.")
+    width, precision = match["width"], match["precision"]
+    if (not width or int(width) <= MAX_SPEC_SIZE) and (precision is None or int(precision) <= MAX_SPEC_SIZE):
+        return spec
+    # Capped, so a template can't render e.g. `{title:>50000000}`.
+    width = str(min(int(width), MAX_SPEC_SIZE)) if width else ""
+    precision = f".{min(int(precision), MAX_SPEC_SIZE)}" if precision is not None else ""
+    return f"{match['head']}{width}{match['grouping']}{precision}{match['type']}"
+
+
+def _compile(text: str) -> _Compiled:
+    parts: List[Union[str, _Placeholder]] = []
+    for literal, field, spec, conversion in _formatter.parse(text):
+        if literal:
+            parts.append(literal)
+        if field is None:
+            continue
+        if not field or field.isdigit():
+            raise ValueError(f"Template placeholders must be named, got '{{{field}}}' in {text!r}.")
+        name, *attributes = field.split(".")
+        for attribute in attributes:
+            # Private attributes would let a template reach e.g. `{user.__init__.__globals__}`.
+            if not attribute or attribute.startswith("_"):
+                raise ValueError(f"Template placeholders can't use private or empty attributes, got '{{{field}}}' in {text!r}.")
+        if conversion is not None and conversion not in ("r", "s", "a"):
+            raise ValueError(f"Invalid conversion '!{conversion}' in {text!r}.")
+        parts.append((name, tuple(attributes), conversion, _compile_spec(spec or "", field, text)))
+    if all(isinstance(part, str) for part in parts):
+        return "".join(parts)  # type: ignore
+    return tuple(parts)
+
+
+class EmbedTemplate:
+    """
+    An embed with `{placeholders}` that is compiled once and rendered many times.
+
+    Every text and url of the embed (title, description, author, footer, fields, thumbnail and image) can contain
+    placeholders like `{title}` or `{track.author}` (attributes starting with an underscore are rejected), with the usual format specs (`{position:>3}`) and conversions (`{name!r}`).
+    Specs can't be nested (`{n:{width}}`) and their width and precision are capped at 4096. Without `strict`, a value
+    that doesn't fit its spec is rendered as a plain string.
+    The strings are parsed when the template is created, rendering only joins the compiled parts with the values
+    and copies the sections of the embed, the template itself is never copied or parsed again.
+
+    Parameters:
+        embed (discord.Embed): The embed to compile, e.g. one made with the `EmbedCreator`.
+        strict (bool, optional): Whether a missing variable or attribute raises `KeyError`, and a value that doesn't fit its format spec raises. Otherwise they render as an empty string and a plain string. Default is False.
+
+    Attributes:
+        variables (FrozenSet[str]): The names of the variables used by the template.
+
+    Methods:
+    render(variables=None, **kwargs): Returns a new embed with the variables filled in.
+    render_dict(variables=None, **kwargs): Returns the rendered embed payload.
+    """
+
+    __slots__ = ("strict", "variables", "_static", "_sections", "_fields")
+
+    def __init__(self, embed: Embed, *, strict: bool = False) -> None:
+        self.strict: bool = strict
+        payload = embed.to_dict()
+        names = set()
+
+        def compile_section(section: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+            compiled = []
+            for key, value in section.items():
+                if isinstance(value, str):
+                    value = _compile(value)
+                    if not isinstance(value, str):
+                        names.update(part[0] for part in value if not isinstance(part, str))
+                compiled.append((key, value))
+            return tuple(compiled)
+
+        self._fields: Tuple[Tuple[Tuple[str, Any], ...], ...] = tuple(
+            compile_section(field) for field in payload.pop("fields", ())
+        )
+        self._sections: Tuple[Tuple[str, Tuple[Tuple[str, Any], ...]], ...] = tuple(
+            (key, compile_section(payload.pop(key))) for key in list(payload) if isinstance(payload[key], dict)
+        )
+        self._static: Tuple[Tuple[str, Any], ...] = compile_section(payload)
+        self.variables: FrozenSet[str] = frozenset(names)
+
+    def __repr__(self) -> str:
+        return f"<EmbedTemplate variables={sorted(self.variables)!r} strict={self.strict}>"
+
+    def _lookup(self, variables: Mapping[str, Any]) -> Callable[[_Placeholder], str]:
+        strict = self.strict
+
+        def lookup(placeholder: _Placeholder) -> str:
+            name, attributes, conversion, spec = placeholder
+            value = variables.get(name, _MISSING)
+            if value is _MISSING:
+                if strict:
+                    raise KeyError(name)
+                return ""
+            for attribute in attributes:
+                value = getattr(value, attribute, _MISSING)
+                if value is _MISSING:
+                    if strict:
+                        raise KeyError(".".join((name, *attributes)))
+                    return ""
+            if value is None:
+                return ""
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "a":
+                value = ascii(value)
+            elif conversion == "s":
+                value = str(value)
+            try:
+                return format(value, spec)
+            except (ValueError, TypeError):
+                # e.g. `{count:d}` rendered with a string.
+                if strict:
+                    raise
+                return str(value)
+
+        return lookup
+
+    @staticmethod
+    def _render_section(
+        compiled: Tuple[Tuple[str, Any], ...], lookup: Callable[[_Placeholder], str], field: bool = False
+    ) -> Dict[str, Any]:
+        section: Dict[str, Any] = {}
+        for key, value in compiled:
+            if isinstance(value, tuple):
+                value = "".join(part if isinstance(part, str) else lookup(part) for part in value)
+                if not value:
+                    if key in URL_KEYS:
+                        continue
+                    if field:
+                        # Field names and values can't be empty.
+                        value = "\u200b"
+            section[key] = value
+        return section
+
+    def render_dict(self, variables: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Returns the payload of the rendered embed. The variables can be given as a mapping, keyword arguments, or both."""
+        if variables is None:
+            variables = kwargs
+        elif kwargs:
+            variables = {**variables, **kwargs}
+
+        lookup = self._lookup(variables)
+        payload = self._render_section(self._static, lookup)
+        for key, compiled in self._sections:
+            section = self._render_section(compiled, lookup)
+            if key in URL_SECTIONS and "url" not in section:
+                continue
+            payload[key] = section
+        if self._fields:
+            payload["fields"] = [self._render_section(field, lookup, True) for field in self._fields]
+        return payload
+
+    def render(self, variables: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> Embed:
+        """Returns a new embed with the variables filled in. The variables can be given as a mapping, keyword arguments, or both."""
+        return Embed.from_dict(self.render_dict(variables, **kwargs))
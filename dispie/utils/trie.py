@@ -0,0 +1,67 @@
+from __future__ import annotations
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+__all__ = ("PrefixIndex",)
+
+V = TypeVar("V")
+
+
+class _Node(Generic[V]):
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node[V]] = {}
+        self.values: List[V] = []
+
+
+class PrefixIndex(Generic[V]):
+    """
+    A trie that maps case-insensitive keys to values and answers prefix lookups.
+
+    Every node keeps the first `limit` values of the keys below it, so a lookup only walks the
+    characters of the prefix and never visits the keys themselves. Build it with sorted keys (see `build`)
+    to get the results in alphabetical order.
+
+    Parameters:
+        limit (int, optional): The maximum number of values kept (and returned) per prefix. Default is 25.
+    """
+
+    def __init__(self, *, limit: int = 25) -> None:
+        self.limit: int = limit
+        self._root: _Node[V] = _Node()
+        self._size: int = 0
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, V]], *, limit: int = 25) -> PrefixIndex[V]:
+        """Creates an index from (key, value) pairs, inserted in key order."""
+        index: PrefixIndex[V] = cls(limit=limit)
+        for key, value in sorted(items, key=lambda item: item[0].lower()):
+            index.insert(key, value)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, key: str, value: V) -> None:
+        node = self._root
+        self._add_value(node, value)
+        for char in key.lower():
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            self._add_value(node, value)
+        self._size += 1
+
+    def _add_value(self, node: _Node[V], value: V) -> None:
+        if len(node.values) < self.limit and value not in node.values:
+            node.values.append(value)
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[V]:
+        """Returns the values of the keys that start with the given prefix."""
+        node = self._root
+        for char in prefix.lower():
+            node = node.children.get(char)  # type: ignore
+            if node is None:
+                return []
+        return node.values[:limit]
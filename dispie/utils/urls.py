@@ -0,0 +1,185 @@
+from __future__ import annotations
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+import asyncio
+import ipaddress
+import socket
+
+import aiohttp
+
+from .cache import LRUCache
+from .inflight import InFlight
+
+__all__ = ("URLChecker",)
+
+# The schemes Discord accepts for embed urls.
+EMBED_SCHEMES: Tuple[str, ...] = ("http", "https")
+# The statuses a request is redirected with.
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+
+class _Probe(NamedTuple):
+    status: Optional[int]
+    content_type: Optional[str]
+    error: Optional[str]
+
+
+class URLChecker:
+    """
+    Checks embed urls before they are used: the scheme, whether the url answers, and whether it serves an image.
+
+    Results are kept in a shared LRU cache with a time to live, so an icon used by thousands of embeds is only requested
+    once per `ttl`. Failures are cached for `failure_ttl` seconds. Concurrent checks of the same url share one request,
+    and every request goes through a single pooled `aiohttp` session.
+
+    The urls come from users, so by default the host of the url (and of every redirect) is resolved first and urls
+    that point to a private, loopback, link-local, reserved or multicast address are refused without a request.
+
+    Subclasses can override `probe` to check urls differently, e.g. against an allow list.
+
+    Parameters:
+        session (aiohttp.ClientSession, optional): The session used for requests. By default one is created when it is first needed and closed by `close`.
+        cache_size (int, optional): The number of urls to remember. Default is 1024.
+        ttl (float, optional): The number of seconds a successful check is cached. Default is 3600.
+        failure_ttl (float, optional): The number of seconds a failed check is cached. Default is 60.
+        timeout (float, optional): The number of seconds a request can take. Default is 5.
+        allow_attachments (bool, optional): Whether `attachment://` urls are accepted without a request. Default is True.
+        allow_private (bool, optional): Whether urls that point to private or reserved addresses are requested. Default is False.
+        max_redirects (int, optional): The number of redirects followed. Default is 5.
+
+    Methods:
+    check(url: str, image: bool = True): Returns why the url can't be used, or None if it can.
+    probe(url: str): Requests the url. Returns the status, content type and error.
+    is_public_address(address: str): Returns whether an ip address is reachable from the internet.
+    close(): Closes the session, if the checker created it.
+    """
+
+    def __init__(
+        self,
+        *,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache_size: int = 1024,
+        ttl: float = 3600.0,
+        failure_ttl: float = 60.0,
+        timeout: float = 5.0,
+        allow_attachments: bool = True,
+        allow_private: bool = False,
+        max_redirects: int = 5,
+    ) -> None:
+        self._session = session
+        self._owns_session = session is None
+        self.cache: LRUCache[str, _Probe] = LRUCache(cache_size, ttl=ttl)
+        self.failure_ttl: float = failure_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.allow_attachments: bool = allow_attachments
+        self.allow_private: bool = allow_private
+        self.max_redirects: int = max_redirects
+        self.requests: int = 0
+        self._inflight: InFlight[str, _Probe] = InFlight()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Returns the cache stats, the number of requests made and the number of requests in flight."""
+        return {**self.cache.stats, "requests": self.requests, "inflight": len(self._inflight)}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300), timeout=self.timeout
+            )
+            self._owns_session = True
+        return self._session
+
+    @staticmethod
+    def is_public_address(address: str) -> bool:
+        """Returns whether an ip address can be reached from the internet, i.e. it is not private, loopback, reserved etc."""
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+            ip = ip.ipv4_mapped
+        return ip.is_global and not ip.is_multicast
+
+    async def _check_host(self, url: str) -> Optional[str]:
+        parts = urlsplit(url)
+        if parts.scheme not in EMBED_SCHEMES or not parts.hostname:
+            return "The url redirects to an invalid url."
+        if self.allow_private:
+            return None
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+        except (OSError, ValueError):
+            return "The url can't be reached."
+        if not infos or not all(self.is_public_address(info[4][0]) for info in infos):
+            return "The url points to a private address."
+        return None
+
+    async def _request(self, method: str, url: str) -> _Probe:
+        # Redirects are followed here, so the host of every redirect is checked too.
+        for _ in range(self.max_redirects + 1):
+            error = await self._check_host(url)
+            if error is not None:
+                return _Probe(None, None, error)
+            async with self.session.request(method, url, allow_redirects=False, timeout=self.timeout) as response:
+                location = response.headers.get("Location")
+                if response.status not in REDIRECT_STATUSES or not location:
+                    return _Probe(response.status, response.content_type, None)
+            url = urljoin(url, location)
+        return _Probe(None, None, "The url redirects too many times.")
+
+    async def probe(self, url: str) -> _Probe:
+        self.requests += 1
+        try:
+            result = await self._request("HEAD", url)
+            if result.status not in (403, 405, 501):
+                return result
+            # Some hosts don't answer HEAD requests, only the headers of the GET response are read.
+            return await self._request("GET", url)
+        except asyncio.TimeoutError:
+            return _Probe(None, None, "The url took too long to answer.")
+        except aiohttp.ClientError:
+            return _Probe(None, None, "The url can't be reached.")
+
+    async def _probe_and_cache(self, url: str) -> _Probe:
+        # Cached by the shared call, so the result is kept even if every check waiting on it was cancelled.
+        result = await self.probe(url)
+        ok = result.status is not None and result.status < 400
+        self.cache.put(url, result, ttl=None if ok else self.failure_ttl)
+        return result
+
+    async def _probe(self, url: str) -> _Probe:
+        result = self.cache.get(url)
+        if result is not None:
+            return result
+        return await self._inflight.run(url, lambda: self._probe_and_cache(url))
+
+    async def check(self, url: str, *, image: bool = True) -> Optional[str]:
+        """
+        Returns why the url can't be used in an embed, or None if it can.
+
+        Parameters:
+            url (str): The url to check.
+            image (bool, optional): Whether the url has to serve an image, e.g. for icons and thumbnails. Default is True.
+        """
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return f"{url} is not a valid url."
+        if parts.scheme == "attachment" and self.allow_attachments:
+            return None
+        if parts.scheme not in EMBED_SCHEMES or not parts.netloc:
+            return f"{url} is not a valid url, it has to start with http:// or https://."
+
+        result = await self._probe(url)
+        if result.error is not None:
+            return f"{url}: {result.error}"
+        if result.status is not None and result.status >= 400:
+            return f"{url} answered with status {result.status}."
+        if image and not (result.content_type or "").startswith("image/"):
+            return f"{url} is not an image."
+        return None
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+        self._session = None
@@ -1,9 +1,16 @@
 import discord
 from discord.ext import commands
-from dispie import EmbedCreator
+from dispie import Broadcaster, EmbedCreator, SQLiteDraftStore, DraftRehydrator, PromptManager, URLChecker
 from examples.embed_creator.embed_options import options
 
 bot = commands.Bot(command_prefix="", intents=discord.Intents.all())
+store = SQLiteDraftStore("drafts.db")
+# Shared by every builder, so all of them stay under the same rate limits.
+broadcaster = Broadcaster(concurrency=5)
+# Checks image urls before they are set, its cache is shared by every builder.
+url_checker = URLChecker()
+# Waits for the answers of every modal and select prompt of the builders from one listener.
+prompts = PromptManager(bot, timeout=300)
 
 
 @bot.command()
@@ -38,4 +45,24 @@ async def embed3(ctx: commands.Context):
     await ctx.send(embed=view.get_default_embed, view=view)
 
 
+@bot.command()
+async def embed4(ctx: commands.Context):
+    """Embed Generator That Saves The Draft
+    The draft is saved after every edit, so the builder is rebuilt from the store on the next interaction after a restart. Idle builders time out and their draft is removed.
+    """
+    view = EmbedCreator(bot=bot, store=store, url_checker=url_checker, prompts=prompts)
+    await ctx.send(embed=view.get_default_embed, view=view)
+
+
+@bot.command()
+async def announce(ctx: commands.Context):
+    """Embed Generator That Sends The Embed To Up To 25 Channels At Once"""
+    view = EmbedCreator(bot=bot, send_max_values=25, broadcaster=broadcaster)
+    await ctx.send(embed=view.get_default_embed, view=view)
+
 
+@bot.event
+async def setup_hook():
+    prompts.setup()
+    # Rebuilds the builders of embed4 that are no longer in memory.
+    bot.add_view(DraftRehydrator(bot=bot, store=store, url_checker=url_checker, prompts=prompts))
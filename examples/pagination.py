@@ -1,17 +1,24 @@
 from discord.ext import commands
 import discord
-from dispie import Paginator
+from dispie import Paginator, CallablePageSource, PaginatorDispatcher
 
 bot = commands.Bot(command_prefix='',intents=discord.Intents.all())
 
+# Handles the buttons of every persistent paginator, even after a restart.
+dispatcher = PaginatorDispatcher(bot)
+dispatcher.register("numbers", lambda per_page: [f"Number {i+1}" for i in range(100)])
+dispatcher.setup()
+
 @bot.command()
 async def page1(ctx: commands.Context):
     """Embeds paginator."""
-    embeds = list()
-    for i in range(1000):
-        embeds.append(discord.Embed(title=f"Page {i+1}"))
+    # Each embed is only built when its page is shown.
+    source = CallablePageSource(
+        lambda page_number: discord.Embed(title=f"Page {page_number+1}"),
+        max_pages=1000
+    )
     
-    pages = Paginator(embeds)
+    pages = Paginator(source)
     await pages.start(ctx)
 
 
@@ -25,4 +32,12 @@ async def page2(ctx: commands.Context):
         embeds.append(embed)
     
     pages = Paginator(embeds)
-    await pages.start(ctx)
\ No newline at end of file
+    await pages.start(ctx)
+
+
+
+@bot.command()
+async def page3(ctx: commands.Context):
+    """Persistent paginator."""
+    pages = Paginator([f"Number {i+1}" for i in range(100)], persistent_key="numbers")
+    await pages.start(ctx)
@@ -0,0 +1,90 @@
+"""
+Compares dispie's TrackQueue with pomice.Queue on a large radio queue.
+
+Run it with: python -m examples.queue_benchmark
+"""
+import random
+import time
+import timeit
+from types import SimpleNamespace
+
+import pomice
+from dispie.music import TrackQueue
+
+SIZE = 20_000
+REQUESTERS = [SimpleNamespace(id=user_id, mention=f"<@{user_id}>") for user_id in range(50)]
+
+
+def make_tracks(size: int):
+    return [
+        pomice.Track(
+            track_id=f"track-{number}",
+            info={"title": f"Song {number}", "identifier": f"id-{number % (size // 2)}", "length": 180_000},
+            track_type=pomice.TrackType.SOUNDCLOUD,
+            requester=random.choice(REQUESTERS),
+        )
+        for number in range(size)
+    ]
+
+
+def pomice_remove_requester(queue: pomice.Queue, requester_id: int) -> None:
+    for track in [track for track in queue if track.requester.id == requester_id]:
+        queue.remove(track)
+
+
+def pomice_remove_duplicates(queue: pomice.Queue) -> None:
+    seen = set()
+    for track in list(queue):
+        if track.identifier in seen:
+            queue.remove(track)
+        else:
+            seen.add(track.identifier)
+
+
+def pomice_move(queue: pomice.Queue, index: int, to: int) -> None:
+    track = queue[index]
+    queue.remove(track)
+    queue.put_at_index(to, track)
+
+
+def fill(queue_cls, tracks):
+    queue = queue_cls()
+    for track in tracks:
+        queue.put(track)
+    return queue
+
+
+def timed(queue_cls, func, tracks, number: int) -> float:
+    total = 0.0
+    for _ in range(number):
+        queue = fill(queue_cls, tracks)
+        start = time.perf_counter()
+        func(queue)
+        total += time.perf_counter() - start
+    return total / number
+
+
+def bench(name: str, pomice_func, dispie_func, tracks, number: int = 3) -> None:
+    # A new queue is filled for every run, only the operation itself is timed.
+    pomice_time = timed(pomice.Queue, pomice_func, tracks, number)
+    dispie_time = timed(TrackQueue, dispie_func, tracks, number)
+    print(f"{name:<32} pomice.Queue {pomice_time * 1000:>10.2f} ms   TrackQueue {dispie_time * 1000:>8.2f} ms")
+
+
+def main() -> None:
+    tracks = make_tracks(SIZE)
+    print(f"{SIZE} tracks\n")
+    pomice_fill = timeit.timeit(lambda: fill(pomice.Queue, tracks), number=3) / 3
+    dispie_fill = timeit.timeit(lambda: fill(TrackQueue, tracks), number=3) / 3
+    print(f"{'put every track':<32} pomice.Queue {pomice_fill * 1000:>10.2f} ms   TrackQueue {dispie_fill * 1000:>8.2f} ms")
+    bench("get every track", lambda q: [q.get() for _ in range(len(q))], lambda q: [q.get() for _ in range(len(q))], tracks, 1)
+    bench("remove position 100 x1000", lambda q: [q.remove(q[100]) for _ in range(1000)], lambda q: [q.remove_at(100) for _ in range(1000)], tracks)
+    bench("move 10000 -> 0 x1000", lambda q: [pomice_move(q, 10_000, 0) for _ in range(1000)], lambda q: [q.move(10_000, 0) for _ in range(1000)], tracks)
+    bench("remove all by one requester", lambda q: pomice_remove_requester(q, 7), lambda q: q.remove_requester(7), tracks, 1)
+    bench("remove duplicates", pomice_remove_duplicates, lambda q: q.remove_duplicates(), tracks, 1)
+    bench("is identifier queued x1000", lambda q: [any(t.identifier == "id-9999" for t in q) for _ in range(1000)], lambda q: [q.has_identifier("id-9999") for _ in range(1000)], tracks, 1)
+    bench("shuffle", lambda q: q.shuffle(), lambda q: q.shuffle(), tracks)
+
+
+if __name__ == "__main__":
+    main()
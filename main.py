@@ -1,5 +1,5 @@
 from discord.ext import commands
-from dispie.music import MusicClient, Node
+from dispie.music import MusicClient, Node, SnapshotStore
 from config import token
 from pomice import Track
 from rich.logging import Handler, RichHandler, Highlighter
@@ -19,6 +19,7 @@ music = MusicClient(
         "identifier":"MAIN"
     }
 )
+snapshots = SnapshotStore("players.db")
 
 
 discord.utils.setup_logging(
@@ -38,9 +39,17 @@ async def on_message(message: discord.Message):
         await music.handle_on_message(message, database['message_id'])
     await bot.process_commands(message)
 
+players_restored = False
+
 @bot.event
 async def on_ready():
+    global players_restored
     await music.start_nodes()
+    # on_ready runs again after every reconnect, the players are only restored once.
+    if not players_restored:
+        players_restored = True
+        await music.restore_players(snapshots)
+        music.start_snapshots(snapshots)
 
 @bot.command()
 async def setup(ctx: commands.Context, channel: discord.TextChannel):
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+
+import pomice
+
+from dispie.music import MusicClient
+
+
+def make_track(number: int) -> pomice.Track:
+    return pomice.Track(
+        track_id=f"track-{number}",
+        info={"title": f"Song {number}", "identifier": f"id-{number}", "length": 180_000},
+        track_type=pomice.TrackType.SOUNDCLOUD,
+    )
+
+
+class FakeNode:
+    """Answers searches like a Lavalink node, without a connection."""
+
+    def __init__(self) -> None:
+        self.queries = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def get_tracks(self, query, *, search_type=None):
+        self.queries.append((query, search_type))
+        await self.release.wait()
+        if "nothing" in query:
+            return None
+        return [make_track(1), make_track(2)]
+
+
+class MusicSearchTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.client = MusicClient(None, [])  # type: ignore
+        self.node = FakeNode()
+
+    async def test_original_query_is_sent_and_cache_key_is_normalized(self) -> None:
+        first = await self.client.search("  Never Gonna  Give You Up ", node=self.node, requester="a")
+        second = await self.client.search("never gonna give you up", node=self.node, requester="b")
+        self.assertEqual(self.node.queries, [("Never Gonna  Give You Up", pomice.SearchType.ytsearch)])
+        self.assertEqual([track.track_id for track in second], ["track-1", "track-2"])
+        # Every call gets its own tracks.
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual((first[0].requester, second[0].requester), ("a", "b"))
+
+    async def test_urls_keep_their_case(self) -> None:
+        await self.client.search("https://example.com/Track", node=self.node)
+        await self.client.search("https://example.com/track", node=self.node)
+        self.assertEqual(len(self.node.queries), 2)
+
+    async def test_empty_results_are_cached(self) -> None:
+        self.assertIsNone(await self.client.search("nothing here", node=self.node))
+        self.assertIsNone(await self.client.search("Nothing Here", node=self.node))
+        self.assertEqual(len(self.node.queries), 1)
+
+    async def test_concurrent_searches_share_one_request(self) -> None:
+        self.node.release.clear()
+        searches = [asyncio.create_task(self.client.search("song", node=self.node)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        self.node.release.set()
+        results = await asyncio.gather(*searches)
+        self.assertTrue(all(len(result) == 2 for result in results))
+        self.assertEqual(len(self.node.queries), 1)
+        self.assertEqual(self.client.search_stats["shared"], 4)
+
+    async def test_cancelled_search_does_not_cancel_the_others(self) -> None:
+        self.node.release.clear()
+        leader = asyncio.create_task(self.client.search("song", node=self.node))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(self.client.search("song", node=self.node))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        await asyncio.sleep(0)
+        self.node.release.set()
+        self.assertEqual(len(await follower), 2)
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(len(self.node.queries), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from discord import InteractionType, SelectOption
+
+from dispie import ListOptionSource, PagedSelectPrompt, PromptManager
+
+
+class FakeBot:
+    def add_listener(self, func, name) -> None:
+        self.listener = func
+
+    def remove_listener(self, func, name) -> None:
+        self.listener = None
+
+
+class FakeResponse:
+    def __init__(self) -> None:
+        self.done = False
+        self.edits = 0
+
+    def is_done(self) -> bool:
+        return self.done
+
+    async def send_message(self, **kwargs) -> None:
+        self.done = True
+
+    async def edit_message(self, **kwargs) -> None:
+        self.done = True
+        self.edits += 1
+
+    async def defer(self, **kwargs) -> None:
+        self.done = True
+
+
+def make_interaction(data=None) -> SimpleNamespace:
+    async def delete_original_response() -> None:
+        pass
+
+    return SimpleNamespace(
+        type=InteractionType.component,
+        data=data,
+        response=FakeResponse(),
+        message=None,
+        delete_original_response=delete_original_response,
+    )
+
+
+class PromptManagerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.bot = FakeBot()
+        self.manager = PromptManager(self.bot, timeout=5)  # type: ignore
+        self.manager.setup()
+
+    async def click(self, custom_id: str, **data) -> SimpleNamespace:
+        interaction = make_interaction({"custom_id": custom_id, **data})
+        await self.bot.listener(interaction)
+        await asyncio.sleep(0.01)
+        return interaction
+
+    async def test_paging_does_not_answer_a_paged_prompt(self) -> None:
+        options = [SelectOption(label=f"Option {number}", value=str(number)) for number in range(60)]
+        prompt = PagedSelectPrompt("Pick one", ListOptionSource(options), ephemeral=True)
+        task = asyncio.create_task(self.manager.prompt(make_interaction(), prompt))
+        await asyncio.sleep(0.01)
+
+        page = await self.click(prompt.next_page.custom_id)
+        self.assertEqual(page.response.edits, 1)
+        self.assertEqual(prompt.page, 1)
+        self.assertFalse(task.done())
+        self.assertEqual(prompt.select_callback.options[0].value, "25")
+
+        await self.click(prompt.select_callback.custom_id, values=["30"])
+        self.assertIs(await task, prompt)
+        self.assertEqual(prompt.values, ["30"])
+        self.assertEqual(len(self.manager), 0)
+
+    async def test_unanswered_prompt_times_out(self) -> None:
+        options = [SelectOption(label="Only", value="1")]
+        prompt = PagedSelectPrompt("Pick one", ListOptionSource(options), ephemeral=True)
+        self.assertIsNone(await self.manager.prompt(make_interaction(), prompt, timeout=0.05))
+        self.assertIsNone(prompt.values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from discord import Embed
+
+from dispie import EmbedTemplate
+
+
+class EmbedTemplateTest(unittest.TestCase):
+    def test_render(self) -> None:
+        template = EmbedTemplate(Embed(title="{name}", description="#{position:>3} {track.title!r}"))
+        track = type("Track", (), {"title": "Song"})()
+        embed = template.render(name="Queue", position=7, track=track)
+        self.assertEqual((embed.title, embed.description), ("Queue", "#  7 'Song'"))
+
+    def test_nested_specs_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            EmbedTemplate(Embed(title="{n:{w}}"))
+        with self.assertRaises(ValueError):
+            EmbedTemplate(Embed(title="{n:>{w}.{p}}"))
+
+    def test_private_attributes_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            EmbedTemplate(Embed(title="{user.__init__.__globals__}"))
+
+    def test_width_and_precision_are_capped(self) -> None:
+        template = EmbedTemplate(Embed(title="{title:>50000000}", description="{n:.99999f}"))
+        embed = template.render(title="x", n=1.5)
+        self.assertEqual(len(embed.title), 4096)
+        self.assertEqual(len(embed.description.split(".")[1]), 4096)
+        self.assertEqual(EmbedTemplate(Embed(title="{n:*^12,.2f}")).render(n=1234.5).title, "**1,234.50**")
+
+    def test_mismatched_values_fall_back_to_str(self) -> None:
+        template = EmbedTemplate(Embed(title="{n:d}", description="{n:.2f}"))
+        embed = template.render(n="five")
+        self.assertEqual((embed.title, embed.description), ("five", "five"))
+        with self.assertRaises(ValueError):
+            EmbedTemplate(Embed(title="{n:d}"), strict=True).render(n="five")
+
+    def test_missing_values(self) -> None:
+        self.assertEqual(EmbedTemplate(Embed(title="a{missing}b{n.nope}")).render(n=1).title, "ab")
+        with self.assertRaises(KeyError):
+            EmbedTemplate(Embed(title="{n.nope}"), strict=True).render(n=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from dispie import URLChecker
+
+
+class URLCheckerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.hits = {}
+        self.release = asyncio.Event()
+
+        async def image(request: web.Request) -> web.Response:
+            self.hits[request.path] = self.hits.get(request.path, 0) + 1
+            return web.Response(body=b"\x89PNG", content_type="image/png")
+
+        async def slow(request: web.Request) -> web.Response:
+            self.hits[request.path] = self.hits.get(request.path, 0) + 1
+            await self.release.wait()
+            return web.Response(body=b"\x89PNG", content_type="image/png")
+
+        async def page(request: web.Request) -> web.Response:
+            return web.Response(text="hello", content_type="text/html")
+
+        async def redirect(request: web.Request) -> web.Response:
+            raise web.HTTPFound("/image.png")
+
+        app = web.Application()
+        app.router.add_route("*", "/image.png", image)
+        app.router.add_route("*", "/slow.png", slow)
+        app.router.add_route("*", "/page", page)
+        app.router.add_route("*", "/redirect", redirect)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base = f"http://127.0.0.1:{port}"
+        self.checker = URLChecker(allow_private=True)
+
+    async def asyncTearDown(self) -> None:
+        self.release.set()
+        await self.checker.close()
+        await self.runner.cleanup()
+
+    async def test_private_addresses_are_refused_by_default(self) -> None:
+        checker = URLChecker()
+        try:
+            error = await checker.check(f"{self.base}/image.png")
+            self.assertIn("private address", error)
+            error = await checker.check(f"http://localhost:{self.runner.addresses[0][1]}/image.png")
+            self.assertIn("private address", error)
+        finally:
+            await checker.close()
+        self.assertEqual(self.hits, {})
+
+    async def test_image_and_cache(self) -> None:
+        self.assertIsNone(await self.checker.check(f"{self.base}/image.png"))
+        self.assertIsNone(await self.checker.check(f"{self.base}/image.png"))
+        self.assertEqual(self.hits["/image.png"], 1)
+        self.assertIn("not an image", await self.checker.check(f"{self.base}/page"))
+        self.assertIn("status 404", await self.checker.check(f"{self.base}/missing.png"))
+
+    async def test_redirects_are_followed(self) -> None:
+        self.assertIsNone(await self.checker.check(f"{self.base}/redirect"))
+
+    async def test_concurrent_checks_share_one_request(self) -> None:
+        url = f"{self.base}/slow.png"
+        checks = [asyncio.create_task(self.checker.check(url)) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*checks), [None] * 5)
+        self.assertEqual(self.hits["/slow.png"], 1)
+
+    async def test_cancelled_leader_does_not_cancel_followers(self) -> None:
+        url = f"{self.base}/slow.png"
+        leader = asyncio.create_task(self.checker.check(url))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(self.checker.check(url))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertIsNone(await follower)
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(self.hits["/slow.png"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()